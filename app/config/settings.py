@@ -1,8 +1,8 @@
 import os
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Literal, Optional, cast
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class AppSettings(BaseModel):
@@ -19,10 +19,68 @@ class AppSettings(BaseModel):
     environment: str = Field("dev", description="Environment name: dev/staging/prod")
     log_level: str = Field("INFO", description="Log level")
     cors_origins: List[str] = Field(default_factory=lambda: ["*"], description="Allowed CORS origins")
-    rate_limit_per_minute: int = Field(60, ge=1, description="Simple in-memory rate limit per minute per client")
+    rate_limit_per_minute: int = Field(60, ge=1, description="Token-bucket rate limit per minute per client IP")
+    rate_limit_max_clients: int = Field(10000, ge=1, description="Hard cap on clients tracked by the rate limiter")
+    rate_limit_api_keys: Dict[str, int] = Field(
+        default_factory=dict, description="Per-API-key quotas (requests per minute), selected by the X-API-Key header"
+    )
+    rate_limit_backend: Literal["memory", "sqlite"] = Field(
+        "memory", description="Rate-limit state: per-process memory, or a SQLite file shared by all workers"
+    )
+    rate_limit_sqlite_path: Optional[str] = Field(
+        None, description="SQLite file for the shared backend; required with it, in a directory only the app can write"
+    )
+    rate_limit_sync_interval: float = Field(
+        0.25, ge=0, description="Seconds between merges of local hit counts into the shared backend"
+    )
+    rate_limit_sqlite_busy_timeout: float = Field(
+        0.01, ge=0, le=1, description="Seconds a sync waits for another worker's SQLite write lock before skipping"
+    )
+    compression_enabled: bool = Field(True, description="Negotiate gzip (and zstd/brotli when installed) response compression")
+    compression_min_size: int = Field(1024, ge=0, description="Smallest response body (bytes) worth compressing")
+    compression_level: int = Field(6, ge=1, le=22, description="Compression level, clamped to each coding's range")
+    compression_cache_max_entries: int = Field(256, ge=0, description="Max pre-compressed bodies kept (0 disables)")
+    compression_cache_max_bytes: int = Field(
+        32 * 1024 * 1024, ge=0, description="Approximate memory bound for pre-compressed bodies"
+    )
+    data_use_compiled: bool = Field(
+        True, description="Serve datasets from fresh compiled .snap files next to the JSON when present"
+    )
+    data_reload_interval: float = Field(
+        0.0, ge=0, description="Seconds between dataset file change checks (0 disables hot reload)"
+    )
+    batch_max_keys: int = Field(500, ge=1, description="Max codes/names resolved by one batch lookup")
+    projection_cache_max_entries: int = Field(
+        32, ge=0, description="Max pre-encoded field projections kept per dataset snapshot (0 disables)"
+    )
+    projection_cache_max_bytes: int = Field(
+        16 * 1024 * 1024, ge=0, description="Approximate memory bound for projections per dataset snapshot"
+    )
+    row_cache_max_entries: int = Field(
+        1024, ge=0, description="Max row models kept per memory-mapped dataset snapshot (0 disables)"
+    )
+    row_cache_max_bytes: int = Field(
+        4 * 1024 * 1024, ge=0, description="Approximate memory bound (encoded row bytes) for row models per snapshot"
+    )
+    graph_cache_max_entries: int = Field(
+        4096, ge=0, description="Max memoized border-graph neighbour/path results per dataset snapshot (0 disables)"
+    )
+    graph_cache_max_bytes: int = Field(
+        4 * 1024 * 1024, ge=0, description="Approximate memory bound for memoized border-graph results per snapshot"
+    )
+    result_cache_max_entries: int = Field(1024, ge=0, description="Max cached list/search results (0 disables)")
+    result_cache_max_bytes: int = Field(16 * 1024 * 1024, ge=0, description="Approximate memory bound for cached results")
+    result_cache_ttl: float = Field(300.0, ge=0, description="Seconds a cached result stays valid (0 = until evicted)")
 
     model_config = dict(extra="forbid")
 
+    @model_validator(mode="after")
+    def _require_sqlite_path(self) -> "AppSettings":
+        # no shared default: a predictable file in a world-writable directory could be pre-created or tampered with
+        if self.rate_limit_backend == "sqlite" and not self.rate_limit_sqlite_path:
+            raise ValueError("ATLAS_RATE_LIMIT_SQLITE_PATH must be set when ATLAS_RATE_LIMIT_BACKEND=sqlite")
+        return self
+
     @classmethod
     def from_env(cls) -> "AppSettings":
         origins_env = os.getenv("ATLAS_CORS_ORIGINS")
@@ -31,6 +89,12 @@ class AppSettings(BaseModel):
         else:
             cors_origins = ["*"]
 
+        api_keys: Dict[str, int] = {}
+        for pair in os.getenv("ATLAS_RATE_LIMIT_API_KEYS", "").split(","):
+            key, _, quota = pair.partition("=")
+            if key.strip() and quota.strip():
+                api_keys[key.strip()] = int(quota)
+
         return cls(
             app_name=os.getenv("ATLAS_APP_NAME", cls.model_fields["app_name"].default),
             version=os.getenv("ATLAS_VERSION", cls.model_fields["version"].default),
@@ -43,6 +107,50 @@ class AppSettings(BaseModel):
             log_level=os.getenv("ATLAS_LOG_LEVEL", cls.model_fields["log_level"].default),
             cors_origins=cors_origins,
             rate_limit_per_minute=int(os.getenv("ATLAS_RATE_LIMIT_PER_MINUTE", cls.model_fields["rate_limit_per_minute"].default)),
+            rate_limit_max_clients=int(os.getenv("ATLAS_RATE_LIMIT_MAX_CLIENTS", cls.model_fields["rate_limit_max_clients"].default)),
+            rate_limit_api_keys=api_keys,
+            rate_limit_backend=cast(
+                Literal["memory", "sqlite"],
+                os.getenv("ATLAS_RATE_LIMIT_BACKEND", cls.model_fields["rate_limit_backend"].default),
+            ),
+            rate_limit_sqlite_path=os.getenv("ATLAS_RATE_LIMIT_SQLITE_PATH") or None,
+            rate_limit_sync_interval=float(
+                os.getenv("ATLAS_RATE_LIMIT_SYNC_INTERVAL", cls.model_fields["rate_limit_sync_interval"].default)
+            ),
+            rate_limit_sqlite_busy_timeout=float(
+                os.getenv(
+                    "ATLAS_RATE_LIMIT_SQLITE_BUSY_TIMEOUT", cls.model_fields["rate_limit_sqlite_busy_timeout"].default
+                )
+            ),
+            compression_enabled=os.getenv("ATLAS_COMPRESSION_ENABLED", "true").strip().lower() in ("1", "true", "yes"),
+            compression_min_size=int(os.getenv("ATLAS_COMPRESSION_MIN_SIZE", cls.model_fields["compression_min_size"].default)),
+            compression_level=int(os.getenv("ATLAS_COMPRESSION_LEVEL", cls.model_fields["compression_level"].default)),
+            compression_cache_max_entries=int(
+                os.getenv("ATLAS_COMPRESSION_CACHE_MAX_ENTRIES", cls.model_fields["compression_cache_max_entries"].default)
+            ),
+            compression_cache_max_bytes=int(
+                os.getenv("ATLAS_COMPRESSION_CACHE_MAX_BYTES", cls.model_fields["compression_cache_max_bytes"].default)
+            ),
+            data_use_compiled=os.getenv("ATLAS_DATA_USE_COMPILED", "true").strip().lower() in ("1", "true", "yes"),
+            data_reload_interval=float(os.getenv("ATLAS_DATA_RELOAD_INTERVAL", cls.model_fields["data_reload_interval"].default)),
+            batch_max_keys=int(os.getenv("ATLAS_BATCH_MAX_KEYS", cls.model_fields["batch_max_keys"].default)),
+            projection_cache_max_entries=int(
+                os.getenv("ATLAS_PROJECTION_CACHE_MAX_ENTRIES", cls.model_fields["projection_cache_max_entries"].default)
+            ),
+            projection_cache_max_bytes=int(
+                os.getenv("ATLAS_PROJECTION_CACHE_MAX_BYTES", cls.model_fields["projection_cache_max_bytes"].default)
+            ),
+            row_cache_max_entries=int(os.getenv("ATLAS_ROW_CACHE_MAX_ENTRIES", cls.model_fields["row_cache_max_entries"].default)),
+            row_cache_max_bytes=int(os.getenv("ATLAS_ROW_CACHE_MAX_BYTES", cls.model_fields["row_cache_max_bytes"].default)),
+            graph_cache_max_entries=int(
+                os.getenv("ATLAS_GRAPH_CACHE_MAX_ENTRIES", cls.model_fields["graph_cache_max_entries"].default)
+            ),
+            graph_cache_max_bytes=int(os.getenv("ATLAS_GRAPH_CACHE_MAX_BYTES", cls.model_fields["graph_cache_max_bytes"].default)),
+            result_cache_max_entries=int(
+                os.getenv("ATLAS_RESULT_CACHE_MAX_ENTRIES", cls.model_fields["result_cache_max_entries"].default)
+            ),
+            result_cache_max_bytes=int(os.getenv("ATLAS_RESULT_CACHE_MAX_BYTES", cls.model_fields["result_cache_max_bytes"].default)),
+            result_cache_ttl=float(os.getenv("ATLAS_RESULT_CACHE_TTL", cls.model_fields["result_cache_ttl"].default)),
         )
 
 
@@ -1,4 +1,6 @@
 from .logging import configure_logging, get_logger, RequestLoggingMiddleware
+from .rate_limit import RateLimitBackend, SQLiteRateLimitBackend, TokenBucketLimiter, create_rate_limit_backend
+from .compression import CompressionMiddleware
 from .security import configure_cors, SecurityHeadersMiddleware, RateLimiterMiddleware
 
 __all__ = [
@@ -8,4 +10,9 @@ __all__ = [
     "configure_cors",
     "SecurityHeadersMiddleware",
     "RateLimiterMiddleware",
+    "CompressionMiddleware",
+    "RateLimitBackend",
+    "SQLiteRateLimitBackend",
+    "TokenBucketLimiter",
+    "create_rate_limit_backend",
 ]
@@ -0,0 +1,311 @@
+"""
+Negotiated response compression with a cache of pre-compressed bodies.
+
+gzip (stdlib) is always available; zstd and brotli are offered when ``zstandard`` /
+``brotli`` are installed. Responses carrying an ``ETag`` (dataset version + request, see
+``app.routes.conditional``) are compressed once per ETag and coding and served from an LRU
+afterwards; streaming responses (exports) are compressed chunk by chunk.
+"""
+
+import importlib
+import re
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.settings import AppSettings, get_settings
+from app.utils import LRUCache
+
+try:
+    zstandard: Any = importlib.import_module("zstandard")
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
+try:
+    brotli: Any = importlib.import_module("brotli")
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+_ETAG_CODING = re.compile(r'-(?:zstd|br|gzip)"$')
+
+
+class StreamCompressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it, so the client can decode everything sent so far."""
+
+    def finish(self) -> bytes: ...
+
+
+class Codec(ABC):
+    """A content coding at a fixed level."""
+
+    name = ""
+
+    def __init__(self, level: int):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        stream = self.stream()
+        return stream.compress(data) + stream.finish()
+
+    @abstractmethod
+    def stream(self) -> StreamCompressor:
+        """A fresh incremental compressor."""
+
+
+class _ZlibStream:
+    def __init__(self, level: int):
+        # wbits=31: gzip container
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class GzipCodec(Codec):
+    name = "gzip"
+
+    def __init__(self, level: int):
+        super().__init__(min(max(level, 1), 9))
+
+    def stream(self) -> StreamCompressor:
+        return _ZlibStream(self.level)
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class BrotliCodec(Codec):
+    name = "br"
+
+    def __init__(self, level: int):
+        super().__init__(min(max(level, 0), 11))
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.level)
+
+    def stream(self) -> StreamCompressor:
+        return _BrotliStream(self.level)
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class ZstdCodec(Codec):
+    name = "zstd"
+
+    def __init__(self, level: int):
+        super().__init__(min(max(level, 1), 22))
+
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self) -> StreamCompressor:
+        return _ZstdStream(self.level)
+
+
+def available_codecs(level: int) -> List[Codec]:
+    """Installed codings, most preferred first."""
+    codecs: List[Codec] = []
+    if zstandard is not None:
+        codecs.append(ZstdCodec(level))
+    if brotli is not None:
+        codecs.append(BrotliCodec(level))
+    codecs.append(GzipCodec(level))
+    return codecs
+
+
+def negotiate(accept_encoding: str, codecs: List[Codec]) -> Optional[Codec]:
+    """Pick the coding with the highest ``q`` in Accept-Encoding; ties go to server preference."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name.strip().lower()] = q
+    best: Optional[Codec] = None
+    best_q = 0.0
+    for codec in codecs:
+        q = weights.get(codec.name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = codec, q
+    return best
+
+
+def encoded_etag(etag: str, coding: str) -> str:
+    """Strong ETags must differ per representation: ``"abc"`` -> ``"abc-gzip"``."""
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{coding}"'
+    return etag
+
+
+def strip_etag_coding(etag: str) -> str:
+    """Inverse of ``encoded_etag``, for comparing If-None-Match with the identity ETag."""
+    return _ETAG_CODING.sub('"', etag)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing successful JSON/NDJSON responses above a size threshold.
+
+    Buffered responses with an ETag are compressed once per (ETag, coding) and later requests
+    are answered from the cache without recompressing. Responses without ``Content-Length``
+    are compressed as a stream, flushing every chunk; with an ETag, the compressed stream is
+    also cached when it fits.
+    """
+
+    def __init__(self, app: ASGIApp, settings: Optional[AppSettings] = None):
+        self.app = app
+        self.settings = settings or get_settings()
+        self.codecs = available_codecs(self.settings.compression_level)
+        self.min_size = self.settings.compression_min_size
+        self.cache = LRUCache(
+            max_entries=self.settings.compression_cache_max_entries,
+            max_bytes=self.settings.compression_cache_max_bytes,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.settings.compression_enabled or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        codec = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.codecs)
+        responder = _CompressionResponder(self, codec, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request state machine between the app's messages and the client."""
+
+    def __init__(self, middleware: CompressionMiddleware, codec: Optional[Codec], send: Send):
+        self.middleware = middleware
+        self.codec = codec
+        self._send = send
+        self.start: Optional[Message] = None
+        self.mode = "passthrough"
+        self.buffer = bytearray()
+        self.stream: Optional[StreamCompressor] = None
+        self.cache_key: Optional[Tuple[str, str]] = None
+        self.cached_chunks: Optional[List[bytes]] = None
+        self.cached_size = 0
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            await self._on_start(message)
+        elif message["type"] == "http.response.body":
+            await self._on_body(message)
+        else:
+            await self._send(message)
+
+    async def _on_start(self, message: Message) -> None:
+        headers = MutableHeaders(scope=message)
+        content_type = headers.get("content-type", "")
+        if message["status"] != 200 or "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+            await self._send(message)
+            return
+        headers.add_vary_header("Accept-Encoding")
+        length = headers.get("content-length")
+        if self.codec is None or (length is not None and int(length) < self.middleware.min_size):
+            await self._send(message)
+            return
+
+        etag = headers.get("etag")
+        if etag:
+            self.cache_key = (etag, self.codec.name)
+            cached = self.middleware.cache.get(self.cache_key)
+            if cached is not None:
+                # the app's body is identical (same ETag); it is drained without being compressed
+                self.mode = "cached"
+                self._set_encoding(headers, len(cached))
+                await self._send(message)
+                await self._send({"type": "http.response.body", "body": cached, "more_body": False})
+                return
+
+        self.start = message
+        if length is not None:
+            self.mode = "buffered"
+            return
+        self.mode = "streaming"
+        self.stream = self.codec.stream()
+        self.cached_chunks = [] if self.cache_key is not None else None
+        self._set_encoding(headers, None)
+        await self._send(message)
+
+    async def _on_body(self, message: Message) -> None:
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        if self.mode == "passthrough":
+            await self._send(message)
+        elif self.mode == "buffered":
+            self.buffer += body
+            if more_body:
+                return
+            if self.codec is None or self.start is None:
+                raise RuntimeError("buffered response without a negotiated codec")
+            compressed = self.codec.compress(bytes(self.buffer))
+            if self.cache_key is not None:
+                self.middleware.cache.set(self.cache_key, compressed, len(compressed))
+            self._set_encoding(MutableHeaders(scope=self.start), len(compressed))
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": False})
+        elif self.mode == "streaming":
+            if self.stream is None:
+                raise RuntimeError("streaming response without a compressor")
+            chunk = self.stream.compress(body) if body else b""
+            if not more_body:
+                chunk += self.stream.finish()
+            self._remember(chunk, more_body)
+            if chunk or not more_body:
+                await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _remember(self, chunk: bytes, more_body: bool) -> None:
+        if self.cached_chunks is None:
+            return
+        self.cached_size += len(chunk)
+        if self.cached_size > self.middleware.cache.max_bytes:
+            self.cached_chunks = None
+            return
+        self.cached_chunks.append(chunk)
+        if not more_body and self.cache_key is not None:
+            self.middleware.cache.set(self.cache_key, b"".join(self.cached_chunks), self.cached_size)
+
+    def _set_encoding(self, headers: MutableHeaders, length: Optional[int]) -> None:
+        if self.codec is None:
+            raise RuntimeError("content-encoding set without a negotiated codec")
+        headers["content-encoding"] = self.codec.name
+        if length is None:
+            if "content-length" in headers:
+                del headers["content-length"]
+        else:
+            headers["content-length"] = str(length)
+        etag = headers.get("etag")
+        if etag:
+            headers["etag"] = encoded_etag(etag, self.codec.name)
@@ -2,11 +2,10 @@ import logging
 import time
 import uuid
 from contextvars import ContextVar
-from typing import Callable, Union
+from typing import Union
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.config.settings import get_settings
 
@@ -44,38 +43,49 @@ def get_logger(name: str = "atlas") -> logging.Logger:
     return logger
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app):
-        super().__init__(app)
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware: assigns a request ID, logs latency and stamps ``X-Request-ID``."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.logger = get_logger("atlas.request")
 
-    async def dispatch(self, request: Request, call_next: Callable):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         request_id = str(uuid.uuid4())
-        _request_id_ctx.set(request_id)
+        token = _request_id_ctx.set(request_id)
         start = time.perf_counter()
-        response: Response | None = None
+        status_code: Union[int, str] = "n/a"
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
         try:
-            response = await call_next(request)
-            return response
-        except Exception as exc:  # log stack trace for unhandled exceptions
+            await self.app(scope, receive, send_with_request_id)
+        except Exception:  # log stack trace for unhandled exceptions
             self.logger.exception(
                 "Unhandled exception during request",
-                extra={"extra": {"method": request.method, "path": str(request.url.path)}},
+                extra={"extra": {"method": scope["method"], "path": scope["path"]}},
             )
-            raise exc
+            raise
         finally:
             duration_ms = (time.perf_counter() - start) * 1000
-            status_code: Union[int, str] = response.status_code if response is not None else "n/a"
             self.logger.info(
                 "HTTP request",
                 extra={
                     "extra": {
-                        "method": request.method,
-                        "path": request.url.path,
+                        "method": scope["method"],
+                        "path": scope["path"],
                         "status_code": status_code,
                         "duration_ms": round(duration_ms, 2),
                     }
                 },
             )
-            if response is not None:
-                response.headers["X-Request-ID"] = request_id
+            _request_id_ctx.reset(token)
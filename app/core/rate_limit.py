@@ -0,0 +1,261 @@
+"""Rate-limit backends: in-process token buckets and a cross-process SQLite (WAL) sliding window."""
+
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional, Protocol, Tuple, cast
+
+from app.config.settings import AppSettings
+from app.core.logging import get_logger
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # seconds until the next token (0 when allowed)
+    reset: int  # seconds until the bucket is full again
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "full_at")
+
+    def __init__(self, tokens: float, updated: float, full_at: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.full_at = full_at
+
+
+class TokenBucketLimiter:
+    """
+    Per-client token buckets with O(1) updates and bounded memory.
+
+    Clients are kept in least-recently-seen order. A bucket that has refilled completely is
+    indistinguishable from a fresh one, so such idle entries are dropped from the front as
+    traffic flows, and the oldest entry is evicted whenever ``max_clients`` is exceeded.
+    """
+
+    def __init__(self, max_clients: int, clock: Callable[[], float] = time.monotonic):
+        self.max_clients = max_clients
+        self.clock = clock
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def hit(self, key: str, per_minute: int) -> RateLimitDecision:
+        """Take one token from ``key``'s bucket (capacity and refill of ``per_minute`` per minute)."""
+        now = self.clock()
+        rate = per_minute / 60.0
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(per_minute)
+            bucket = _Bucket(tokens, now, now)
+            self._buckets[key] = bucket
+        else:
+            tokens = min(float(per_minute), bucket.tokens + (now - bucket.updated) * rate)
+            self._buckets.move_to_end(key)
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        bucket.tokens = tokens
+        bucket.updated = now
+        bucket.full_at = now + (per_minute - tokens) / rate
+        self._evict(now)
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=per_minute,
+            remaining=int(tokens),
+            retry_after=0 if allowed else math.ceil((1.0 - tokens) / rate),
+            reset=math.ceil((per_minute - tokens) / rate),
+        )
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while len(buckets) > self.max_clients:
+            buckets.popitem(last=False)
+            self.evictions += 1
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if oldest.full_at > now:
+                break
+            buckets.popitem(last=False)
+
+
+class RateLimitBackend(Protocol):
+    def hit(self, key: str, per_minute: int) -> RateLimitDecision:
+        """Count one request for ``key`` against a quota of ``per_minute`` requests per minute."""
+        ...
+
+
+class SQLiteRateLimitBackend:
+    """
+    Sliding-window limiter whose counts are shared by all processes through a SQLite file in WAL mode.
+
+    Each process counts its own hits and merges them into the shared table every
+    ``sync_interval`` seconds, reading back the totals for the keys it saw. A process also syncs
+    early once its unsynced hits for a key reach ``batch_fraction`` of that key's remaining
+    shared budget, so hot clients are reconciled more often as they approach their quota and
+    the overshoot across workers stays small. The estimate is the usual approximate sliding
+    window: ``previous_window * (1 - elapsed_fraction) + current_window``.
+
+    ``hit`` runs on the event loop, so SQLite waits at most ``busy_timeout`` seconds for another
+    worker's write lock; when the database stays busy the sync is skipped and the local hits
+    are merged on the next attempt.
+    """
+
+    WINDOW = 60
+
+    def __init__(
+        self,
+        path: Path,
+        sync_interval: float = 0.25,
+        max_clients: int = 10000,
+        batch_fraction: float = 0.1,
+        busy_timeout: float = 0.01,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.sync_interval = sync_interval
+        self.batch_fraction = batch_fraction
+        self.max_clients = max_clients
+        self.clock = clock
+        self.logger = get_logger("atlas.ratelimit")
+        self.syncs = 0
+        self.busy_skips = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._synced: Dict[Tuple[str, int], int] = {}
+        self._pending: Dict[Tuple[str, int], int] = {}
+        self._last_sync = float("-inf")
+        self._pruned_window = -1
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_hits ("
+            "key TEXT NOT NULL, window INTEGER NOT NULL, count INTEGER NOT NULL, "
+            "PRIMARY KEY (key, window)) WITHOUT ROWID"
+        )
+        # per-connection list of the keys whose shared totals a sync refreshes
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS sync_keys (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        return conn
+
+    def _count(self, key: str, window: int) -> int:
+        return self._synced.get((key, window), 0) + self._pending.get((key, window), 0)
+
+    def hit(self, key: str, per_minute: int) -> RateLimitDecision:
+        now = self.clock()
+        window_index, offset = divmod(now, self.WINDOW)
+        window = int(window_index)
+        with self._lock:
+            if now - self._last_sync >= self.sync_interval or len(self._pending) >= self.max_clients:
+                self._sync(window, now, key)
+            weight = 1.0 - offset / self.WINDOW
+            current = self._count(key, window)
+            previous = self._count(key, window - 1)
+            estimate = previous * weight + current
+            allowed = estimate + 1 <= per_minute
+            # rejected hits are recorded as 0 so the key's shared totals still get refreshed
+            unsynced = self._pending.get((key, window), 0) + int(allowed)
+            self._pending[(key, window)] = unsynced
+            if allowed:
+                estimate += 1
+                shared = self._synced.get((key, window - 1), 0) * weight + self._synced.get((key, window), 0)
+                if unsynced >= max(1.0, (per_minute - shared) * self.batch_fraction):
+                    self._sync(window, now, key)
+
+        if allowed:
+            retry_after = 0.0
+        elif current + 1 > per_minute:
+            # blocked for the rest of this window, then until this window's weight has decayed enough
+            retry_after = (self.WINDOW - offset) + self.WINDOW * (1.0 - (per_minute - 1) / current)
+        else:
+            retry_after = self.WINDOW * (1.0 - (per_minute - 1 - current) / previous) - offset
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=per_minute,
+            remaining=max(0, int(per_minute - estimate)),
+            retry_after=0 if allowed else max(1, math.ceil(retry_after)),
+            reset=math.ceil(self.WINDOW - offset),
+        )
+
+    def _sync(self, window: int, now: float, current_key: str) -> None:
+        """
+        Merge local hits into the shared table and refresh totals for the keys seen locally.
+
+        Both happen in one short transaction: the refresh is a single join against a temp
+        table of those keys rather than one query per key.
+        """
+        pending, self._pending = self._pending, {}
+        self._last_sync = now
+        keys = {key for key, _ in pending}
+        keys.add(current_key)
+        committed = False
+        try:
+            if self._conn is None:
+                self._conn = self._connect()
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO rate_limit_hits (key, window, count) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key, window) DO UPDATE SET count = count + excluded.count",
+                    [(key, hit_window, count) for (key, hit_window), count in pending.items()],
+                )
+                prune = window != self._pruned_window
+                if prune:
+                    conn.execute("DELETE FROM rate_limit_hits WHERE window < ?", (window - 1,))
+                conn.execute("DELETE FROM temp.sync_keys")
+                conn.executemany("INSERT INTO temp.sync_keys (key) VALUES (?)", [(key,) for key in keys])
+                rows = conn.execute(
+                    "SELECT h.key, h.window, h.count FROM rate_limit_hits AS h "
+                    "JOIN temp.sync_keys AS k ON k.key = h.key WHERE h.window >= ?",
+                    (window - 1,),
+                ).fetchall()
+                conn.execute("COMMIT")
+                committed = True
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as exc:
+            # keep limiting on local counts; unwritten hits are merged on the next successful sync
+            if not committed:
+                for entry, count in pending.items():
+                    self._pending[entry] = self._pending.get(entry, 0) + count
+            if getattr(exc, "sqlite_errorcode", None) == sqlite3.SQLITE_BUSY:
+                self.busy_skips += 1
+                self.logger.debug("Rate limit sync skipped; database busy", extra={"extra": {"path": str(self.path)}})
+            else:
+                self.logger.warning("Rate limit sync failed", exc_info=True, extra={"extra": {"path": str(self.path)}})
+            return
+        if prune:
+            self._pruned_window = window
+        synced = {
+            entry: count for entry, count in self._synced.items() if entry[1] >= window - 1 and entry[0] not in keys
+        }
+        if len(synced) > 2 * self.max_clients:
+            synced = {}
+        for key, hit_window, count in rows:
+            synced[(key, hit_window)] = count
+        self._synced = synced
+        self.syncs += 1
+
+
+def create_rate_limit_backend(settings: AppSettings) -> RateLimitBackend:
+    """Build the backend selected by ``ATLAS_RATE_LIMIT_BACKEND``."""
+    if settings.rate_limit_backend == "sqlite":
+        return SQLiteRateLimitBackend(
+            Path(cast(str, settings.rate_limit_sqlite_path)),
+            sync_interval=settings.rate_limit_sync_interval,
+            max_clients=settings.rate_limit_max_clients,
+            busy_timeout=settings.rate_limit_sqlite_busy_timeout,
+        )
+    return TokenBucketLimiter(settings.rate_limit_max_clients)
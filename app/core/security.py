@@ -1,14 +1,12 @@
-import time
-from typing import Callable, Dict
+import json
+from typing import List, Optional, Tuple
 
-from fastapi import Request
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.config.settings import get_settings
-from app.exceptions.http_errors import BadRequestError
+from app.config.settings import AppSettings, get_settings
 from app.core.logging import get_logger
+from app.core.rate_limit import RateLimitBackend, create_rate_limit_backend
 
 
 def configure_cors(app):
@@ -22,37 +20,96 @@ def configure_cors(app):
     )
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable):
-        response: Response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains"
-        return response
+SECURITY_HEADERS: List[Tuple[bytes, bytes]] = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"strict-transport-security", b"max-age=63072000; includeSubDomains"),
+]
 
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app):
-        super().__init__(app)
-        self.settings = get_settings()
-        self.bucket: Dict[str, Dict[str, float]] = {}
+class SecurityHeadersMiddleware:
+    """Pure ASGI middleware appending the security headers to ``http.response.start``."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._names = {name for name, _ in SECURITY_HEADERS}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [header for header in message.get("headers", ()) if header[0].lower() not in self._names]
+                message["headers"] = headers + SECURITY_HEADERS
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+API_KEY_HEADER = b"x-api-key"
+RATE_LIMITED_BODY = json.dumps(
+    {"status": "error", "message": "Rate limit exceeded", "code": "ERR_RATE_LIMITED", "details": {}},
+    separators=(",", ":"),
+).encode()
+RATE_LIMITED_HEADERS: List[Tuple[bytes, bytes]] = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(RATE_LIMITED_BODY)).encode()),
+]
+
+
+class RateLimiterMiddleware:
+    """
+    Pure ASGI limiter keyed by client IP, or by API key when one with a configured quota is sent.
+
+    Counting is delegated to the configured backend (``app.core.rate_limit``).
+
+    Rejections are answered directly with a precomputed 429 body (no exception handling); every
+    response carries ``X-RateLimit-Limit``/``X-RateLimit-Remaining``/``X-RateLimit-Reset``.
+    """
+
+    def __init__(self, app: ASGIApp, settings: Optional[AppSettings] = None):
+        self.app = app
+        self.settings = settings or get_settings()
+        self.limiter: RateLimitBackend = create_rate_limit_backend(self.settings)
+        self.api_keys = {key.encode("latin-1"): quota for key, quota in self.settings.rate_limit_api_keys.items()}
         self.logger = get_logger("atlas.ratelimit")
 
-    async def dispatch(self, request: Request, call_next: Callable):
-        client_ip = request.client.host if request.client else "anonymous"
-        now = time.time()
-        window = 60  # seconds
-        limit = self.settings.rate_limit_per_minute
-        entry = self.bucket.get(client_ip, {"count": 0, "window_start": now})
-        if now - entry["window_start"] > window:
-            entry = {"count": 0, "window_start": now}
-        entry["count"] += 1
-        self.bucket[client_ip] = entry
-        if entry["count"] > limit:
-            self.logger.warning("rate limit exceeded", extra={"extra": {"client_ip": client_ip}})
-            raise BadRequestError("Rate limit exceeded", {"client_ip": client_ip})
-        return await call_next(request)
+    def _identify(self, scope: Scope) -> Tuple[str, int]:
+        if self.api_keys:
+            for name, value in scope["headers"]:
+                if name == API_KEY_HEADER and value in self.api_keys:
+                    return "key:" + value.decode("latin-1"), self.api_keys[value]
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "anonymous"), self.settings.rate_limit_per_minute
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        key, quota = self._identify(scope)
+        decision = self.limiter.hit(key, quota)
+        quota_headers = [
+            (b"x-ratelimit-limit", str(decision.limit).encode()),
+            (b"x-ratelimit-remaining", str(decision.remaining).encode()),
+            (b"x-ratelimit-reset", str(decision.reset).encode()),
+        ]
+        if not decision.allowed:
+            client = key if key.startswith("ip:") else "key:<redacted>"
+            self.logger.warning("rate limit exceeded", extra={"extra": {"client": client}})
+            retry_after = [(b"retry-after", str(decision.retry_after).encode())]
+            await send({"type": "http.response.start", "status": 429, "headers": RATE_LIMITED_HEADERS + retry_after + quota_headers})
+            await send({"type": "http.response.body", "body": RATE_LIMITED_BODY})
+            return
+
+        async def send_with_quota(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + quota_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_quota)
 
 
 def sanitize_query(params: dict) -> dict:
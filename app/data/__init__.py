@@ -0,0 +1,19 @@
+from .snapshot_file import (
+    FORMAT_VERSION,
+    SNAPSHOT_SUFFIX,
+    EncodedRows,
+    MappedDataset,
+    MappedRows,
+    encode_snapshot,
+    write_snapshot_file,
+)
+
+__all__ = [
+    "FORMAT_VERSION",
+    "SNAPSHOT_SUFFIX",
+    "EncodedRows",
+    "MappedDataset",
+    "MappedRows",
+    "encode_snapshot",
+    "write_snapshot_file",
+]
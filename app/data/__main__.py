@@ -0,0 +1,71 @@
+"""
+Dataset tooling.
+
+    python -m app.data compile data/countries.json data/capitals.json
+
+``compile`` validates each JSON dataset once and writes a versioned, checksummed ``.snap``
+file next to it (or to ``--output``). Repositories map it at startup instead of parsing the
+JSON, as long as it is newer than, or identical in content to, its source.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from app.models import CapitalModel, CountryModel
+from app.repositories import compile_snapshot
+from app.repositories.capital_repository import CAPITAL_REQUIRED_KEYS
+from app.repositories.country_repository import COUNTRY_REQUIRED_KEYS
+
+DATASETS: Dict[str, Tuple[Type[BaseModel], List[str]]] = {
+    "countries": (CountryModel, COUNTRY_REQUIRED_KEYS),
+    "capitals": (CapitalModel, CAPITAL_REQUIRED_KEYS),
+}
+
+
+def _dataset(source: Path, name: Optional[str]) -> Tuple[Type[BaseModel], List[str]]:
+    key = name or source.stem
+    if key not in DATASETS:
+        raise SystemExit(f"{source}: unknown dataset '{key}' (use --dataset {'/'.join(DATASETS)})")
+    return DATASETS[key]
+
+
+def compile_command(args: argparse.Namespace) -> int:
+    if args.output is not None and len(args.sources) != 1:
+        raise SystemExit("--output needs exactly one source")
+    failed = 0
+    for source in args.sources:
+        model, required_keys = _dataset(source, args.dataset)
+        start = time.perf_counter()
+        try:
+            snapshot = compile_snapshot(source, model, required_keys, args.output)
+        except Exception as exc:
+            print(f"{source}: {getattr(exc, 'message', exc)}", file=sys.stderr)
+            failed += 1
+            continue
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        written = args.output or source.with_suffix(".snap")
+        print(
+            f"{source} -> {written}: {len(snapshot)} rows, {written.stat().st_size} bytes, "
+            f"version {snapshot.version} ({elapsed_ms:.1f} ms)"
+        )
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.data", description="Dataset tooling")
+    commands = parser.add_subparsers(dest="command", required=True)
+    compile_parser = commands.add_parser("compile", help="validate JSON datasets and write compiled .snap files")
+    compile_parser.add_argument("sources", nargs="+", type=Path, help="JSON dataset files")
+    compile_parser.add_argument("-o", "--output", type=Path, help="output file (single source only)")
+    compile_parser.add_argument("--dataset", choices=sorted(DATASETS), help="dataset kind (default: file name)")
+    args = parser.parse_args(argv)
+    return compile_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+Read-only, memory-mapped dataset snapshot files shared by all workers through the page cache.
+
+Layout (little-endian)::
+
+    b"ATLSNAP\\0"  u32 format version  u32 header length  header JSON  (padding)  sections...
+
+The JSON header lists the model fields with their storage kind, the byte range of every
+section, a SHA-256 checksum of everything after the header, and the size, mtime and content
+hash of the JSON source it was compiled from (to detect stale files). Sections are 8-byte aligned:
+
+- ``col:<field>`` fixed-width ``int64``/``float64`` columns for numeric fields;
+- ``col:<field>`` ``uint32`` string ids for text fields, resolved through the string table;
+- ``col:<field>.offsets`` + ``col:<field>.ids`` for lists of strings;
+- ``strings.offsets`` + ``strings.data``: offset-indexed, deduplicated UTF-8 string table;
+- ``rows.offsets`` + ``rows.data``: every row pre-encoded as compact JSON;
+- ``sort:<field>:asc|desc``: precomputed ``uint32`` sort permutations (see ``SortIndex``).
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import typing
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Generic, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar, Union, overload
+
+from pydantic import BaseModel
+
+from app.exceptions import BadRequestError
+from app.indexes import SortIndex
+from app.utils import encode_model
+from app.utils.cache import LRUCache
+
+M = TypeVar("M", bound=BaseModel)
+
+MAGIC = b"ATLSNAP\x00"
+FORMAT_VERSION = 2
+SNAPSHOT_SUFFIX = ".snap"
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGN = 8
+
+
+def field_kind(annotation: Any) -> str:
+    """Storage kind for a model field annotation."""
+    if annotation is int:
+        return "int"
+    if annotation is float:
+        return "float"
+    if annotation is str:
+        return "str"
+    if typing.get_origin(annotation) in (list, List) and typing.get_args(annotation) == (str,):
+        return "str_list"
+    return "json"
+
+
+def _native(values: array) -> array:
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def add(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return string_id
+
+
+def _offsets_and_blob(chunks: Sequence[bytes], typecode: str) -> Tuple[bytes, bytes]:
+    offsets = array(typecode, [0])
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        offsets.append(total)
+    return _native(offsets).tobytes(), b"".join(chunks)
+
+
+def encode_snapshot(
+    model: Type[BaseModel],
+    items: Sequence[BaseModel],
+    content_hash: str,
+    source: Optional[Dict[str, Any]] = None,
+) -> bytes:
+    """Serialize validated rows, their string table, row JSON and sort permutations into the snapshot format."""
+    strings = _StringTable()
+    fields = [{"name": name, "kind": field_kind(info.annotation)} for name, info in model.model_fields.items()]
+    sections: Dict[str, bytes] = {}
+    for field in fields:
+        name, kind = field["name"], field["kind"]
+        values = [getattr(item, name) for item in items]
+        if kind == "int":
+            sections[f"col:{name}"] = _native(array("q", values)).tobytes()
+        elif kind == "float":
+            sections[f"col:{name}"] = _native(array("d", values)).tobytes()
+        elif kind == "str":
+            sections[f"col:{name}"] = _native(array("I", (strings.add(v) for v in values))).tobytes()
+        elif kind == "str_list":
+            ids = array("I")
+            offsets = array("I", [0])
+            for value in values:
+                ids.extend(strings.add(v) for v in value)
+                offsets.append(len(ids))
+            sections[f"col:{name}.offsets"] = _native(offsets).tobytes()
+            sections[f"col:{name}.ids"] = _native(ids).tobytes()
+    sections["strings.offsets"], sections["strings.data"] = _offsets_and_blob(
+        [value.encode("utf-8") for value in strings.values], "I"
+    )
+    sections["rows.offsets"], sections["rows.data"] = _offsets_and_blob([encode_model(item) for item in items], "Q")
+    sort_index = SortIndex(items, list(model.model_fields))
+    for name in model.model_fields:
+        for descending, suffix in ((False, "asc"), (True, "desc")):
+            sections[f"sort:{name}:{suffix}"] = _native(array("I", sort_index.order(name, descending))).tobytes()
+
+    header: Dict[str, Any] = {
+        "model": model.__name__,
+        "rows": len(items),
+        "content_hash": content_hash,
+        "source": source or {},
+        "checksum": "",
+        "fields": fields,
+        "sections": {},
+    }
+    # section offsets depend on the header length, which depends on the offsets: iterate to a fixed point
+    header["checksum"] = "0" * 64
+    header_bytes = b""
+    while True:
+        position = _pad(_PREAMBLE.size + len(header_bytes))
+        for name, data in sections.items():
+            header["sections"][name] = [position, len(data)]
+            position = _pad(position + len(data))
+        encoded = json.dumps(header, separators=(",", ":")).encode()
+        if len(encoded) == len(header_bytes):
+            header_bytes = encoded
+            break
+        header_bytes = encoded
+
+    payload = bytearray()
+    payload_start = _pad(_PREAMBLE.size + len(header_bytes))
+    for name, data in sections.items():
+        payload.extend(b"\x00" * (header["sections"][name][0] - payload_start - len(payload)))
+        payload.extend(data)
+    header["checksum"] = hashlib.sha256(payload).hexdigest()
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    preamble = _PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)) + header_bytes
+    return preamble + b"\x00" * (payload_start - len(preamble)) + bytes(payload)
+
+
+def _pad(position: int) -> int:
+    return (position + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def write_snapshot_file(
+    path: Path,
+    model: Type[BaseModel],
+    items: Sequence[BaseModel],
+    content_hash: str,
+    source: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Write a snapshot file atomically (temp file + rename), so mapped readers keep the old inode."""
+    payload = encode_snapshot(model, items, content_hash, source)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        # mkstemp creates 0600; compiled snapshots are read by workers running as other users
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class MappedDataset:
+    """A snapshot file mapped read-only; columns and rows are views into the mapping."""
+
+    def __init__(self, path: Path, verify: bool = True):
+        with open(path, "rb") as f:
+            self.stat = os.fstat(f.fileno())
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:  # empty file
+                raise BadRequestError("Invalid snapshot file", {"path": str(path)}) from exc
+        self._view = memoryview(self._mmap)
+        try:
+            magic, version, header_len = _PREAMBLE.unpack_from(self._view)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"unsupported snapshot file (magic={magic!r}, version={version})")
+            self.header: Dict[str, Any] = json.loads(bytes(self._view[_PREAMBLE.size : _PREAMBLE.size + header_len]))
+            payload = self._view[_pad(_PREAMBLE.size + header_len) :]
+            if verify and hashlib.sha256(payload).hexdigest() != self.header["checksum"]:
+                raise ValueError("checksum mismatch")
+        except (struct.error, ValueError, KeyError) as exc:
+            raise BadRequestError("Invalid snapshot file", {"path": str(path), "error": str(exc)}) from exc
+        self.path = path
+        self.rows: int = self.header["rows"]
+        self.content_hash: str = self.header["content_hash"]
+        self.source: Dict[str, Any] = self.header.get("source", {})
+        self.kinds: Dict[str, str] = {field["name"]: field["kind"] for field in self.header["fields"]}
+        self._string_offsets = self._section("strings.offsets", "I")
+        self._string_data = self._section("strings.data", "B")
+        self._row_offsets = self._section("rows.offsets", "Q")
+        self._row_data = self._section("rows.data", "B")
+
+    def _section(self, name: str, typecode: str) -> Any:
+        start, length = self.header["sections"][name]
+        raw = self._view[start : start + length]
+        if typecode == "B":
+            return raw
+        if sys.byteorder != "little":
+            return _native(array(typecode, raw.tobytes()))
+        return raw.cast(typecode)
+
+    def sort_order(self, field: str, descending: bool) -> Optional[Sequence[int]]:
+        """Precomputed sort permutation for a field, if the file has one."""
+        name = f"sort:{field}:{'desc' if descending else 'asc'}"
+        if name not in self.header["sections"]:
+            return None
+        return self._section(name, "I")
+
+    def string(self, string_id: int) -> str:
+        offsets = self._string_offsets
+        return str(self._string_data[offsets[string_id] : offsets[string_id + 1]], "utf-8")
+
+    def row_json(self, row_id: int) -> bytes:
+        offsets = self._row_offsets
+        return bytes(self._row_data[offsets[row_id] : offsets[row_id + 1]])
+
+    def column(self, field: str) -> Sequence[Any]:
+        """All values of a field in row order, decoded from the mapped columns."""
+        kind = self.kinds[field]
+        if kind == "int":
+            return self._section(f"col:{field}", "q")
+        if kind == "float":
+            return self._section(f"col:{field}", "d")
+        if kind == "str":
+            return [self.string(i) for i in self._section(f"col:{field}", "I")]
+        if kind == "str_list":
+            offsets = self._section(f"col:{field}.offsets", "I")
+            ids = self._section(f"col:{field}.ids", "I")
+            return [[self.string(i) for i in ids[offsets[r] : offsets[r + 1]]] for r in range(self.rows)]
+        return [json.loads(self.row_json(r))[field] for r in range(self.rows)]
+
+
+class EncodedRows(Sequence[bytes]):
+    """Pre-encoded row JSON read straight from the mapping."""
+
+    def __init__(self, dataset: MappedDataset):
+        self._dataset = dataset
+
+    def __len__(self) -> int:
+        return self._dataset.rows
+
+    @overload
+    def __getitem__(self, index: int) -> bytes: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[bytes]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[bytes, List[bytes]]:
+        if isinstance(index, slice):
+            return [self._dataset.row_json(i) for i in range(*index.indices(self._dataset.rows))]
+        return self._dataset.row_json(range(self._dataset.rows)[index])
+
+
+class MappedRows(Sequence[M], Generic[M]):
+    """
+    Snapshot rows backed by a mapped file; a model is built only when its row is accessed.
+
+    Recently used models are kept in a bounded LRU (weighted by their encoded size), so a
+    long-running worker never holds the whole dataset as objects. Index builders read fields
+    through ``column`` instead (see ``app.utils.field_values``).
+    """
+
+    def __init__(self, model: Type[M], dataset: MappedDataset, cache: Optional[LRUCache] = None):
+        self.model = model
+        self.dataset = dataset
+        self.encoded = EncodedRows(dataset)
+        self.cache = cache if cache is not None else LRUCache(max_entries=1024, max_bytes=4 * 1024 * 1024)
+        self.materialized = 0
+
+    def __len__(self) -> int:
+        return self.dataset.rows
+
+    @overload
+    def __getitem__(self, index: int) -> M: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[M]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[M, List[M]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.dataset.rows))]
+        row_id = range(self.dataset.rows)[index]
+        row: Optional[M] = self.cache.get(row_id)
+        if row is None:
+            raw = self.dataset.row_json(row_id)
+            # rows were validated when the file was written
+            row = self.model.model_construct(**json.loads(raw))
+            self.materialized += 1
+            self.cache.set(row_id, row, len(raw))
+        return row
+
+    def __iter__(self) -> Iterator[M]:
+        for row_id in range(self.dataset.rows):
+            yield self[row_id]
+
+    def column(self, field: str) -> Sequence[Any]:
+        return self.dataset.column(field)
+
+    def sort_order(self, field: str, descending: bool) -> Optional[Sequence[int]]:
+        return self.dataset.sort_order(field, descending)
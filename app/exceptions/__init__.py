@@ -1,4 +1,4 @@
-from .http_errors import BadRequestError, NotFoundError
+from .http_errors import BadRequestError, InvalidCursorError, NotFoundError, NotModified
 from .validation_errors import ValidationError
 
-__all__ = ["BadRequestError", "NotFoundError", "ValidationError"]
+__all__ = ["BadRequestError", "InvalidCursorError", "NotFoundError", "NotModified", "ValidationError"]
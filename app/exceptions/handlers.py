@@ -4,7 +4,7 @@ from fastapi.responses import JSONResponse
 from starlette import status
 from starlette.responses import Response
 
-from app.exceptions import BadRequestError, NotFoundError, ValidationError
+from app.exceptions import BadRequestError, NotFoundError, NotModified, ValidationError
 
 
 def _error_response(http_status: int, code: str, message: str, details: dict | None = None) -> JSONResponse:
@@ -31,6 +31,10 @@ async def validation_error_handler(_: Request, exc: ValidationError) -> Response
     return _error_response(exc.status_code, exc.code, exc.message, exc.details)
 
 
+async def not_modified_handler(_: Request, exc: NotModified) -> Response:
+    return Response(status_code=exc.status_code, headers=exc.headers)
+
+
 async def request_validation_handler(_: Request, exc: RequestValidationError) -> Response:
     return _error_response(
         status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -8,6 +8,12 @@ class BadRequestError(Exception):
         super().__init__(message)
 
 
+class InvalidCursorError(BadRequestError):
+    """A pagination cursor that is malformed, belongs to another query, or can no longer be resumed."""
+
+    code = "ERR_INVALID_CURSOR"
+
+
 class NotFoundError(Exception):
     code = "ERR_NOT_FOUND"
     status_code = 404
@@ -16,3 +22,13 @@ class NotFoundError(Exception):
         self.message = message
         self.details = details or {}
         super().__init__(message)
+
+
+class NotModified(Exception):
+    """Short-circuits a conditional GET whose validators still match (answered with 304)."""
+
+    status_code = 304
+
+    def __init__(self, headers: dict | None = None):
+        self.headers = headers or {}
+        super().__init__("Not modified")
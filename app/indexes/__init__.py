@@ -0,0 +1,33 @@
+from . import bitset
+from .hash_index import CapitalIndex, CountryIndex, build_posting_lists, fold
+from .trigram import TrigramIndex, trigrams
+from .columns import HAS_NUMPY, NumericColumns
+from .sorting import Selection, SortIndex
+from .spatial import SpatialIndex, haversine_km
+from .graph import BorderGraph
+from .groups import AGGREGATE_FUNCTIONS, GroupKeys, Metric, aggregate
+from .iso_codes import ALPHA2_TO_ALPHA3, ALPHA3_TO_ALPHA2, code_alias
+
+__all__ = [
+    "bitset",
+    "CapitalIndex",
+    "CountryIndex",
+    "build_posting_lists",
+    "fold",
+    "TrigramIndex",
+    "trigrams",
+    "HAS_NUMPY",
+    "NumericColumns",
+    "Selection",
+    "SortIndex",
+    "SpatialIndex",
+    "haversine_km",
+    "BorderGraph",
+    "AGGREGATE_FUNCTIONS",
+    "GroupKeys",
+    "Metric",
+    "aggregate",
+    "ALPHA2_TO_ALPHA3",
+    "ALPHA3_TO_ALPHA2",
+    "code_alias",
+]
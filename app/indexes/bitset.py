@@ -0,0 +1,72 @@
+"""Row sets encoded as Python ints (bit i set <=> row i selected).
+
+Big-int AND/OR/popcount run in C, which makes ints a compact and fast bitmap
+for composing filters over a snapshot.
+"""
+
+from typing import Iterable, Iterator, List
+
+# bit offsets set in each byte value, used to decode bitsets a byte at a time
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+def full(size: int) -> int:
+    """Bitset selecting rows 0..size-1."""
+    return (1 << size) - 1
+
+
+def from_ids(ids: Iterable[int], size: int) -> int:
+    """Bitset selecting the given row ids (all < size)."""
+    buf = bytearray((size + 7) >> 3)
+    for row_id in ids:
+        buf[row_id >> 3] |= 1 << (row_id & 7)
+    return int.from_bytes(buf, "little")
+
+
+def iter_ids(bits: int) -> Iterator[int]:
+    """Ascending row ids selected by the bitset."""
+    if bits <= 0:
+        return
+    raw = bits.to_bytes((bits.bit_length() + 7) >> 3, "little")
+    for byte_index, value in enumerate(raw):
+        if value:
+            base = byte_index << 3
+            for bit in _BYTE_BITS[value]:
+                yield base + bit
+
+
+def select_range(bits: int, start: int, stop: int) -> List[int]:
+    """Row ids ranked [start, stop) among the selected rows, in ascending order."""
+    if stop <= start or bits <= 0:
+        return []
+    raw = bits.to_bytes((bits.bit_length() + 7) >> 3, "little")
+    result: List[int] = []
+    seen = 0
+    for byte_index, value in enumerate(raw):
+        if not value:
+            continue
+        offsets = _BYTE_BITS[value]
+        if seen + len(offsets) <= start:
+            seen += len(offsets)
+            continue
+        base = byte_index << 3
+        for bit in offsets:
+            if seen >= start:
+                result.append(base + bit)
+                if len(result) == stop - start:
+                    return result
+            seen += 1
+    return result
+
+
+def to_ids(bits: int) -> List[int]:
+    return list(iter_ids(bits))
+
+
+def count(bits: int) -> int:
+    """Number of selected rows."""
+    return bits.bit_count()
+
+
+def contains(bits: int, row_id: int) -> bool:
+    return (bits >> row_id) & 1 == 1
@@ -0,0 +1,85 @@
+"""Columnar numeric storage with vectorized range filters.
+
+NumPy is used when installed; otherwise columns are stdlib ``array`` objects and
+range filters are answered by bisecting a per-column sort order.
+"""
+
+import importlib
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.indexes import bitset
+from app.utils.rows import field_values
+
+try:
+    np: Any = importlib.import_module("numpy")
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+def _mask_to_bitset(mask: Any) -> int:
+    """Pack a NumPy boolean mask into a bitset."""
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+class NumericColumns:
+    """Numeric fields of a snapshot stored column-wise and aligned with row ids."""
+
+    def __init__(self, items: Sequence[Any], fields: Sequence[str], use_numpy: Optional[bool] = None):
+        self.size = len(items)
+        self.use_numpy = HAS_NUMPY if use_numpy is None else (use_numpy and HAS_NUMPY)
+        self.columns: Dict[str, Any] = {}
+        self._order: Dict[str, List[int]] = {}
+        self._sorted: Dict[str, Any] = {}
+        for field in fields:
+            values = list(field_values(items, field))
+            typecode = "q" if all(isinstance(v, int) for v in values) else "d"
+            if self.use_numpy:
+                column = np.asarray(values, dtype=np.int64 if typecode == "q" else np.float64)
+                self.columns[field] = column
+                self._sorted[field] = np.sort(column, kind="stable")
+            else:
+                self.columns[field] = array(typecode, values)
+                order = sorted(range(self.size), key=values.__getitem__)
+                self._order[field] = order
+                self._sorted[field] = array(typecode, (values[i] for i in order))
+
+    def __contains__(self, field: str) -> bool:
+        return field in self.columns
+
+    def column(self, field: str) -> Any:
+        return self.columns[field]
+
+    def count(self, field: str, min_value: Optional[float], max_value: Optional[float]) -> int:
+        """Exact number of rows within the range, in O(log n); used for selectivity estimates."""
+        ordered = self._sorted[field]
+        if self.use_numpy:
+            lo = 0 if min_value is None else int(np.searchsorted(ordered, min_value, side="left"))
+            hi = self.size if max_value is None else int(np.searchsorted(ordered, max_value, side="right"))
+        else:
+            lo = 0 if min_value is None else bisect_left(ordered, min_value)
+            hi = self.size if max_value is None else bisect_right(ordered, max_value)
+        return max(hi - lo, 0)
+
+    def range(self, field: str, min_value: Optional[float], max_value: Optional[float]) -> int:
+        """Bitset of rows with min_value <= field <= max_value (None bounds are open)."""
+        if min_value is None and max_value is None:
+            return bitset.full(self.size)
+        if self.use_numpy:
+            col = self.columns[field]
+            if min_value is None:
+                mask = col <= max_value
+            elif max_value is None:
+                mask = col >= min_value
+            else:
+                mask = (col >= min_value) & (col <= max_value)
+            return _mask_to_bitset(mask)
+        ordered = self._sorted[field]
+        lo = 0 if min_value is None else bisect_left(ordered, min_value)
+        hi = self.size if max_value is None else bisect_right(ordered, max_value)
+        if lo >= hi:
+            return 0
+        return bitset.from_ids(self._order[field][lo:hi], self.size)
@@ -0,0 +1,121 @@
+"""Country border adjacency as a compressed sparse row (CSR) graph over row ids."""
+
+from array import array
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.utils.cache import LRUCache
+
+# approximate bytes per cached row id, used as the LRU weight
+_ID_WEIGHT = 8
+
+
+class BorderGraph:
+    """
+    Undirected border graph of one snapshot.
+
+    Node ids are row ids. The neighbours of row ``r`` are ``targets[offsets[r]:offsets[r + 1]]``,
+    sorted ascending so traversals are deterministic. A border listed by either country makes
+    an edge; codes that resolve to no row (countries missing from the dataset) are dropped.
+    Connected components ("landmasses") and their members are computed once at build time.
+    Neighbour and path results are memoized in a bounded LRU: path keys grow with the square
+    of the country count, so they cannot be kept unconditionally.
+    """
+
+    def __init__(
+        self,
+        borders: Sequence[Sequence[str]],
+        resolve: Callable[[str], Optional[int]],
+        cache: Optional[LRUCache] = None,
+    ):
+        self.size = len(borders)
+        adjacency: List[Set[int]] = [set() for _ in range(self.size)]
+        for row_id, codes in enumerate(borders):
+            for code in codes:
+                other = resolve(code)
+                if other is not None and other != row_id:
+                    adjacency[row_id].add(other)
+                    adjacency[other].add(row_id)
+        self.offsets = array("I", [0])
+        self.targets = array("I")
+        for neighbours in adjacency:
+            self.targets.extend(sorted(neighbours))
+            self.offsets.append(len(self.targets))
+        self.component = self._label_components()
+        members: Dict[int, List[int]] = {}
+        for row_id, label in enumerate(self.component):
+            members.setdefault(label, []).append(row_id)
+        self._members = {label: tuple(rows) for label, rows in members.items()}
+        self.cache = cache if cache is not None else LRUCache(max_entries=4096, max_bytes=4 * 1024 * 1024)
+
+    @property
+    def edges(self) -> int:
+        return len(self.targets) // 2
+
+    def adjacent(self, row_id: int) -> Sequence[int]:
+        return self.targets[self.offsets[row_id] : self.offsets[row_id + 1]]
+
+    def _label_components(self) -> array:
+        labels = array("i", [-1]) * self.size
+        label = 0
+        for start in range(self.size):
+            if labels[start] != -1:
+                continue
+            labels[start] = label
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                for other in self.adjacent(node):
+                    if labels[other] == -1:
+                        labels[other] = label
+                        queue.append(other)
+            label += 1
+        return labels
+
+    def _bfs(self, source: int, max_depth: int, target: Optional[int] = None) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """Hop counts and BFS parents from ``source``, stopping at ``max_depth`` or on reaching ``target``."""
+        depth = {source: 0}
+        parent: Dict[int, int] = {}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            if node == target or depth[node] == max_depth:
+                continue
+            for other in self.adjacent(node):
+                if other not in depth:
+                    depth[other] = depth[node] + 1
+                    parent[other] = node
+                    if other == target:
+                        return depth, parent
+                    queue.append(other)
+        return depth, parent
+
+    def neighbors(self, row_id: int, depth: int = 1) -> Tuple[Tuple[int, int], ...]:
+        """``(row_id, hops)`` of every country within ``depth`` border crossings, nearest first."""
+        key = ("neighbors", row_id, depth)
+        cached: Optional[Tuple[Tuple[int, int], ...]] = self.cache.get(key)
+        if cached is None:
+            hops, _ = self._bfs(row_id, depth)
+            ordered = sorted((distance, other) for other, distance in hops.items() if other != row_id)
+            cached = tuple((other, distance) for distance, other in ordered)
+            self.cache.set(key, cached, _ID_WEIGHT * 2 * (len(cached) + 1))
+        return cached
+
+    def path(self, source: int, target: int) -> Optional[Tuple[int, ...]]:
+        """Row ids of a shortest border path from ``source`` to ``target`` (inclusive), or None."""
+        if self.component[source] != self.component[target]:
+            return None
+        key = ("path", source, target)
+        cached: Optional[Tuple[int, ...]] = self.cache.get(key)
+        if cached is None:
+            _, parent = self._bfs(source, self.size, target)
+            route = [target]
+            while route[-1] != source:
+                route.append(parent[route[-1]])
+            cached = tuple(reversed(route))
+            self.cache.set(key, cached, _ID_WEIGHT * (len(cached) + 1))
+        return cached
+
+    def landmass(self, row_id: int) -> Tuple[int, ...]:
+        """Row ids connected to ``row_id`` by land borders, itself included, in row order."""
+        return self._members[self.component[row_id]]
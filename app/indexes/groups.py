@@ -0,0 +1,172 @@
+"""Factorized group keys and vectorized group-by aggregation over numeric columns.
+
+Each groupable field is dictionary-encoded once per snapshot: labels get dense codes in
+first-seen order and rows point into a CSR code list, so list-valued fields (languages,
+currencies) are exploded into one (row, label) pair per element. With NumPy, composite
+keys are re-factorized with ``unique`` after each field and metrics are ``bincount`` /
+``reduceat`` passes over the rows sorted by group; without it a dict-based loop gives the
+same result.
+"""
+
+import importlib
+from array import array
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.indexes import bitset
+
+try:
+    np: Any = importlib.import_module("numpy")
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+
+HAS_NUMPY = np is not None
+
+AGGREGATE_FUNCTIONS = ("count", "sum", "avg", "min", "max")
+
+
+class GroupKeys:
+    """Dictionary-encoded values of one text or list-of-text field, aligned with row ids."""
+
+    def __init__(self, values: Sequence[Any]):
+        self.labels: List[str] = []
+        lookup: Dict[str, int] = {}
+        self.offsets = array("I", [0])
+        self.codes = array("I")
+        for value in values:
+            for label in (value,) if isinstance(value, str) else value:
+                code = lookup.get(label)
+                if code is None:
+                    code = lookup[label] = len(self.labels)
+                    self.labels.append(label)
+                self.codes.append(code)
+            self.offsets.append(len(self.codes))
+        self.size = len(self.offsets) - 1
+        # one code per row: no explosion needed
+        self.single = len(self.codes) == self.size and all(
+            self.offsets[i + 1] - self.offsets[i] == 1 for i in range(self.size)
+        )
+        if HAS_NUMPY:
+            self.np_offsets = np.frombuffer(self.offsets, dtype=np.uint32).astype(np.int64)
+            self.np_codes = np.frombuffer(self.codes, dtype=np.uint32).astype(np.int64)
+
+    def row_codes(self, row_id: int) -> Sequence[int]:
+        return self.codes[self.offsets[row_id] : self.offsets[row_id + 1]]
+
+
+class Metric(NamedTuple):
+    """One aggregate, e.g. ``sum(population)``; ``count()`` has no field."""
+
+    function: str
+    field: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return f"{self.function}({self.field or ''})"
+
+
+def aggregate(
+    selected: int,
+    keys: Sequence[GroupKeys],
+    columns: Dict[str, Any],
+    metrics: Sequence[Metric],
+    use_numpy: Optional[bool] = None,
+) -> List[Tuple[Tuple[str, ...], List[Any]]]:
+    """
+    ``(labels, values)`` per group of the rows in the ``selected`` bitset, in key order.
+
+    Groups are ordered by the first-seen order of each key field in turn; rows without a
+    value for a list field (an empty list) belong to no group.
+    """
+    use_numpy = HAS_NUMPY if use_numpy is None else (use_numpy and HAS_NUMPY)
+    if use_numpy:
+        return _aggregate_numpy(selected, keys, columns, metrics)
+    return _aggregate_python(selected, keys, columns, metrics)
+
+
+def _field(metric: Metric) -> str:
+    if metric.field is None:
+        raise ValueError(f"{metric.function}() needs a numeric field")
+    return metric.field
+
+
+def _selected_rows(selected: int, size: int) -> Any:
+    packed = np.frombuffer(selected.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(packed, bitorder="little")[:size])
+
+
+def _aggregate_numpy(
+    selected: int, keys: Sequence[GroupKeys], columns: Dict[str, Any], metrics: Sequence[Metric]
+) -> List[Tuple[Tuple[str, ...], List[Any]]]:
+    rows = _selected_rows(selected, keys[0].size)
+    group = np.zeros(len(rows), dtype=np.int64)
+    key_codes: List[Any] = []
+    for key in keys:
+        starts = key.np_offsets[rows]
+        if key.single:
+            codes = key.np_codes[starts]
+        else:
+            # explode: repeat every (row, group) once per element of the row's list
+            counts = key.np_offsets[rows + 1] - starts
+            source = np.repeat(np.arange(len(rows)), counts)
+            within = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+            codes = key.np_codes[starts[source] + within]
+            rows, group = rows[source], group[source]
+            key_codes = [previous[source] for previous in key_codes]
+        key_codes.append(codes)
+        # dense composite codes keep the next multiplication small
+        _, group = np.unique(group * len(key.labels) + codes, return_inverse=True)
+        group = group.reshape(-1)
+    if len(rows) == 0:
+        return []
+
+    order = np.argsort(group, kind="stable")
+    sorted_group = group[order]
+    bounds = np.flatnonzero(np.concatenate(([True], sorted_group[1:] != sorted_group[:-1])))
+    first = order[bounds]
+    counts = np.bincount(group)
+    results: List[List[Any]] = []
+    for metric in metrics:
+        if metric.function == "count":
+            results.append(counts.tolist())
+            continue
+        values = np.asarray(columns[_field(metric)])[rows][order]
+        if metric.function == "min":
+            results.append(np.minimum.reduceat(values, bounds).tolist())
+        elif metric.function == "max":
+            results.append(np.maximum.reduceat(values, bounds).tolist())
+        else:
+            sums = np.add.reduceat(values, bounds)
+            results.append(sums.tolist() if metric.function == "sum" else (sums / counts).tolist())
+    labels = [[key.labels[c] for c in codes[first].tolist()] for key, codes in zip(keys, key_codes)]
+    return [(tuple(column[i] for column in labels), [column[i] for column in results]) for i in range(len(bounds))]
+
+
+def _aggregate_python(
+    selected: int, keys: Sequence[GroupKeys], columns: Dict[str, Any], metrics: Sequence[Metric]
+) -> List[Tuple[Tuple[str, ...], List[Any]]]:
+    groups: Dict[Tuple[int, ...], List[int]] = {}
+    for row_id in bitset.iter_ids(selected):
+        combos: List[Tuple[int, ...]] = [()]
+        for key in keys:
+            combos = [combo + (code,) for combo in combos for code in key.row_codes(row_id)]
+        for combo in combos:
+            groups.setdefault(combo, []).append(row_id)
+    output = []
+    for combo in sorted(groups):
+        members = groups[combo]
+        values: List[Any] = []
+        for metric in metrics:
+            if metric.function == "count":
+                values.append(len(members))
+                continue
+            column = [columns[_field(metric)][row_id] for row_id in members]
+            if metric.function == "min":
+                values.append(min(column))
+            elif metric.function == "max":
+                values.append(max(column))
+            elif metric.function == "sum":
+                values.append(sum(column))
+            else:
+                values.append(sum(column) / len(column))
+        output.append((tuple(key.labels[code] for key, code in zip(keys, combo)), values))
+    return output
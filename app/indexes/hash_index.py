@@ -0,0 +1,98 @@
+"""Case-folded hash indexes built once per dataset snapshot."""
+
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from app.indexes import bitset
+from app.indexes.iso_codes import code_alias
+from app.utils.rows import field_values
+from app.models import CapitalModel, CountryModel
+
+T = TypeVar("T")
+
+PostingLists = Dict[str, Tuple[int, ...]]
+
+EMPTY: Tuple[int, ...] = ()
+
+
+def fold(value: str) -> str:
+    """Normalize a lookup key (trimmed, case-folded)."""
+    return value.strip().casefold()
+
+
+def build_posting_lists(items: Sequence[T], getter: Callable[[T], Iterable[str]]) -> PostingLists:
+    """Map every folded key to the ascending row ids of items carrying it."""
+    postings: Dict[str, List[int]] = {}
+    for row_id, item in enumerate(items):
+        seen = set()
+        for value in getter(item):
+            key = fold(value)
+            if key in seen:
+                continue
+            seen.add(key)
+            postings.setdefault(key, []).append(row_id)
+    return {key: tuple(ids) for key, ids in postings.items()}
+
+
+class CountryIndex:
+    """Code, region, subregion, language and currency lookups for one snapshot."""
+
+    def __init__(self, countries: Sequence[CountryModel]):
+        self.by_code: Dict[str, int] = {}
+        for row_id, country_code in enumerate(field_values(countries, "country_code")):
+            self.by_code.setdefault(fold(country_code), row_id)
+        # aliases never shadow a code that exists verbatim in the dataset
+        for code, row_id in list(self.by_code.items()):
+            alias = code_alias(code)
+            if alias is not None:
+                self.by_code.setdefault(fold(alias), row_id)
+
+        self.by_region = build_posting_lists(field_values(countries, "region"), lambda region: (region,))
+        self.by_subregion = build_posting_lists(field_values(countries, "subregion"), lambda subregion: (subregion,))
+        self.by_language = build_posting_lists(field_values(countries, "languages"), lambda languages: languages)
+        self.by_currency = build_posting_lists(field_values(countries, "currencies"), lambda currencies: currencies)
+        self.size = len(countries)
+        self._bits: Dict[Tuple[str, str], int] = {}
+
+    def code(self, code: str) -> Optional[int]:
+        """Row id for an alpha-2 or alpha-3 code, or None."""
+        return self.by_code.get(fold(code))
+
+    def region(self, region: str) -> Tuple[int, ...]:
+        return self.by_region.get(fold(region), EMPTY)
+
+    def subregion(self, subregion: str) -> Tuple[int, ...]:
+        return self.by_subregion.get(fold(subregion), EMPTY)
+
+    def language(self, language: str) -> Tuple[int, ...]:
+        return self.by_language.get(fold(language), EMPTY)
+
+    def currency(self, currency: str) -> Tuple[int, ...]:
+        return self.by_currency.get(fold(currency), EMPTY)
+
+    def postings(self, kind: str, value: str) -> Tuple[int, ...]:
+        """Posting list for ``kind`` in region/subregion/language/currency."""
+        return getattr(self, f"by_{kind}").get(fold(value), EMPTY)
+
+    def bits(self, kind: str, value: str) -> int:
+        """Posting list as a bitset, memoized per key for the life of the snapshot."""
+        key = (kind, fold(value))
+        cached = self._bits.get(key)
+        if cached is None:
+            postings = self.postings(kind, value)
+            if not postings:
+                return 0
+            cached = bitset.from_ids(postings, self.size)
+            self._bits[key] = cached
+        return cached
+
+
+class CapitalIndex:
+    """Name lookups for one capital snapshot."""
+
+    def __init__(self, capitals: Sequence[CapitalModel]):
+        self.by_name: Dict[str, int] = {}
+        for row_id, name in enumerate(field_values(capitals, "name")):
+            self.by_name.setdefault(fold(name), row_id)
+
+    def name(self, name: str) -> Optional[int]:
+        return self.by_name.get(fold(name))
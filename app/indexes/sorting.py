@@ -0,0 +1,236 @@
+"""Pre-sorted row permutations per field for sort + paginate and top-k."""
+
+import heapq
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union, overload
+
+from app.indexes import bitset
+from app.indexes.columns import np
+from app.utils.rows import RowView, field_values
+
+T = TypeVar("T")
+
+
+class SortIndex:
+    """
+    Ascending and descending row permutations for every sortable field of a snapshot.
+
+    Ties keep dataset order in both directions, exactly like ``sorted(..., reverse=...)``.
+    Row sequences exposing ``sort_order`` (compiled snapshot files) supply the permutations
+    precomputed, and only the ranks are derived here.
+    """
+
+    def __init__(self, items: Sequence[Any], fields: Sequence[str]):
+        self.size = len(items)
+        self._orders: Dict[Tuple[str, bool], array] = {}
+        self._ranks: Dict[Tuple[str, bool], array] = {}
+        precomputed = getattr(items, "sort_order", None)
+        for field in fields:
+            values: Optional[List[Any]] = None
+            for descending in (False, True):
+                stored = precomputed(field, descending) if precomputed is not None else None
+                if stored is not None:
+                    order = array("I", stored)
+                else:
+                    if values is None:
+                        values = list(field_values(items, field))
+                    order = array("I", sorted(range(self.size), key=values.__getitem__, reverse=descending))
+                rank = array("I", bytes(4 * self.size))
+                for position, row_id in enumerate(order):
+                    rank[row_id] = position
+                self._orders[(field, descending)] = order
+                self._ranks[(field, descending)] = rank
+
+    def __contains__(self, field: str) -> bool:
+        return (field, False) in self._orders
+
+    def order(self, field: str, descending: bool = False) -> array:
+        """Row ids in sort order."""
+        return self._orders[(field, descending)]
+
+    def rank(self, field: str, descending: bool = False) -> array:
+        """Position of every row id within ``order(field, descending)``."""
+        return self._ranks[(field, descending)]
+
+    def top(self, field: str, descending: bool, limit: int) -> List[int]:
+        """First ``limit`` row ids in sort order."""
+        return list(self._orders[(field, descending)][:limit])
+
+    def select(self, field: str, descending: bool, selected: int, start: int, stop: int) -> List[int]:
+        """
+        Row ids at sorted positions [start, stop) among the rows selected by a bitset.
+
+        Sparse selections are ranked with a bounded heap; dense ones walk the
+        permutation (vectorized with NumPy when available) until the page is filled.
+        """
+        order = self._orders[(field, descending)]
+        if stop <= start or selected == 0:
+            return []
+        if selected == bitset.full(self.size):
+            return list(order[start:stop])
+        matched = bitset.count(selected)
+        if matched * 16 <= self.size:
+            rank = self._ranks[(field, descending)]
+            return heapq.nsmallest(stop, bitset.iter_ids(selected), key=rank.__getitem__)[start:]
+        if np is not None:
+            perm = np.frombuffer(order, dtype=np.uint32)
+            return perm[self._mask(selected)[perm]][start:stop].tolist()
+        raw_bytes = selected.to_bytes((self.size + 7) >> 3, "little")
+        result: List[int] = []
+        seen = 0
+        for row_id in order:
+            if raw_bytes[row_id >> 3] >> (row_id & 7) & 1:
+                if seen >= start:
+                    result.append(row_id)
+                    if len(result) == stop - start:
+                        break
+                seen += 1
+        return result
+
+    def select_from(self, field: str, descending: bool, selected: int, position: int, limit: int) -> List[int]:
+        """
+        First ``limit`` selected row ids at sorted positions >= ``position``.
+
+        Used to resume keyset pagination without counting the rows that came before.
+        """
+        order = self._orders[(field, descending)]
+        if limit <= 0 or selected == 0 or position >= self.size:
+            return []
+        if selected == bitset.full(self.size):
+            return list(order[position : position + limit])
+        if bitset.count(selected) * 16 <= self.size:
+            rank = self._ranks[(field, descending)]
+            following = (row_id for row_id in bitset.iter_ids(selected) if rank[row_id] >= position)
+            return heapq.nsmallest(limit, following, key=rank.__getitem__)
+        if np is not None:
+            perm = np.frombuffer(order, dtype=np.uint32)[position:]
+            return perm[self._mask(selected)[perm]][:limit].tolist()
+        raw_bytes = selected.to_bytes((self.size + 7) >> 3, "little")
+        result: List[int] = []
+        for row_id in order[position:]:
+            if raw_bytes[row_id >> 3] >> (row_id & 7) & 1:
+                result.append(row_id)
+                if len(result) == limit:
+                    break
+        return result
+
+    def seek(self, field: str, descending: bool, values: Sequence[Any], key: Any) -> int:
+        """Sorted position of the first row whose ``values`` entry sorts strictly after ``key``."""
+        order = self._orders[(field, descending)]
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = values[order[mid]]
+            if (value < key) if descending else (value > key):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _mask(self, selected: int) -> Any:
+        raw = np.frombuffer(selected.to_bytes((self.size + 7) >> 3, "little"), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder="little")[: self.size].astype(bool)
+
+    def iter_selected(self, field: str, descending: bool, selected: int) -> Iterator[int]:
+        """Lazily yield the selected row ids in sort order, holding nothing beyond the bitset."""
+        order = self._orders[(field, descending)]
+        if selected == bitset.full(self.size):
+            yield from order
+            return
+        raw_bytes = selected.to_bytes((self.size + 7) >> 3, "little")
+        for row_id in order:
+            if raw_bytes[row_id >> 3] >> (row_id & 7) & 1:
+                yield row_id
+
+
+class Selection(Sequence[T]):
+    """
+    Sequence of the rows selected by a bitset, in sort order, whose pages are computed on demand.
+
+    Without a sort field rows come in dataset order. ``len()`` is a popcount and slicing
+    materializes only the requested rows, so ``paginate_items`` never sorts or copies
+    the full match set.
+    """
+
+    def __init__(
+        self,
+        items: Sequence[T],
+        selected: int,
+        sort_index: Optional[SortIndex] = None,
+        field: Optional[str] = None,
+        descending: bool = False,
+    ):
+        self.items = items
+        self.selected = selected
+        self.sort_index = sort_index
+        self.field = field
+        self.descending = descending
+        self._count = bitset.count(selected)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def ids(self, start: int, stop: int) -> List[int]:
+        """Row ids at positions [start, stop) of the selection."""
+        if self.sort_index is None or self.field is None:
+            return bitset.select_range(self.selected, start, stop)
+        return self.sort_index.select(self.field, self.descending, self.selected, start, stop)
+
+    def ids_from(self, position: int, limit: int) -> List[int]:
+        """
+        Up to ``limit`` row ids starting at a keyset ``position``.
+
+        The position indexes the sort permutation, or is a row id when rows come in dataset order.
+        """
+        if self.sort_index is None or self.field is None:
+            return bitset.select_range(self.selected >> position << position, 0, limit)
+        return self.sort_index.select_from(self.field, self.descending, self.selected, position, limit)
+
+    def position_after(self, row_id: int) -> int:
+        """Keyset position just past ``row_id`` (which need not be selected)."""
+        if self.sort_index is None or self.field is None:
+            return row_id + 1
+        return self.sort_index.rank(self.field, self.descending)[row_id] + 1
+
+    def seek(self, key: Any) -> int:
+        """
+        Keyset position just past a row from another snapshot, located by its sort key.
+
+        Rows sharing that key are skipped. Dataset order has no key to seek by.
+        """
+        if self.sort_index is None or self.field is None:
+            raise TypeError("seek needs a sorted selection")
+        values = field_values(self.items, self.field)
+        return self.sort_index.seek(self.field, self.descending, values, key)
+
+    def sort_key(self, row_id: int) -> Any:
+        """Sort field value of a row (``None`` in dataset order)."""
+        if self.field is None:
+            return None
+        return getattr(self.items[row_id], self.field)
+
+    def iter_ids(self) -> Iterator[int]:
+        """All selected row ids in order, produced lazily (used for streaming exports)."""
+        if self.sort_index is None or self.field is None:
+            return bitset.iter_ids(self.selected)
+        return self.sort_index.iter_selected(self.field, self.descending, self.selected)
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> RowView[T]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, RowView[T]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            ids = self.ids(start, stop)
+            return RowView(self.items, ids[::step] if step != 1 else ids)
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self.items[self.ids(index, index + 1)[0]]
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self[:])
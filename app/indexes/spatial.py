@@ -0,0 +1,150 @@
+"""
+k-d tree over points on the unit sphere for radius and nearest-neighbour queries.
+
+Latitude/longitude pairs are mapped to 3-D unit vectors. The straight-line (chord) distance
+between two unit vectors grows monotonically with their great-circle distance, so the tree
+prunes with cheap Euclidean plane tests and still returns exactly the rows a haversine scan
+would, ordered the same way. Reported distances are haversine kilometres.
+"""
+
+import heapq
+import math
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+_LEAF_SIZE = 8
+# chord comparisons are widened by this much; candidates are then checked with haversine
+_EPSILON = 1e-12
+
+
+def to_unit_vector(lat: float, lng: float) -> Tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lng)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi))
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lam = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def chord_for_km(distance_km: float) -> float:
+    """Chord length on the unit sphere for a great-circle distance (capped at the diameter)."""
+    angle = min(distance_km / EARTH_RADIUS_KM, math.pi)
+    return 2 * math.sin(angle / 2)
+
+
+class SpatialIndex:
+    """
+    Static k-d tree over the (lat, lng) of every row, stored implicitly in one permutation.
+
+    The node for a row range ``[lo, hi)`` is its median ``(lo + hi) // 2``, split on
+    ``depth % 3``; ranges of at most ``_LEAF_SIZE`` rows are scanned directly.
+    """
+
+    def __init__(self, lats: Sequence[float], lngs: Sequence[float]):
+        self.size = len(lats)
+        self._lats = array("d", lats)
+        self._lngs = array("d", lngs)
+        vectors = [to_unit_vector(lat, lng) for lat, lng in zip(self._lats, self._lngs)]
+        self._coords = tuple(array("d", (v[axis] for v in vectors)) for axis in range(3))
+        self._perm = array("I", range(self.size))
+        self._build()
+
+    def _build(self) -> None:
+        stack = [(0, self.size, 0)]
+        perm = self._perm
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= _LEAF_SIZE:
+                continue
+            coord = self._coords[depth % 3]
+            perm[lo:hi] = array("I", sorted(perm[lo:hi], key=coord.__getitem__))
+            mid = (lo + hi) // 2
+            stack.append((lo, mid, depth + 1))
+            stack.append((mid + 1, hi, depth + 1))
+
+    def _chord_sq(self, row_id: int, point: Tuple[float, float, float]) -> float:
+        x, y, z = self._coords
+        dx, dy, dz = x[row_id] - point[0], y[row_id] - point[1], z[row_id] - point[2]
+        return dx * dx + dy * dy + dz * dz
+
+    def _distance(self, row_id: int, lat: float, lng: float) -> float:
+        return haversine_km(lat, lng, self._lats[row_id], self._lngs[row_id])
+
+    def within(self, lat: float, lng: float, radius_km: float) -> List[Tuple[float, int]]:
+        """``(distance_km, row_id)`` of every row within ``radius_km``, nearest first."""
+        point = to_unit_vector(lat, lng)
+        limit = (chord_for_km(radius_km) + _EPSILON) ** 2
+        perm, coords = self._perm, self._coords
+        found: List[Tuple[float, int]] = []
+        stack = [(0, self.size, 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= _LEAF_SIZE:
+                for row_id in perm[lo:hi]:
+                    if self._chord_sq(row_id, point) <= limit:
+                        found.append((self._distance(row_id, lat, lng), row_id))
+                continue
+            mid = (lo + hi) // 2
+            row_id = perm[mid]
+            if self._chord_sq(row_id, point) <= limit:
+                found.append((self._distance(row_id, lat, lng), row_id))
+            diff = point[depth % 3] - coords[depth % 3][row_id]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            if diff * diff <= limit:
+                stack.append((far[0], far[1], depth + 1))
+            stack.append((near[0], near[1], depth + 1))
+        found.sort()
+        return [(distance, row_id) for distance, row_id in found if distance <= radius_km]
+
+    def nearest(self, lat: float, lng: float, k: int, radius_km: Optional[float] = None) -> List[Tuple[float, int]]:
+        """Up to ``k`` ``(distance_km, row_id)`` pairs, nearest first, optionally within ``radius_km``."""
+        if k <= 0 or self.size == 0:
+            return []
+        point = to_unit_vector(lat, lng)
+        bound = (chord_for_km(radius_km) + _EPSILON) ** 2 if radius_km is not None else math.inf
+        perm, coords = self._perm, self._coords
+        # max-heap of (-chord_sq, -row_id): the worst kept candidate is on top
+        best: List[Tuple[float, int]] = []
+
+        def consider(row_id: int) -> None:
+            dist_sq = self._chord_sq(row_id, point)
+            if dist_sq > bound:
+                return
+            entry = (-dist_sq, -row_id)
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+
+        def worst() -> float:
+            return -best[0][0] if len(best) == k else bound
+
+        # entries carry the squared distance to the splitting plane that separates them from the
+        # query; a subtree is skipped when popped if the k-th best found so far is already closer
+        stack = [(0, self.size, 0, 0.0)]
+        while stack:
+            lo, hi, depth, plane_sq = stack.pop()
+            if plane_sq > worst():
+                continue
+            if hi - lo <= _LEAF_SIZE:
+                for row_id in perm[lo:hi]:
+                    consider(row_id)
+                continue
+            mid = (lo + hi) // 2
+            row_id = perm[mid]
+            consider(row_id)
+            diff = point[depth % 3] - coords[depth % 3][row_id]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            stack.append((far[0], far[1], depth + 1, diff * diff))
+            stack.append((near[0], near[1], depth + 1, plane_sq))
+        results = sorted((self._distance(-neg_id, lat, lng), -neg_id) for _, neg_id in best)
+        if radius_km is not None:
+            results = [(distance, row_id) for distance, row_id in results if distance <= radius_km]
+        return results
@@ -0,0 +1,88 @@
+"""Trigram inverted index for accent- and case-insensitive substring search."""
+
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Set
+
+from app.utils.search import fold_text
+
+FIELD_SEPARATOR = "\x00"
+MIN_GRAM = 3
+
+
+def trigrams(text: str) -> Set[str]:
+    """Distinct 3-character substrings of already-folded text."""
+    return {text[i : i + MIN_GRAM] for i in range(len(text) - MIN_GRAM + 1)}
+
+
+def _intersect(small: Sequence[int], large: Sequence[int]) -> List[int]:
+    """Intersect two ascending id sequences, probing the larger one by bisection."""
+    result: List[int] = []
+    hi = len(large)
+    lo = 0
+    for row_id in small:
+        lo = bisect_left(large, row_id, lo, hi)
+        if lo == hi:
+            break
+        if large[lo] == row_id:
+            result.append(row_id)
+    return result
+
+
+class TrigramIndex:
+    """
+    Posting lists of row ids per trigram over one or more text fields per row.
+
+    Candidates from the rarest trigrams are verified with a containment check on the
+    folded text, so results are exact; queries shorter than three characters fall back
+    to a scan over the pre-folded strings.
+    """
+
+    def __init__(self, rows: Sequence[Sequence[str]]):
+        self.texts: List[str] = [FIELD_SEPARATOR.join(fold_text(value) for value in fields) for fields in rows]
+        postings: Dict[str, array] = {}
+        for row_id, fields in enumerate(rows):
+            grams: Set[str] = set()
+            for value in fields:
+                grams |= trigrams(fold_text(value))
+            for gram in grams:
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                posting.append(row_id)
+        self.postings = postings
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def estimate(self, query: str) -> int:
+        """Upper bound on matches: the rarest query trigram's posting length (or all rows for short queries)."""
+        q = fold_text(query)
+        if len(q) < MIN_GRAM:
+            return len(self.texts)
+        return min((len(self.postings.get(gram, ())) for gram in trigrams(q)), default=0)
+
+    def search(self, query: str) -> List[int]:
+        """Ascending row ids whose folded fields contain the folded query."""
+        q = fold_text(query)
+        if not q:
+            return list(range(len(self.texts)))
+        texts = self.texts
+        if len(q) < MIN_GRAM:
+            return [row_id for row_id, text in enumerate(texts) if q in text]
+
+        lists = []
+        for gram in trigrams(q):
+            posting = self.postings.get(gram)
+            if posting is None:
+                return []
+            lists.append(posting)
+        lists.sort(key=len)
+
+        candidates: Sequence[int] = lists[0]
+        for posting in lists[1:]:
+            # once the candidate set is small, verifying beats further intersections
+            if len(candidates) <= 32:
+                break
+            candidates = _intersect(candidates, posting)
+        return [row_id for row_id in candidates if q in texts[row_id]]
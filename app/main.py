@@ -1,17 +1,23 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 
+from app.core.compression import CompressionMiddleware
 from app.core.logging import RequestLoggingMiddleware, configure_logging
 from app.core.security import RateLimiterMiddleware, SecurityHeadersMiddleware, configure_cors
 from app.config.settings import get_settings
-from app.exceptions import BadRequestError, NotFoundError, ValidationError
+from app.exceptions import BadRequestError, NotFoundError, NotModified, ValidationError
 from app.exceptions.handlers import (
     bad_request_handler,
     not_found_handler,
+    not_modified_handler,
     request_validation_handler,
     unhandled_exception_handler,
     validation_error_handler,
 )
+from app.repositories import SnapshotWatcher
 from app.routes import api_router
 from schemas import ResponseSchema
 
@@ -20,6 +26,17 @@ def create_app() -> FastAPI:
     settings = get_settings()
     configure_logging()
 
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        watcher = SnapshotWatcher(settings.data_reload_interval) if settings.data_reload_interval > 0 else None
+        if watcher is not None:
+            watcher.start()
+        try:
+            yield
+        finally:
+            if watcher is not None:
+                await watcher.stop()
+
     app = FastAPI(
         title=settings.app_name,
         description=settings.description,
@@ -31,12 +48,16 @@ def create_app() -> FastAPI:
             {"name": "Capitals", "description": "Capital city data with search and lookup."},
             {"name": "Statistics", "description": "Aggregated analytics over countries and capitals."},
         ],
+        lifespan=lifespan,
     )
 
+    # Innermost first: compression sees the route's response (and its ETag) directly;
+    # 429s from the limiter still get CORS, security headers, request IDs and logging.
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(RateLimiterMiddleware)
     configure_cors(app)
-    app.add_middleware(RequestLoggingMiddleware)
     app.add_middleware(SecurityHeadersMiddleware)
-    app.add_middleware(RateLimiterMiddleware)
+    app.add_middleware(RequestLoggingMiddleware)
 
     app.include_router(api_router)
 
@@ -51,6 +72,7 @@ def create_app() -> FastAPI:
         return ResponseSchema(status="success", data={"status": "ok"}, meta=None, error=None)
 
     # Exception handlers
+    app.add_exception_handler(NotModified, not_modified_handler)  # type: ignore[arg-type]
     app.add_exception_handler(NotFoundError, not_found_handler)  # type: ignore[arg-type]
     app.add_exception_handler(BadRequestError, bad_request_handler)  # type: ignore[arg-type]
     app.add_exception_handler(ValidationError, validation_error_handler)  # type: ignore[arg-type]
@@ -1,15 +1,18 @@
 from .country_model import CountryModel
 from .capital_model import CapitalModel
-from .pagination_model import PaginationModel, PaginationMetaModel
+from .pagination_model import PaginationModel, PaginationMetaModel, CursorMetaModel
 from .search_model import SearchModel
 from .response_model import ResponseModel, ErrorDetailModel
+from .batch_model import BatchMetaModel
 
 __all__ = [
     "CountryModel",
     "CapitalModel",
     "PaginationModel",
     "PaginationMetaModel",
+    "CursorMetaModel",
     "SearchModel",
     "ResponseModel",
     "ErrorDetailModel",
+    "BatchMetaModel",
 ]
@@ -0,0 +1,18 @@
+"""Domain model for batch lookup results."""
+
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class BatchMetaModel(BaseModel):
+    """Metadata returned with batch lookups: how many keys resolved and which did not."""
+
+    model_config = ConfigDict(
+        extra="forbid",
+        json_schema_extra={"example": {"requested": 3, "found": 2, "missing": ["XX"]}},
+    )
+
+    requested: int = Field(..., ge=0, description="Distinct keys requested.")
+    found: int = Field(..., ge=0, description="Items returned.")
+    missing: List[str] = Field(default_factory=list, description="Requested keys that matched nothing, in request order.")
@@ -1,6 +1,8 @@
 """Domain pagination models for reuse in services and repositories."""
 
 from math import ceil
+from typing import Optional
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -35,3 +37,16 @@ class PaginationMetaModel(BaseModel):
     def from_counts(cls, page: int, size: int, total_items: int) -> "PaginationMetaModel":
         total_pages = ceil(total_items / size) if size else 0
         return cls(page=page, size=size, total_items=total_items, total_pages=total_pages)
+
+
+class CursorMetaModel(BaseModel):
+    """Keyset pagination metadata: the cursor to send for the next page."""
+
+    model_config = ConfigDict(
+        extra="forbid",
+        json_schema_extra={"example": {"size": 10, "total_items": 250, "next_cursor": "WyI0ZjJh..."}},
+    )
+
+    size: int = Field(..., description="Page size.")
+    total_items: int = Field(..., ge=0, description="Total matched items.")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page (null on the last page).")
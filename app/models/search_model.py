@@ -36,5 +36,12 @@ class SearchModel(BaseModel):
     max_area: Optional[float] = Field(None, ge=0, description="Maximum area.")
     language: Optional[str] = Field(None, description="Language filter.")
     currency: Optional[str] = Field(None, description="Currency filter.")
+    min_lat: Optional[float] = Field(None, ge=-90, le=90, description="Minimum centroid latitude.")
+    max_lat: Optional[float] = Field(None, ge=-90, le=90, description="Maximum centroid latitude.")
+    min_lng: Optional[float] = Field(None, ge=-180, le=180, description="Western centroid longitude bound (may exceed max_lng to wrap the antimeridian).")
+    max_lng: Optional[float] = Field(None, ge=-180, le=180, description="Eastern centroid longitude bound.")
+    near_lat: Optional[float] = Field(None, ge=-90, le=90, description="Latitude of the point for within_km.")
+    near_lng: Optional[float] = Field(None, ge=-180, le=180, description="Longitude of the point for within_km.")
+    within_km: Optional[float] = Field(None, gt=0, description="Max great-circle distance from (near_lat, near_lng) in km.")
     sort_by: Optional[str] = Field(None, description="Field to sort by.")
     order: Literal["asc", "desc"] = Field("asc", description="Sort order.")
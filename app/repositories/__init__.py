@@ -1,4 +1,27 @@
+from .snapshot import (
+    DatasetSnapshot,
+    SnapshotStore,
+    add_swap_listener,
+    clear_snapshot_stores,
+    compile_snapshot,
+    compiled_path,
+    get_snapshot_store,
+    iter_snapshot_stores,
+)
+from .watcher import SnapshotWatcher
 from .country_repository import CountryRepository
 from .capital_repository import CapitalRepository
 
-__all__ = ["CountryRepository", "CapitalRepository"]
+__all__ = [
+    "DatasetSnapshot",
+    "SnapshotStore",
+    "SnapshotWatcher",
+    "add_swap_listener",
+    "clear_snapshot_stores",
+    "compile_snapshot",
+    "compiled_path",
+    "get_snapshot_store",
+    "iter_snapshot_stores",
+    "CountryRepository",
+    "CapitalRepository",
+]
@@ -1,12 +1,14 @@
 """Repository layer for capitals: handles data loading and basic access."""
 
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from app.core.logging import get_logger
 from app.exceptions import BadRequestError
+from app.indexes import CapitalIndex, SortIndex, SpatialIndex, TrigramIndex
 from app.models import CapitalModel
-from app.utils import load_json_data
+from app.repositories.snapshot import DatasetSnapshot, get_snapshot_store
+from app.utils import RowView, field_values
 
 
 CAPITAL_REQUIRED_KEYS = ["name", "country", "population", "lat", "lng"]
@@ -17,18 +19,48 @@ class CapitalRepository:
 
     def __init__(self, data_path: Path):
         self.data_path = data_path
+        self.store = get_snapshot_store(data_path, CapitalModel, CAPITAL_REQUIRED_KEYS)
         self.logger = get_logger("atlas.repository.capital")
+        self._snapshot: Optional[DatasetSnapshot[CapitalModel]] = None
 
-    def _load(self) -> List[CapitalModel]:
+    @property
+    def snapshot(self) -> DatasetSnapshot[CapitalModel]:
+        """Process-wide snapshot, pinned for the lifetime of this repository instance."""
+        if self._snapshot is None:
+            self._snapshot = self._load()
+        return self._snapshot
+
+    @property
+    def index(self) -> CapitalIndex:
+        """Hash indexes for the pinned snapshot, built once per snapshot."""
+        return self.snapshot.derive("capital_index", CapitalIndex)
+
+    @property
+    def text_index(self) -> TrigramIndex:
+        """Trigram index over capital names, built once per snapshot."""
+        return self.snapshot.derive("capital_text_index", lambda items: TrigramIndex([(name,) for name in field_values(items, "name")]))
+
+    @property
+    def sort_index(self) -> SortIndex:
+        """Ascending/descending permutations for every CapitalModel field, built once per snapshot."""
+        return self.snapshot.derive("capital_sort_index", lambda items: SortIndex(items, list(CapitalModel.model_fields)))
+
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        """k-d tree over capital coordinates, built once per snapshot."""
+        return self.snapshot.derive(
+            "capital_spatial_index", lambda items: SpatialIndex(field_values(items, "lat"), field_values(items, "lng"))
+        )
+
+    def _load(self) -> DatasetSnapshot[CapitalModel]:
         """
-        Load and validate capital data from JSON.
+        Return the shared capital snapshot, loading and validating the JSON on first use.
 
         Raises:
             BadRequestError: if file missing or schema invalid.
         """
         try:
-            raw = load_json_data(self.data_path, CAPITAL_REQUIRED_KEYS)
-            return [CapitalModel(**item) for item in raw]
+            return self.store.get()
         except BadRequestError:
             self.logger.error("Failed to load capital data", exc_info=True)
             raise
@@ -36,22 +68,28 @@ class CapitalRepository:
             self.logger.error("Invalid capital dataset", exc_info=True)
             raise BadRequestError("Invalid capital dataset", {"error": str(exc)}) from exc
 
-    def get_all_capitals(self) -> List[CapitalModel]:
-        """Return all capitals from the dataset."""
-        return self._load()
+    def get_all_capitals(self) -> Sequence[CapitalModel]:
+        """Return all capitals from the dataset (shared, immutable)."""
+        return self.snapshot.items
 
     def get_by_name(self, name: str) -> Optional[CapitalModel]:
         """Return a capital by name (case-insensitive), or None if not found."""
-        name_lower = name.lower()
-        for capital in self._load():
-            if capital.name.lower() == name_lower:
-                return capital
-        return None
-
-    def search(self, predicate: Callable[[CapitalModel], bool]) -> List[CapitalModel]:
-        """Return capitals satisfying a predicate."""
-        return [c for c in self._load() if predicate(c)]
-
-    def sort(self, items: List[CapitalModel], field: str, descending: bool) -> List[CapitalModel]:
-        """Sort a list of capitals by a given field."""
-        return sorted(items, key=lambda c: getattr(c, field), reverse=descending)
+        row_id = self.index.name(name)
+        return self.snapshot.items[row_id] if row_id is not None else None
+
+    def get_by_names(self, names: Sequence[str]) -> Tuple[Sequence[CapitalModel], List[str]]:
+        """Resolve many capital names in one pass: matches in request order and the names that matched nothing."""
+        index = self.index
+        row_ids: Dict[int, None] = {}
+        missing: List[str] = []
+        for name in names:
+            row_id = index.name(name)
+            if row_id is None:
+                missing.append(name)
+            else:
+                row_ids.setdefault(row_id)
+        return RowView(self.snapshot.items, list(row_ids)), missing
+
+    def search_name(self, query: str) -> Sequence[CapitalModel]:
+        """Return capitals whose name contains the query (accent/case-insensitive)."""
+        return RowView(self.snapshot.items, self.text_index.search(query))
@@ -1,12 +1,15 @@
 """Repository layer for countries: handles data loading and basic access."""
 
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
+from app.config.settings import get_settings
 from app.core.logging import get_logger
 from app.exceptions import BadRequestError
+from app.indexes import BorderGraph, CountryIndex, GroupKeys, NumericColumns, SortIndex, SpatialIndex, TrigramIndex
 from app.models import CountryModel
-from app.utils import load_json_data
+from app.repositories.snapshot import DatasetSnapshot, get_snapshot_store
+from app.utils import LRUCache, RowView, field_values
 
 
 COUNTRY_REQUIRED_KEYS = [
@@ -25,24 +28,84 @@ COUNTRY_REQUIRED_KEYS = [
     "currencies",
 ]
 
+COUNTRY_NUMERIC_FIELDS = ["population", "area", "latitude", "longitude"]
+COUNTRY_GROUP_FIELDS = [field for field in COUNTRY_REQUIRED_KEYS if field not in COUNTRY_NUMERIC_FIELDS]
+
 
 class CountryRepository:
     """Data access for countries backed by a JSON dataset."""
 
     def __init__(self, data_path: Path):
         self.data_path = data_path
+        self.store = get_snapshot_store(data_path, CountryModel, COUNTRY_REQUIRED_KEYS)
         self.logger = get_logger("atlas.repository.country")
-
-    def _load(self) -> List[CountryModel]:
+        self._snapshot: Optional[DatasetSnapshot[CountryModel]] = None
+
+    @property
+    def snapshot(self) -> DatasetSnapshot[CountryModel]:
+        """Process-wide snapshot, pinned for the lifetime of this repository instance."""
+        if self._snapshot is None:
+            self._snapshot = self._load()
+        return self._snapshot
+
+    @property
+    def index(self) -> CountryIndex:
+        """Hash indexes for the pinned snapshot, built once per snapshot."""
+        return self.snapshot.derive("country_index", CountryIndex)
+
+    @property
+    def text_index(self) -> TrigramIndex:
+        """Trigram index over name, official_name and capital, built once per snapshot."""
+        return self.snapshot.derive(
+            "country_text_index",
+            lambda items: TrigramIndex(
+                list(zip(field_values(items, "name"), field_values(items, "official_name"), field_values(items, "capital")))
+            ),
+        )
+
+    @property
+    def columns(self) -> NumericColumns:
+        """Numeric columns (population, area, latitude, longitude) aligned with row ids."""
+        return self.snapshot.derive("country_columns", lambda items: NumericColumns(items, COUNTRY_NUMERIC_FIELDS))
+
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        """k-d tree over country centroids (latitude/longitude), built once per snapshot."""
+        return self.snapshot.derive(
+            "country_spatial_index",
+            lambda items: SpatialIndex(field_values(items, "latitude"), field_values(items, "longitude")),
+        )
+
+    @property
+    def border_graph(self) -> BorderGraph:
+        """Land-border adjacency between countries in the dataset, built once per snapshot."""
+        index = self.index
+
+        def build(items: Sequence[CountryModel]) -> BorderGraph:
+            settings = get_settings()
+            cache = LRUCache(max_entries=settings.graph_cache_max_entries, max_bytes=settings.graph_cache_max_bytes)
+            return BorderGraph(field_values(items, "borders"), index.code, cache)
+
+        return self.snapshot.derive("country_border_graph", build)
+
+    def group_keys(self, field: str) -> GroupKeys:
+        """Dictionary-encoded values of a text or list field for group-by, built once per snapshot and field."""
+        return self.snapshot.derive(f"country_group_keys:{field}", lambda items: GroupKeys(field_values(items, field)))
+
+    @property
+    def sort_index(self) -> SortIndex:
+        """Ascending/descending permutations for every CountryModel field, built once per snapshot."""
+        return self.snapshot.derive("country_sort_index", lambda items: SortIndex(items, list(CountryModel.model_fields)))
+
+    def _load(self) -> DatasetSnapshot[CountryModel]:
         """
-        Load and validate country data from JSON.
+        Return the shared country snapshot, loading and validating the JSON on first use.
 
         Raises:
             BadRequestError: if file missing or schema invalid.
         """
         try:
-            raw = load_json_data(self.data_path, COUNTRY_REQUIRED_KEYS)
-            return [CountryModel(**item) for item in raw]
+            return self.store.get()
         except BadRequestError:
             # propagate but ensure logged
             self.logger.error("Failed to load country data", exc_info=True)
@@ -51,36 +114,49 @@ class CountryRepository:
             self.logger.error("Invalid country dataset", exc_info=True)
             raise BadRequestError("Invalid country dataset", {"error": str(exc)}) from exc
 
-    def get_all_countries(self) -> List[CountryModel]:
-        """Return all countries from the dataset."""
-        return self._load()
+    def get_all_countries(self) -> Sequence[CountryModel]:
+        """Return all countries from the dataset (shared, immutable)."""
+        return self.snapshot.items
 
     def get_country_by_code(self, code: str) -> Optional[CountryModel]:
-        """Return a country by ISO code (case-insensitive), or None if not found."""
-        code_lower = code.lower()
-        for country in self._load():
-            if country.country_code.lower() == code_lower:
-                return country
-        return None
-
-    def get_by_region(self, region: str) -> List[CountryModel]:
+        """Return a country by ISO alpha-2 or alpha-3 code (case-insensitive), or None if not found."""
+        row_id = self.index.code(code)
+        return self.snapshot.items[row_id] if row_id is not None else None
+
+    def get_countries_by_codes(self, codes: Sequence[str]) -> Tuple[Sequence[CountryModel], List[str]]:
+        """
+        Resolve many codes in one pass over the code index.
+
+        Returns the matched countries in request order (once each, even when both of a country's
+        alpha-2 and alpha-3 codes are requested) and the codes that matched nothing.
+        """
+        index = self.index
+        row_ids: Dict[int, None] = {}
+        missing: List[str] = []
+        for code in codes:
+            row_id = index.code(code)
+            if row_id is None:
+                missing.append(code)
+            else:
+                row_ids.setdefault(row_id)
+        return RowView(self.snapshot.items, list(row_ids)), missing
+
+    def get_by_region(self, region: str) -> Sequence[CountryModel]:
         """Return countries matching a region (case-insensitive)."""
-        region_lower = region.lower()
-        return [c for c in self._load() if c.region.lower() == region_lower]
+        return RowView(self.snapshot.items, self.index.region(region))
 
-    def get_by_subregion(self, subregion: str) -> List[CountryModel]:
+    def get_by_subregion(self, subregion: str) -> Sequence[CountryModel]:
         """Return countries matching a subregion (case-insensitive)."""
-        sub_lower = subregion.lower()
-        return [c for c in self._load() if c.subregion.lower() == sub_lower]
+        return RowView(self.snapshot.items, self.index.subregion(subregion))
 
-    def search(self, predicate: Callable[[CountryModel], bool]) -> List[CountryModel]:
-        """Return countries satisfying a predicate."""
-        return [c for c in self._load() if predicate(c)]
+    def get_by_language(self, language: str) -> Sequence[CountryModel]:
+        """Return countries listing the language (case-insensitive)."""
+        return RowView(self.snapshot.items, self.index.language(language))
 
-    def sort(self, items: List[CountryModel], field: str, descending: bool) -> List[CountryModel]:
-        """Sort a list of countries by a given field."""
-        return sorted(items, key=lambda c: getattr(c, field), reverse=descending)
+    def get_by_currency(self, currency: str) -> Sequence[CountryModel]:
+        """Return countries using the currency (case-insensitive)."""
+        return RowView(self.snapshot.items, self.index.currency(currency))
 
-    def filter(self, predicate: Callable[[CountryModel], bool]) -> List[CountryModel]:
-        """Filter countries by predicate."""
-        return [c for c in self._load() if predicate(c)]
+    def search_text(self, query: str) -> Sequence[CountryModel]:
+        """Return countries whose name, official name or capital contains the query (accent/case-insensitive)."""
+        return RowView(self.snapshot.items, self.text_index.search(query))
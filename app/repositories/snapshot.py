@@ -0,0 +1,343 @@
+"""Process-wide dataset snapshots shared by all repository instances."""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.config.settings import get_settings
+from app.core.logging import get_logger
+from app.data import SNAPSHOT_SUFFIX, MappedDataset, MappedRows, write_snapshot_file
+from app.exceptions import BadRequestError
+from app.utils import parse_json_data, read_json_file
+from app.utils.cache import LRUCache
+
+M = TypeVar("M", bound=BaseModel)
+T = TypeVar("T")
+
+logger = get_logger("atlas.repository.snapshot")
+
+
+class DatasetSnapshot(Generic[M]):
+    """
+    Immutable, validated view of a dataset file as it was when loaded.
+
+    ``items`` is a tuple of models for JSON files, or ``MappedRows`` for memory-mapped
+    snapshot files, where models are built lazily for the rows actually accessed.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        items: Sequence[M],
+        size: int,
+        mtime: float,
+        inode: int,
+        content_hash: str,
+    ):
+        self.path = path
+        self.items = items
+        self.size = size
+        self.mtime = mtime
+        self.inode = inode
+        self.content_hash = content_hash
+        self._derived: Dict[str, Any] = {}
+        self._derive_lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        """Short, stable identifier of the dataset contents."""
+        return self.content_hash[:16]
+
+    @property
+    def file_key(self) -> Tuple[float, int, int]:
+        """(mtime, inode, size) of the file this snapshot was read from."""
+        return (self.mtime, self.inode, self.size)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def derive(self, key: str, factory: Callable[[Sequence[M]], T]) -> T:
+        """Return a structure built once from this snapshot's items (indexes, encodings, ...)."""
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._derive_lock:
+            if key not in self._derived:
+                self._derived[key] = factory(self.items)
+            return self._derived[key]
+
+
+def compiled_path(source: Path) -> Path:
+    """Where ``python -m app.data compile`` writes the compiled snapshot of a JSON dataset."""
+    return source.with_suffix(SNAPSHOT_SUFFIX)
+
+
+def load_snapshot(
+    path: Path,
+    model: Type[M],
+    required_keys: Optional[List[str]] = None,
+    prefer_compiled: bool = False,
+) -> DatasetSnapshot[M]:
+    """
+    Read, hash, validate and materialize a dataset file in one pass.
+
+    ``.snap`` files are memory-mapped instead (see ``load_mapped_snapshot``). With
+    ``prefer_compiled``, a JSON dataset is served from its compiled sibling when that file
+    is present, intact and up to date, falling back to the JSON otherwise.
+
+    Raises:
+        BadRequestError: if the file is missing or not a valid dataset.
+        pydantic.ValidationError: if an item does not satisfy the model.
+    """
+    if path.suffix == SNAPSHOT_SUFFIX:
+        return load_mapped_snapshot(path, model)
+    if prefer_compiled:
+        compiled = _load_compiled(path, model)
+        if compiled is not None:
+            return compiled
+    raw, stat = read_json_file(path)
+    data = parse_json_data(raw, required_keys)
+    items = tuple(model(**item) for item in data)
+    return DatasetSnapshot(
+        path=path,
+        items=items,
+        size=stat.st_size,
+        mtime=stat.st_mtime,
+        inode=stat.st_ino,
+        content_hash=hashlib.sha256(raw).hexdigest(),
+    )
+
+
+def _row_cache() -> LRUCache:
+    settings = get_settings()
+    return LRUCache(max_entries=settings.row_cache_max_entries, max_bytes=settings.row_cache_max_bytes)
+
+
+def load_mapped_snapshot(path: Path, model: Type[M]) -> DatasetSnapshot[M]:
+    """
+    Map a compiled snapshot file read-only; all workers share its pages.
+
+    The snapshot keeps the content hash of the JSON it was compiled from, so versions and
+    ETags match those of the JSON dataset.
+    """
+    if not path.exists():
+        raise BadRequestError(f"Data file not found: {path}")
+    dataset = MappedDataset(path)
+    if dataset.header["model"] != model.__name__:
+        raise BadRequestError(
+            "Snapshot file holds a different model", {"path": str(path), "model": dataset.header["model"]}
+        )
+    return DatasetSnapshot(
+        path=path,
+        items=MappedRows(model, dataset, _row_cache()),
+        size=dataset.stat.st_size,
+        mtime=dataset.stat.st_mtime,
+        inode=dataset.stat.st_ino,
+        content_hash=dataset.content_hash,
+    )
+
+
+def _load_compiled(source: Path, model: Type[M]) -> Optional[DatasetSnapshot[M]]:
+    """Map the compiled snapshot of ``source`` if it exists and matches the JSON; None means use the JSON."""
+    compiled = compiled_path(source)
+    if not compiled.exists():
+        return None
+    try:
+        dataset = MappedDataset(compiled)
+        if dataset.header["model"] != model.__name__:
+            raise BadRequestError("Snapshot file holds a different model", {"model": dataset.header["model"]})
+        try:
+            stat = os.stat(source)
+        except FileNotFoundError:
+            stat = dataset.stat  # shipped without the JSON source
+        else:
+            recorded = dataset.source
+            if (recorded.get("size"), recorded.get("mtime")) != (stat.st_size, stat.st_mtime):
+                # touched or edited since compiling: trust the compiled file only if the contents still match
+                raw, stat = read_json_file(source)
+                if hashlib.sha256(raw).hexdigest() != dataset.content_hash:
+                    logger.warning("Compiled snapshot is stale; loading JSON", extra={"extra": {"path": str(compiled)}})
+                    return None
+    except (OSError, BadRequestError):
+        logger.warning("Compiled snapshot unusable; loading JSON", exc_info=True, extra={"extra": {"path": str(compiled)}})
+        return None
+    # keyed on the JSON file so hot reload keeps polling the source
+    return DatasetSnapshot(
+        path=source,
+        items=MappedRows(model, dataset, _row_cache()),
+        size=stat.st_size,
+        mtime=stat.st_mtime,
+        inode=stat.st_ino,
+        content_hash=dataset.content_hash,
+    )
+
+
+def compile_snapshot(
+    source: Path,
+    model: Type[M],
+    required_keys: Optional[List[str]] = None,
+    output: Optional[Path] = None,
+) -> DatasetSnapshot[M]:
+    """
+    Validate a JSON dataset once and write it as a compiled snapshot file.
+
+    Returns the snapshot mapped from the written file.
+    """
+    snapshot = load_snapshot(source, model, required_keys)
+    output = output or compiled_path(source)
+    source_info = {"path": source.name, "size": snapshot.size, "mtime": snapshot.mtime}
+    write_snapshot_file(output, model, snapshot.items, snapshot.content_hash, source_info)
+    return load_mapped_snapshot(output, model)
+
+
+class SnapshotStore(Generic[M]):
+    """
+    Holds the current snapshot of one dataset file, loading it at most once per process.
+
+    Reloads build a complete new snapshot before swapping a single reference, so readers
+    that already hold the previous snapshot keep a consistent view until they finish.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        model: Type[M],
+        required_keys: Optional[List[str]] = None,
+        prefer_compiled: bool = False,
+    ):
+        self.path = path
+        self.model = model
+        self.required_keys = required_keys
+        self.prefer_compiled = prefer_compiled
+        self.logger = logger
+        self._snapshot: Optional[DatasetSnapshot[M]] = None
+        self._observed: Optional[Tuple[float, int, int]] = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    def get(self) -> DatasetSnapshot[M]:
+        """Return the current snapshot, loading it on first use. Failed loads are not cached."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                snapshot = load_snapshot(self.path, self.model, self.required_keys, self.prefer_compiled)
+                self._swap(snapshot)
+            return snapshot
+
+    def _swap(self, snapshot: DatasetSnapshot[M]) -> None:
+        previous = self._snapshot
+        self._snapshot = snapshot
+        self._observed = snapshot.file_key
+        if previous is not None:
+            for listener in list(_swap_listeners):
+                listener(snapshot)
+        self.logger.info(
+            "Dataset snapshot loaded",
+            extra={
+                "extra": {
+                    "path": str(self.path),
+                    "items": len(snapshot),
+                    "version": snapshot.version,
+                    "format": "compiled" if isinstance(snapshot.items, MappedRows) else "json",
+                }
+            },
+        )
+
+    def has_changed(self) -> bool:
+        """Cheap mtime/inode/size poll; a missing file is treated as unchanged."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_mtime, stat.st_ino, stat.st_size) != self._observed
+
+    def reload(self) -> DatasetSnapshot[M]:
+        """
+        Re-read the file and atomically swap in the new snapshot.
+
+        Concurrent callers collapse into a single load: whoever arrives while a reload is
+        running waits for it and gets its result. A file that fails to load or validate is
+        logged and ignored, keeping the last good snapshot in place.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            with self._reload_lock:
+                return self.get()
+        try:
+            try:
+                fresh = load_snapshot(self.path, self.model, self.required_keys, self.prefer_compiled)
+            except Exception:
+                if self._snapshot is None:
+                    raise
+                self.logger.error(
+                    "Dataset reload failed; keeping previous snapshot",
+                    exc_info=True,
+                    extra={"extra": {"path": str(self.path), "version": self._snapshot.version}},
+                )
+                try:
+                    stat = os.stat(self.path)
+                    self._observed = (stat.st_mtime, stat.st_ino, stat.st_size)
+                except OSError:
+                    pass
+                return self._snapshot
+            with self._lock:
+                current = self._snapshot
+                if current is not None and current.content_hash == fresh.content_hash:
+                    # touched but identical: keep the existing snapshot (and anything derived from it)
+                    self._observed = fresh.file_key
+                    return current
+                self._swap(fresh)
+                return fresh
+        finally:
+            self._reload_lock.release()
+
+    def reload_if_changed(self) -> bool:
+        """Reload when the file on disk differs from what was last observed; return True on swap."""
+        if self._snapshot is None or not self.has_changed():
+            return False
+        before = self._snapshot
+        return self.reload() is not before
+
+
+_swap_listeners: List[Callable[[DatasetSnapshot], None]] = []
+
+
+def add_swap_listener(listener: Callable[[DatasetSnapshot], None]) -> None:
+    """Call ``listener(new_snapshot)`` whenever any store replaces a loaded snapshot."""
+    _swap_listeners.append(listener)
+
+
+_stores: Dict[Tuple[Path, type], SnapshotStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_snapshot_store(path: Path, model: Type[M], required_keys: Optional[List[str]] = None) -> SnapshotStore[M]:
+    """Return the process-wide store for a dataset file, creating it on first request."""
+    key = (Path(path).resolve(), model)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = SnapshotStore(key[0], model, required_keys, get_settings().data_use_compiled)
+                _stores[key] = store
+    return store
+
+
+def iter_snapshot_stores() -> List[SnapshotStore]:
+    """Return all stores created so far in this process."""
+    with _stores_lock:
+        return list(_stores.values())
+
+
+def clear_snapshot_stores() -> None:
+    """Forget all loaded snapshots (used by tests and tooling)."""
+    with _stores_lock:
+        _stores.clear()
@@ -0,0 +1,47 @@
+"""Background polling of dataset files with atomic snapshot reloads."""
+
+import asyncio
+from typing import Optional
+
+from app.core.logging import get_logger
+from app.repositories.snapshot import iter_snapshot_stores
+
+
+class SnapshotWatcher:
+    """Polls every loaded dataset store and reloads changed files off the event loop."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.logger = get_logger("atlas.repository.watcher")
+        self._task: Optional[asyncio.Task] = None
+
+    def check_once(self) -> int:
+        """Reload every store whose file changed; return the number of swapped snapshots."""
+        swapped = 0
+        for store in iter_snapshot_stores():
+            try:
+                if store.reload_if_changed():
+                    swapped += 1
+            except Exception:
+                self.logger.error("Dataset reload check failed", exc_info=True, extra={"extra": {"path": str(store.path)}})
+        return swapped
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await asyncio.to_thread(self.check_once)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+            self.logger.info("Dataset watcher started", extra={"extra": {"interval": self.interval}})
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
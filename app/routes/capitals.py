@@ -1,16 +1,25 @@
 from pathlib import Path
-from typing import Literal, Optional, cast
+from typing import List, Literal, Optional, cast
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 
-from app.models import PaginationModel, SearchModel
-from app.repositories import CapitalRepository
+from app.models import CapitalModel, PaginationModel, SearchModel
+from app.repositories import CapitalRepository, DatasetSnapshot
+from app.routes.conditional import ValidatedRoute, conditional_get
+from app.routes.fields import Fields, field_selector
+from app.routes.responses import (
+    NDJSON_MEDIA_TYPE,
+    annotated_rows_response,
+    model_response,
+    ndjson_response,
+    rows_response,
+)
 from app.services import CapitalService
-from schemas import ResponseSchema
+from schemas import CapitalBatchRequestSchema, ResponseSchema
 
 DATA_PATH = Path(__file__).resolve().parents[2] / "data" / "capitals.json"
-
-router = APIRouter()
+CURSOR_DESCRIPTION = "Keyset pagination: empty to start, then meta.next_cursor (page is ignored)"
 
 
 def get_capital_service() -> CapitalService:
@@ -18,15 +27,20 @@ def get_capital_service() -> CapitalService:
     return CapitalService(repo)
 
 
-def build_response(data, meta=None) -> ResponseSchema:
-    return ResponseSchema(status="success", data=data, meta=meta.model_dump() if meta else None, error=None)
+def capital_snapshots(service: CapitalService = Depends(get_capital_service)) -> List[DatasetSnapshot]:
+    return [service.repository.snapshot]
+
+
+capital_fields = field_selector(CapitalModel)
+
+router = APIRouter(route_class=ValidatedRoute, dependencies=[Depends(conditional_get(capital_snapshots))])
 
 
 @router.get(
     "",
     response_model=ResponseSchema,
     summary="List capitals",
-    description="List capitals with pagination, optional name search, and sorting.",
+    description="List capitals with pagination (page/size or keyset cursor), optional name search, and sorting.",
 )
 async def list_capitals(
     page: int = Query(default=1, ge=1, description="Page number"),
@@ -34,8 +48,17 @@ async def list_capitals(
     name: Optional[str] = Query(default=None, description="Search term for capital name"),
     sort_by: Optional[str] = Query(default=None, description="Field to sort by (e.g., population)"),
     order: Literal["asc", "desc"] = Query(default="asc", description="Sort order"),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    names: Optional[str] = Query(default=None, description="Comma-separated capital names to look up in one batch (other parameters are ignored)"),
+    fields: Fields = Depends(capital_fields),
     service: CapitalService = Depends(get_capital_service),
-) -> ResponseSchema:
+) -> Response:
+    # a blank ``names=`` (or only separators) is a normal list request
+    keys = [key for key in (names or "").split(",") if key.strip()]
+    if keys:
+        found, batch_meta = service.get_by_names(keys)
+        return rows_response(found, service.repository.snapshot, batch_meta, fields)
+
     def _clean(value):
         return value.strip() if isinstance(value, str) else value
 
@@ -51,10 +74,98 @@ async def list_capitals(
         max_area=None,
         language=None,
         currency=None,
+        min_lat=None,
+        max_lat=None,
+        min_lng=None,
+        max_lng=None,
+        near_lat=None,
+        near_lng=None,
+        within_km=None,
     )
+    if cursor is not None:
+        items, cursor_meta = service.list_capitals_by_cursor(query, int(size), cursor.strip())
+        return rows_response(items, service.repository.snapshot, cursor_meta, fields)
     pagination = PaginationModel(page=int(page), size=int(size))
     items, meta = service.list_capitals(pagination, query)
-    return build_response(data=[i.model_dump() for i in items], meta=meta)
+    return rows_response(items, service.repository.snapshot, meta, fields)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "One capital JSON object per line"}},
+    summary="Export capitals (NDJSON)",
+    description="Stream every capital matching the name search as newline-delimited JSON, without pagination.",
+)
+async def export_capitals(
+    name: Optional[str] = Query(default=None, description="Search term for capital name"),
+    sort_by: Optional[str] = Query(default=None, description="Field to sort by (e.g., population)"),
+    order: Literal["asc", "desc"] = Query(default="asc", description="Sort order"),
+    fields: Fields = Depends(capital_fields),
+    service: CapitalService = Depends(get_capital_service),
+) -> StreamingResponse:
+    def _clean(value):
+        return value.strip() if isinstance(value, str) else value
+
+    query = SearchModel(
+        name=_clean(name),
+        sort_by=_clean(sort_by),
+        order=cast(Literal["asc", "desc"], _clean(order) or "asc"),
+        region=None,
+        subregion=None,
+        min_population=None,
+        max_population=None,
+        min_area=None,
+        max_area=None,
+        language=None,
+        currency=None,
+        min_lat=None,
+        max_lat=None,
+        min_lng=None,
+        max_lng=None,
+        near_lat=None,
+        near_lng=None,
+        within_km=None,
+    )
+    selection = service.export(query)
+    return ndjson_response(selection.iter_ids(), service.repository.snapshot, fields)
+
+
+@router.post(
+    "/batch",
+    response_model=ResponseSchema,
+    summary="Batch lookup capitals by name",
+    description="Resolve many capital names at once. Found capitals are returned in request order; unknown names are listed in meta.missing.",
+)
+async def batch_capitals(
+    body: CapitalBatchRequestSchema,
+    fields: Fields = Depends(capital_fields),
+    service: CapitalService = Depends(get_capital_service),
+) -> Response:
+    found, meta = service.get_by_names(body.names)
+    return rows_response(found, service.repository.snapshot, meta, fields)
+
+
+@router.get(
+    "/nearby",
+    response_model=ResponseSchema,
+    summary="Capitals near a point",
+    description=(
+        "Capitals closest to a latitude/longitude, nearest first, each with its great-circle `distance_km`. "
+        "Give `radius_km` for every capital within that distance, `k` for the k nearest, or both."
+    ),
+)
+async def nearby_capitals(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the point"),
+    lng: float = Query(..., ge=-180, le=180, description="Longitude of the point"),
+    radius_km: Optional[float] = Query(default=None, gt=0, description="Search radius in kilometres"),
+    k: Optional[int] = Query(default=None, ge=1, le=1000, description="Max capitals to return (default 10 without radius_km)"),
+    fields: Fields = Depends(capital_fields),
+    service: CapitalService = Depends(get_capital_service),
+) -> Response:
+    rows, distances = service.nearby(lat, lng, radius_km, k)
+    meta = {"lat": lat, "lng": lng, "radius_km": radius_km, "k": k, "total_items": len(rows)}
+    return annotated_rows_response(rows, service.repository.snapshot, "distance_km", [round(d, 3) for d in distances], meta, fields)
 
 
 @router.get(
@@ -65,7 +176,8 @@ async def list_capitals(
 )
 async def get_capital_by_name(
     name: str,
+    fields: Fields = Depends(capital_fields),
     service: CapitalService = Depends(get_capital_service),
-) -> ResponseSchema:
+) -> Response:
     capital = service.get_by_name(name.strip())
-    return build_response(data=capital.model_dump())
+    return model_response(capital, fields)
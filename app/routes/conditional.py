@@ -0,0 +1,101 @@
+"""Conditional GET support (ETag / Last-Modified) tied to dataset snapshot versions."""
+
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Coroutine, Dict, Sequence
+
+from fastapi import Depends, Request, Response
+from fastapi.routing import APIRoute
+
+from app.config.settings import get_settings
+from app.core.compression import strip_etag_coding
+from app.exceptions import NotModified
+from app.repositories import DatasetSnapshot
+
+SnapshotsDependency = Callable[..., Sequence[DatasetSnapshot]]
+
+# a deploy can change response shapes without touching the data, so validators never predate it
+PROCESS_STARTED = time.time()
+
+
+def compute_etag(snapshots: Sequence[DatasetSnapshot], request: Request) -> str:
+    """Strong ETag over the API version, the dataset hashes and the canonical request (path + sorted query)."""
+    digest = hashlib.sha256(get_settings().version.encode())
+    for snapshot in snapshots:
+        digest.update(snapshot.content_hash.encode())
+    digest.update(request.url.path.encode())
+    for key, value in sorted(request.query_params.multi_items()):
+        digest.update(f"\x00{key}={value}".encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes and content-coding suffixes are ignored."""
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(strip_etag_coding(tag.removeprefix("W/")) == etag for tag in candidates)
+
+
+def _not_modified_since(header: str, last_modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one-second resolution
+    return int(last_modified) <= since
+
+
+def last_modified(snapshots: Sequence[DatasetSnapshot]) -> float:
+    """Latest dataset file mtime, or the process start if this build is newer than the data."""
+    return max(PROCESS_STARTED, *(snapshot.mtime for snapshot in snapshots))
+
+
+def validator_headers(snapshots: Sequence[DatasetSnapshot], request: Request) -> Dict[str, str]:
+    return {"ETag": compute_etag(snapshots, request), "Last-Modified": formatdate(last_modified(snapshots), usegmt=True)}
+
+
+def conditional_get(snapshots: SnapshotsDependency) -> Callable[..., None]:
+    """
+    Build a dependency that computes ETag/Last-Modified for GET requests and answers 304 early.
+
+    ``snapshots`` resolves the snapshots the route will serve from (through the same cached
+    service dependency), so validators always describe the data actually returned. The
+    headers are attached to the final response by ``ValidatedRoute``, which also answers
+    ``If-None-Match: *``: it only matches a resource that exists, known once the handler ran.
+    """
+
+    def dependency(request: Request, current: Sequence[DatasetSnapshot] = Depends(snapshots)) -> None:
+        if request.method not in ("GET", "HEAD"):
+            return
+        headers = validator_headers(current, request)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                request.state.match_any = True
+            elif _etag_matches(if_none_match, headers["ETag"]):
+                raise NotModified(headers)
+        else:
+            if_modified_since = request.headers.get("if-modified-since")
+            if if_modified_since and _not_modified_since(if_modified_since, last_modified(current)):
+                raise NotModified(headers)
+        request.state.validators = headers
+
+    return dependency
+
+
+class ValidatedRoute(APIRoute):
+    """Route that copies conditional-GET validators onto successful responses, including raw ones."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            response = await handler(request)
+            validators = getattr(request.state, "validators", None)
+            if validators and response.status_code == 200:
+                if getattr(request.state, "match_any", False):
+                    return Response(status_code=304, headers=validators)
+                response.headers.update(validators)
+            return response
+
+        return route_handler
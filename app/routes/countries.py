@@ -1,16 +1,26 @@
 from pathlib import Path
-from typing import Literal, Optional, cast
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 
-from app.models import PaginationModel, SearchModel
-from app.repositories import CountryRepository
+from app.models import CountryModel, PaginationModel, SearchModel
+from app.repositories import CountryRepository, DatasetSnapshot
+from app.routes.conditional import ValidatedRoute, conditional_get
+from app.routes.fields import Fields, field_selector
+from app.routes.filters import country_search
+from app.routes.responses import (
+    NDJSON_MEDIA_TYPE,
+    annotated_rows_response,
+    model_response,
+    ndjson_response,
+    rows_response,
+)
 from app.services import CountryService
-from schemas import ResponseSchema
+from schemas import CountryBatchRequestSchema, ResponseSchema
 
 DATA_PATH = Path(__file__).resolve().parents[2] / "data" / "countries.json"
-
-router = APIRouter()
+CURSOR_DESCRIPTION = "Keyset pagination: empty to start, then meta.next_cursor (page is ignored)"
 
 
 def get_country_service() -> CountryService:
@@ -19,53 +29,61 @@ def get_country_service() -> CountryService:
     return CountryService(repo)
 
 
-def build_response(data, meta=None) -> ResponseSchema:
-    """Standard success envelope."""
-    return ResponseSchema(status="success", data=data, meta=meta.model_dump() if meta else None, error=None)
+def country_snapshots(service: CountryService = Depends(get_country_service)) -> List[DatasetSnapshot]:
+    """Snapshot pinned by this request's service, used for conditional GET validators."""
+    return [service.repository.snapshot]
+
+
+country_fields = field_selector(CountryModel)
+
+router = APIRouter(route_class=ValidatedRoute, dependencies=[Depends(conditional_get(country_snapshots))])
+
+
+def _list_response(
+    service: CountryService,
+    query: SearchModel,
+    page: int,
+    size: int,
+    cursor: Optional[str],
+    explain: bool,
+    fields: Fields,
+) -> Response:
+    """Page (or cursor page) of ``query`` shared by ``/countries`` and ``/countries/search``."""
+    if cursor is not None:
+        items, cursor_meta = service.list_countries_by_cursor(query, int(size), cursor.strip())
+        meta_data = cursor_meta.model_dump(mode="json")
+    else:
+        pagination = PaginationModel(page=int(page), size=int(size))
+        items, meta = service.list_countries(pagination, query, explain)
+        meta_data = meta.model_dump(mode="json")
+    if explain:
+        # the plan that produced these rows, not a second run of the search
+        meta_data["plan"] = service.explain_last()
+    return rows_response(items, service.repository.snapshot, meta_data, fields)
 
 
 @router.get(
     "",
     response_model=ResponseSchema,
     summary="List countries",
-    description="List countries with pagination, sorting, filtering, and search across name, official_name, and capital.",
+    description="List countries with pagination (page/size or keyset cursor), sorting, filtering, and search across name, official_name, and capital.",
 )
 async def list_countries(
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=10, ge=1, le=100, description="Page size"),
-    name: Optional[str] = Query(default=None, description="Search term for country name/official name/capital"),
-    region: Optional[str] = Query(default=None, description="Filter by region"),
-    subregion: Optional[str] = Query(default=None, description="Filter by subregion"),
-    min_population: Optional[int] = Query(default=None, ge=0, description="Minimum population"),
-    max_population: Optional[int] = Query(default=None, ge=0, description="Maximum population"),
-    min_area: Optional[float] = Query(default=None, ge=0, description="Minimum area"),
-    max_area: Optional[float] = Query(default=None, ge=0, description="Maximum area"),
-    language: Optional[str] = Query(default=None, description="Filter by language"),
-    currency: Optional[str] = Query(default=None, description="Filter by currency"),
-    sort_by: Optional[str] = Query(default=None, description="Field to sort by"),
-    order: Literal["asc", "desc"] = Query(default="asc", description="Sort order"),
+    query: SearchModel = Depends(country_search),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    explain: bool = Query(default=False, description="Include the chosen query plan in meta (debug)"),
+    codes: Optional[str] = Query(default=None, description="Comma-separated ISO codes to look up in one batch (other parameters are ignored)"),
+    fields: Fields = Depends(country_fields),
     service: CountryService = Depends(get_country_service),
-) -> ResponseSchema:
-    def _clean(value: Optional[str]) -> Optional[str]:
-        return value.strip() if isinstance(value, str) else value
-
-    order_value = cast(Literal["asc", "desc"], _clean(order) or "asc")
-    query = SearchModel(
-        name=_clean(name),
-        region=_clean(region),
-        subregion=_clean(subregion),
-        min_population=min_population,
-        max_population=max_population,
-        min_area=min_area,
-        max_area=max_area,
-        language=_clean(language),
-        currency=_clean(currency),
-        sort_by=_clean(sort_by),
-        order=order_value,
-    )
-    pagination = PaginationModel(page=int(page), size=int(size))
-    items, meta = service.list_countries(pagination, query)
-    return build_response(data=[item.model_dump() for item in items], meta=meta)
+) -> Response:
+    # a blank ``codes=`` (or only separators) is a normal list request
+    keys = [key for key in (codes or "").split(",") if key.strip()]
+    if keys:
+        found, batch_meta = service.get_by_codes(keys)
+        return rows_response(found, service.repository.snapshot, batch_meta, fields)
+    return _list_response(service, query, page, size, cursor, explain, fields)
 
 
 @router.get(
@@ -77,38 +95,44 @@ async def list_countries(
 async def search_countries(
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=10, ge=1, le=100, description="Page size"),
-    name: Optional[str] = Query(default=None, description="Search term"),
-    region: Optional[str] = Query(default=None, description="Filter by region"),
-    subregion: Optional[str] = Query(default=None, description="Filter by subregion"),
-    min_population: Optional[int] = Query(default=None, ge=0, description="Minimum population"),
-    max_population: Optional[int] = Query(default=None, ge=0, description="Maximum population"),
-    min_area: Optional[float] = Query(default=None, ge=0, description="Minimum area"),
-    max_area: Optional[float] = Query(default=None, ge=0, description="Maximum area"),
-    language: Optional[str] = Query(default=None, description="Filter by language"),
-    currency: Optional[str] = Query(default=None, description="Filter by currency"),
-    sort_by: Optional[str] = Query(default=None, description="Field to sort by"),
-    order: Literal["asc", "desc"] = Query(default="asc", description="Sort order"),
+    query: SearchModel = Depends(country_search),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    explain: bool = Query(default=False, description="Include the chosen query plan in meta (debug)"),
+    fields: Fields = Depends(country_fields),
     service: CountryService = Depends(get_country_service),
-) -> ResponseSchema:
-    def _clean(value: Optional[str]) -> Optional[str]:
-        return value.strip() if isinstance(value, str) else value
-
-    query = SearchModel(
-        name=_clean(name),
-        region=_clean(region),
-        subregion=_clean(subregion),
-        min_population=min_population,
-        max_population=max_population,
-        min_area=min_area,
-        max_area=max_area,
-        language=_clean(language),
-        currency=_clean(currency),
-        sort_by=_clean(sort_by),
-        order=cast(Literal["asc", "desc"], _clean(order) or "asc"),
-    )
-    pagination = PaginationModel(page=int(page), size=int(size))
-    items, meta = service.list_countries(pagination, query)
-    return build_response(data=[item.model_dump() for item in items], meta=meta)
+) -> Response:
+    return _list_response(service, query, page, size, cursor, explain, fields)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "One country JSON object per line"}},
+    summary="Export countries (NDJSON)",
+    description="Stream every country matching the search filters as newline-delimited JSON, without pagination.",
+)
+async def export_countries(
+    query: SearchModel = Depends(country_search),
+    fields: Fields = Depends(country_fields),
+    service: CountryService = Depends(get_country_service),
+) -> StreamingResponse:
+    selection = service.export(query)
+    return ndjson_response(selection.iter_ids(), service.repository.snapshot, fields)
+
+
+@router.post(
+    "/batch",
+    response_model=ResponseSchema,
+    summary="Batch lookup countries by code",
+    description="Resolve many ISO alpha-2/alpha-3 codes at once. Found countries are returned in request order; unknown codes are listed in meta.missing.",
+)
+async def batch_countries(
+    body: CountryBatchRequestSchema,
+    fields: Fields = Depends(country_fields),
+    service: CountryService = Depends(get_country_service),
+) -> Response:
+    found, meta = service.get_by_codes(body.codes)
+    return rows_response(found, service.repository.snapshot, meta, fields)
 
 
 @router.get(
@@ -119,10 +143,11 @@ async def search_countries(
 )
 async def get_country_by_code(
     code: str,
+    fields: Fields = Depends(country_fields),
     service: CountryService = Depends(get_country_service),
-) -> ResponseSchema:
+) -> Response:
     country = service.get_by_code(code)
-    return build_response(data=country.model_dump())
+    return model_response(country, fields)
 
 
 @router.get(
@@ -135,11 +160,12 @@ async def get_by_region(
     region: str,
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=10, ge=1, le=100, description="Page size"),
+    fields: Fields = Depends(country_fields),
     service: CountryService = Depends(get_country_service),
-) -> ResponseSchema:
+) -> Response:
     pagination = PaginationModel(page=int(page), size=int(size))
     items, meta = service.get_by_region(region.strip(), pagination)
-    return build_response(data=[i.model_dump() for i in items], meta=meta)
+    return rows_response(items, service.repository.snapshot, meta, fields)
 
 
 @router.get(
@@ -152,11 +178,12 @@ async def get_by_subregion(
     subregion: str,
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=10, ge=1, le=100, description="Page size"),
+    fields: Fields = Depends(country_fields),
     service: CountryService = Depends(get_country_service),
-) -> ResponseSchema:
+) -> Response:
     pagination = PaginationModel(page=int(page), size=int(size))
     items, meta = service.get_by_subregion(subregion.strip(), pagination)
-    return build_response(data=[i.model_dump() for i in items], meta=meta)
+    return rows_response(items, service.repository.snapshot, meta, fields)
 
 
 @router.get(
@@ -169,11 +196,12 @@ async def get_by_language(
     language: str,
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=10, ge=1, le=100, description="Page size"),
+    fields: Fields = Depends(country_fields),
     service: CountryService = Depends(get_country_service),
-) -> ResponseSchema:
+) -> Response:
     pagination = PaginationModel(page=int(page), size=int(size))
     items, meta = service.get_by_language(language.strip(), pagination)
-    return build_response(data=[i.model_dump() for i in items], meta=meta)
+    return rows_response(items, service.repository.snapshot, meta, fields)
 
 
 @router.get(
@@ -186,8 +214,64 @@ async def get_by_currency(
     currency: str,
     page: int = Query(default=1, ge=1, description="Page number"),
     size: int = Query(default=10, ge=1, le=100, description="Page size"),
+    fields: Fields = Depends(country_fields),
     service: CountryService = Depends(get_country_service),
-) -> ResponseSchema:
+) -> Response:
     pagination = PaginationModel(page=int(page), size=int(size))
     items, meta = service.get_by_currency(currency.strip(), pagination)
-    return build_response(data=[i.model_dump() for i in items], meta=meta)
+    return rows_response(items, service.repository.snapshot, meta, fields)
+
+
+# Border graph routes are declared last so the literal prefixes above (/region/..., /language/...)
+# are never captured as a country code.
+@router.get(
+    "/{code}/neighbors",
+    response_model=ResponseSchema,
+    summary="Bordering countries",
+    description=(
+        "Countries reachable from a country within `depth` land-border crossings, nearest first, each with its "
+        "`hops` count. Borders pointing at countries missing from the dataset are ignored."
+    ),
+)
+async def get_neighbors(
+    code: str,
+    depth: int = Query(default=1, ge=1, le=20, description="Maximum number of border crossings"),
+    fields: Fields = Depends(country_fields),
+    service: CountryService = Depends(get_country_service),
+) -> Response:
+    rows, hops = service.neighbors(code.strip(), depth)
+    meta = {"code": code.strip().upper(), "depth": depth, "total_items": len(rows)}
+    return annotated_rows_response(rows, service.repository.snapshot, "hops", hops, meta, fields)
+
+
+@router.get(
+    "/{code}/path/{other}",
+    response_model=ResponseSchema,
+    summary="Shortest land route between countries",
+    description="Countries along a shortest land-border path between two countries, both included. 404 when none exists.",
+)
+async def get_border_path(
+    code: str,
+    other: str,
+    fields: Fields = Depends(country_fields),
+    service: CountryService = Depends(get_country_service),
+) -> Response:
+    rows = service.path(code.strip(), other.strip())
+    meta = {"from": code.strip().upper(), "to": other.strip().upper(), "hops": len(rows) - 1}
+    return rows_response(rows, service.repository.snapshot, meta, fields)
+
+
+@router.get(
+    "/{code}/landmass",
+    response_model=ResponseSchema,
+    summary="Countries sharing a landmass",
+    description="Every country connected to the given one through land borders, itself included.",
+)
+async def get_landmass(
+    code: str,
+    fields: Fields = Depends(country_fields),
+    service: CountryService = Depends(get_country_service),
+) -> Response:
+    rows = service.landmass(code.strip())
+    meta = {"code": code.strip().upper(), "total_items": len(rows)}
+    return rows_response(rows, service.repository.snapshot, meta, fields)
@@ -0,0 +1,45 @@
+"""Sparse fieldsets: the ``fields`` query parameter shared by country and capital read endpoints."""
+
+from typing import Callable, Optional, Tuple, Type
+
+from fastapi import Query
+from pydantic import BaseModel
+
+from app.exceptions import BadRequestError
+
+Fields = Optional[Tuple[str, ...]]
+
+
+def parse_fields(raw: Optional[str], model: Type[BaseModel]) -> Fields:
+    """
+    Validate a comma-separated field list against ``model_fields``.
+
+    Returns the fields in model order (so equivalent lists share one cached projection),
+    or None when nothing, or every field, was requested.
+
+    Raises:
+        BadRequestError: if a field does not exist on the model.
+    """
+    if raw is None:
+        return None
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = sorted(requested - model.model_fields.keys())
+    if unknown:
+        raise BadRequestError(f"Invalid field: {', '.join(unknown)}", {"fields": unknown})
+    if not requested or len(requested) == len(model.model_fields):
+        return None
+    return tuple(name for name in model.model_fields if name in requested)
+
+
+def field_selector(model: Type[BaseModel]) -> Callable[..., Fields]:
+    """Build a dependency reading ``fields`` for ``model``."""
+
+    def dependency(
+        fields: Optional[str] = Query(
+            default=None,
+            description=f"Comma-separated {model.__name__} fields to return (default: all)",
+        ),
+    ) -> Fields:
+        return parse_fields(fields, model)
+
+    return dependency
@@ -0,0 +1,62 @@
+"""Country search filters: the query parameters shared by list, search, export and aggregate endpoints."""
+
+from typing import Literal, Optional
+
+from fastapi import Depends, Query
+
+from app.models import SearchModel
+from app.utils import parse_point
+
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    return value.strip() if isinstance(value, str) else value
+
+
+def country_filters(
+    name: Optional[str] = Query(default=None, description="Search term for country name/official name/capital"),
+    region: Optional[str] = Query(default=None, description="Filter by region"),
+    subregion: Optional[str] = Query(default=None, description="Filter by subregion"),
+    min_population: Optional[int] = Query(default=None, ge=0, description="Minimum population"),
+    max_population: Optional[int] = Query(default=None, ge=0, description="Maximum population"),
+    min_area: Optional[float] = Query(default=None, ge=0, description="Minimum area"),
+    max_area: Optional[float] = Query(default=None, ge=0, description="Maximum area"),
+    language: Optional[str] = Query(default=None, description="Filter by language"),
+    currency: Optional[str] = Query(default=None, description="Filter by currency"),
+    min_lat: Optional[float] = Query(default=None, ge=-90, le=90, description="Minimum centroid latitude"),
+    max_lat: Optional[float] = Query(default=None, ge=-90, le=90, description="Maximum centroid latitude"),
+    min_lng: Optional[float] = Query(default=None, ge=-180, le=180, description="Western longitude bound (above max_lng wraps the antimeridian)"),
+    max_lng: Optional[float] = Query(default=None, ge=-180, le=180, description="Eastern longitude bound"),
+    near: Optional[str] = Query(default=None, description="Point 'lat,lng' for within_km"),
+    within_km: Optional[float] = Query(default=None, gt=0, description="Max centroid distance from near, in km"),
+) -> SearchModel:
+    """Unsorted ``SearchModel`` built from the filter parameters; new filters only need adding here."""
+    near_lat, near_lng = parse_point(near) if near else (None, None)
+    return SearchModel(
+        name=_clean(name),
+        region=_clean(region),
+        subregion=_clean(subregion),
+        min_population=min_population,
+        max_population=max_population,
+        min_area=min_area,
+        max_area=max_area,
+        language=_clean(language),
+        currency=_clean(currency),
+        min_lat=min_lat,
+        max_lat=max_lat,
+        min_lng=min_lng,
+        max_lng=max_lng,
+        near_lat=near_lat,
+        near_lng=near_lng,
+        within_km=within_km,
+        sort_by=None,
+        order="asc",
+    )
+
+
+def country_search(
+    filters: SearchModel = Depends(country_filters),
+    sort_by: Optional[str] = Query(default=None, description="Field to sort by"),
+    order: Literal["asc", "desc"] = Query(default="asc", description="Sort order"),
+) -> SearchModel:
+    """``country_filters`` plus the sort parameters."""
+    return filters.model_copy(update={"sort_by": _clean(sort_by), "order": order})
@@ -0,0 +1,157 @@
+"""Pre-serialized success responses that bypass per-request model_dump and envelope validation.
+
+Routes keep ``response_model=ResponseSchema`` for OpenAPI, but return these raw responses,
+whose bytes are identical to what the validated ``ResponseSchema`` path produced.
+"""
+
+import sys
+from typing import Any, AsyncIterator, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.config.settings import get_settings
+from app.data import MappedRows
+from app.repositories import DatasetSnapshot
+from app.utils import LRUCache, RowView, encode_array, encode_envelope, encode_json, encode_model, encode_projection, encode_rows
+
+
+class EncodedJSONResponse(Response):
+    """JSON response whose body is already encoded."""
+
+    media_type = "application/json"
+
+
+def encoded_rows(snapshot: DatasetSnapshot) -> Sequence[bytes]:
+    """Every row of the snapshot encoded to JSON once (read from the file for mapped snapshots)."""
+    if isinstance(snapshot.items, MappedRows):
+        return snapshot.items.encoded
+    return snapshot.derive("row_json", encode_rows)
+
+
+class ProjectedRows(Sequence[bytes]):
+    """Rows projected on access, used when a projection is not (or cannot be) cached."""
+
+    def __init__(self, encoded: Sequence[bytes], fields: Tuple[str, ...]):
+        self._encoded = encoded
+        self._fields = fields
+
+    def __len__(self) -> int:
+        return len(self._encoded)
+
+    @overload
+    def __getitem__(self, index: int) -> bytes: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[bytes]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[bytes, List[bytes]]:
+        if isinstance(index, slice):
+            return [encode_projection(row, self._fields) for row in self._encoded[index]]
+        return encode_projection(self._encoded[index], self._fields)
+
+
+def _projection_cache(_: Sequence[BaseModel]) -> LRUCache:
+    settings = get_settings()
+    return LRUCache(max_entries=settings.projection_cache_max_entries, max_bytes=settings.projection_cache_max_bytes)
+
+
+def encoded_projection(snapshot: DatasetSnapshot, fields: Optional[Tuple[str, ...]]) -> Sequence[bytes]:
+    """
+    Every row of the snapshot encoded with only ``fields`` (all fields when None).
+
+    Projections are built from the pre-encoded rows on first use and kept in a small
+    per-snapshot LRU, so repeated sparse fieldsets cost a byte join like full rows do.
+    """
+    encoded = encoded_rows(snapshot)
+    if fields is None:
+        return encoded
+    cache: LRUCache = snapshot.derive("row_json_projections", _projection_cache)
+    if not cache.enabled:
+        return ProjectedRows(encoded, fields)
+    projected = cache.get(fields)
+    if projected is None:
+        projected = tuple(encode_projection(row, fields) for row in encoded)
+        cache.set(fields, projected, sys.getsizeof(projected) + sum(len(row) for row in projected))
+    return projected
+
+
+def success_response(data: Any, meta: Optional[Any] = None) -> EncodedJSONResponse:
+    """Envelope for arbitrary JSON-compatible data."""
+    return EncodedJSONResponse(encode_envelope(encode_json(data), meta))
+
+
+def encoded_response(data: bytes, meta: Optional[Any] = None) -> EncodedJSONResponse:
+    """Envelope for data that is already JSON-encoded (e.g. materialized statistics)."""
+    return EncodedJSONResponse(encode_envelope(data, meta))
+
+
+def model_response(model: BaseModel, fields: Optional[Tuple[str, ...]] = None) -> EncodedJSONResponse:
+    if fields is None:
+        return EncodedJSONResponse(encode_envelope(encode_model(model)))
+    return EncodedJSONResponse(encode_envelope(encode_json(model.model_dump(mode="json", include=set(fields)))))
+
+
+def rows_response(
+    rows: Sequence[BaseModel],
+    snapshot: DatasetSnapshot,
+    meta: Optional[Any] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> EncodedJSONResponse:
+    """Envelope for a list of snapshot rows, concatenating their pre-encoded (optionally projected) bytes."""
+    if isinstance(rows, RowView) and rows.items is snapshot.items:
+        cache = encoded_projection(snapshot, fields)
+        body = encode_array([cache[row_id] for row_id in rows.ids])
+    elif fields is None:
+        body = encode_array([encode_model(row) for row in rows])
+    else:
+        include = set(fields)
+        body = encode_array([encode_json(row.model_dump(mode="json", include=include)) for row in rows])
+    return EncodedJSONResponse(encode_envelope(body, meta))
+
+
+def annotated_rows_response(
+    rows: RowView,
+    snapshot: DatasetSnapshot,
+    name: str,
+    values: Sequence[Any],
+    meta: Optional[Any] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> EncodedJSONResponse:
+    """Like ``rows_response``, appending a computed ``name`` key (e.g. a distance) to each pre-encoded row."""
+    cache = encoded_projection(snapshot, fields)
+    key = b',"' + name.encode("utf-8") + b'":'
+    body = encode_array([cache[row_id][:-1] + key + encode_json(value) + b"}" for row_id, value in zip(rows.ids, values)])
+    return EncodedJSONResponse(encode_envelope(body, meta))
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+async def _ndjson_chunks(row_ids: Iterator[int], encoded: Sequence[bytes]) -> AsyncIterator[bytes]:
+    # each chunk is awaited through send(), so a slow client pauses row production
+    chunk = bytearray()
+    for row_id in row_ids:
+        chunk += encoded[row_id]
+        chunk += b"\n"
+        if len(chunk) >= EXPORT_CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+def ndjson_response(
+    row_ids: Iterator[int], snapshot: DatasetSnapshot, fields: Optional[Tuple[str, ...]] = None
+) -> StreamingResponse:
+    """
+    Stream rows as newline-delimited JSON in bounded chunks.
+
+    The generator keeps its own reference to the snapshot's encoded rows, so the whole export
+    reads one snapshot even if the dataset is reloaded meanwhile.
+    """
+    # a one-off export projects row by row instead of filling the projection cache
+    encoded = encoded_rows(snapshot) if fields is None else ProjectedRows(encoded_rows(snapshot), fields)
+    return StreamingResponse(_ndjson_chunks(row_ids, encoded), media_type=NDJSON_MEDIA_TYPE)
@@ -1,16 +1,20 @@
 from pathlib import Path
+from typing import List
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
-from app.repositories import CapitalRepository, CountryRepository
+from app.models import SearchModel
+from app.repositories import CapitalRepository, CountryRepository, DatasetSnapshot, add_swap_listener
+from app.routes.conditional import ValidatedRoute, conditional_get
+from app.routes.filters import country_filters
+from app.routes.responses import encoded_response, rows_response, success_response
 from app.services import StatisticsService
+from app.services.statistics_service import TOP_POPULATION_LIMIT
 from schemas import ResponseSchema
 
 COUNTRY_DATA_PATH = Path(__file__).resolve().parents[2] / "data" / "countries.json"
 CAPITAL_DATA_PATH = Path(__file__).resolve().parents[2] / "data" / "capitals.json"
 
-router = APIRouter()
-
 
 def get_statistics_service() -> StatisticsService:
     country_repo = CountryRepository(COUNTRY_DATA_PATH)
@@ -18,8 +22,20 @@ def get_statistics_service() -> StatisticsService:
     return StatisticsService(country_repo, capital_repo)
 
 
-def build_response(data) -> ResponseSchema:
-    return ResponseSchema(status="success", data=data, meta=None, error=None)
+def _materialize_on_reload(snapshot: DatasetSnapshot) -> None:
+    # build the new version's statistics in the reloading thread rather than on the next request
+    if snapshot.path == COUNTRY_DATA_PATH:
+        get_statistics_service().country_statistics
+
+
+add_swap_listener(_materialize_on_reload)
+
+
+def statistics_snapshots(service: StatisticsService = Depends(get_statistics_service)) -> List[DatasetSnapshot]:
+    return [service.country_repo.snapshot, service.capital_repo.snapshot]
+
+
+router = APIRouter(route_class=ValidatedRoute, dependencies=[Depends(conditional_get(statistics_snapshots))])
 
 
 @router.get(
@@ -28,8 +44,8 @@ def build_response(data) -> ResponseSchema:
     summary="Totals",
     description="Return total counts for countries and capitals.",
 )
-async def totals(service: StatisticsService = Depends(get_statistics_service)) -> ResponseSchema:
-    return build_response({"countries": service.total_countries(), "capitals": service.total_capitals()})
+async def totals(service: StatisticsService = Depends(get_statistics_service)) -> Response:
+    return encoded_response(service.totals_json())
 
 
 @router.get(
@@ -40,9 +56,9 @@ async def totals(service: StatisticsService = Depends(get_statistics_service)) -
 )
 async def top_largest(
     service: StatisticsService = Depends(get_statistics_service),
-    limit: int = Query(default=5, ge=1, le=100, description="Number of records to return"),
-) -> ResponseSchema:
-    return build_response(service.top_largest_populations(limit))
+    limit: int = Query(default=5, ge=1, le=TOP_POPULATION_LIMIT, description="Number of records to return"),
+) -> Response:
+    return rows_response(service.top_largest_populations(limit), service.country_repo.snapshot)
 
 
 @router.get(
@@ -53,9 +69,9 @@ async def top_largest(
 )
 async def top_smallest(
     service: StatisticsService = Depends(get_statistics_service),
-    limit: int = Query(default=5, ge=1, le=100, description="Number of records to return"),
-) -> ResponseSchema:
-    return build_response(service.top_smallest_populations(limit))
+    limit: int = Query(default=5, ge=1, le=TOP_POPULATION_LIMIT, description="Number of records to return"),
+) -> Response:
+    return rows_response(service.top_smallest_populations(limit), service.country_repo.snapshot)
 
 
 @router.get(
@@ -64,8 +80,8 @@ async def top_smallest(
     summary="Region distribution",
     description="Distribution of countries by region.",
 )
-async def region_distribution(service: StatisticsService = Depends(get_statistics_service)) -> ResponseSchema:
-    return build_response(service.region_distribution())
+async def region_distribution(service: StatisticsService = Depends(get_statistics_service)) -> Response:
+    return encoded_response(service.country_statistics.regions_json)
 
 
 @router.get(
@@ -74,5 +90,25 @@ async def region_distribution(service: StatisticsService = Depends(get_statistic
     summary="Language distribution",
     description="Distribution of languages across countries.",
 )
-async def language_distribution(service: StatisticsService = Depends(get_statistics_service)) -> ResponseSchema:
-    return build_response(service.language_distribution())
+async def language_distribution(service: StatisticsService = Depends(get_statistics_service)) -> Response:
+    return encoded_response(service.country_statistics.languages_json)
+
+
+@router.get(
+    "/aggregate",
+    response_model=ResponseSchema,
+    summary="Group-by aggregation",
+    description=(
+        "Group countries by one or more fields and compute metrics per group, e.g. "
+        "`group_by=region,subregion&metrics=sum(population),avg(area),count()`. List fields such as `languages` "
+        "count a country once per element. Filters match `/countries`."
+    ),
+)
+async def aggregate(
+    group_by: str = Query(..., description="Comma-separated text or list fields, e.g. region,languages"),
+    metrics: str = Query(default="count()", description="Comma-separated count() / sum|avg|min|max(<numeric field>)"),
+    query: SearchModel = Depends(country_filters),
+    service: StatisticsService = Depends(get_statistics_service),
+) -> Response:
+    data, meta = service.aggregate(query, group_by, metrics)
+    return success_response(data, meta)
@@ -1,5 +1,7 @@
+from .result_cache import get_result_cache
 from .country_service import CountryService
 from .capital_service import CapitalService
 from .statistics_service import StatisticsService
+from .query_planner import CountryQueryPlanner, QueryPlan
 
-__all__ = ["CountryService", "CapitalService", "StatisticsService"]
+__all__ = ["CountryService", "CapitalService", "StatisticsService", "CountryQueryPlanner", "QueryPlan", "get_result_cache"]
@@ -0,0 +1,20 @@
+"""Helpers shared by the country and capital batch lookups."""
+
+from typing import Iterable, List
+
+from app.config.settings import get_settings
+from app.exceptions import BadRequestError
+
+
+def batch_keys(keys: Iterable[str], field: str) -> List[str]:
+    """
+    Strip blanks and repeated keys (keeping request order), enforcing ``ATLAS_BATCH_MAX_KEYS``.
+
+    Raises:
+        BadRequestError: if more distinct keys than allowed were requested.
+    """
+    distinct = list(dict.fromkeys(key.strip() for key in keys if key.strip()))
+    limit = get_settings().batch_max_keys
+    if len(distinct) > limit:
+        raise BadRequestError(f"Too many {field} in one batch (max {limit})", {field: len(distinct), "max": limit})
+    return distinct
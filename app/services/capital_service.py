@@ -1,47 +1,79 @@
 """Business logic layer for capital operations."""
 
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
 
 from app.exceptions import BadRequestError, NotFoundError
 from app.core.logging import get_logger
-from app.models import CapitalModel, PaginationMetaModel, PaginationModel, SearchModel
+from app.models import BatchMetaModel, CapitalModel, CursorMetaModel, PaginationMetaModel, PaginationModel, SearchModel
+from app.indexes import Selection, bitset
 from app.repositories import CapitalRepository
-from app.utils import matches_query, paginate_items
+from app.services.batch import batch_keys
+from app.services.keyset import paginate_keyset
+from app.services.result_cache import get_result_cache, result_cache_key, store_page
+from app.utils import LRUCache, RowView, paginate_items
 
 
 class CapitalService:
     """Orchestrates capital search, sorting, and pagination."""
 
-    def __init__(self, repository: CapitalRepository):
-        """Inject repository to decouple I/O from business logic."""
+    def __init__(self, repository: CapitalRepository, cache: Optional[LRUCache] = None):
+        """Inject repository (and optionally a result cache) to decouple I/O from business logic."""
         self.repository = repository
+        self.cache = cache if cache is not None else get_result_cache()
         self.logger = get_logger("atlas.service.capital")
 
     def list_capitals(
         self,
         pagination: PaginationModel,
         query: SearchModel,
-    ) -> Tuple[List[CapitalModel], PaginationMetaModel]:
+    ) -> Tuple[Sequence[CapitalModel], PaginationMetaModel]:
         """
         Return capitals matching search criteria with pagination.
 
-        - Text search by name (case-insensitive partial).
+        - Text search by name (case/accent-insensitive partial).
         - Optional sorting by any valid CapitalModel field.
         """
-        capitals = self.repository.get_all_capitals()
-        capitals = matches_query(capitals, lambda c: c.name, query.name)
-
-        if query.sort_by is not None:
-            if query.sort_by not in CapitalModel.model_fields:
-                self.logger.warning("Invalid capital sort field", extra={"extra": {"sort_by": query.sort_by}})
-                raise BadRequestError(f"Invalid sort field: {query.sort_by}", {"sort_by": query.sort_by})
-            descending = query.order == "desc"
-            sort_field = query.sort_by
-            capitals = sorted(capitals, key=lambda c: getattr(c, sort_field), reverse=descending)
-
-        items, meta = paginate_items(capitals, pagination.page, pagination.size)
+        self._validate_sort(query)
+        rows = self.repository.get_all_capitals()
+        cache_key = result_cache_key("capitals", self.repository.snapshot.version, query, pagination)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            ids, meta = cached
+            return RowView(rows, ids), meta
+
+        items, meta = paginate_items(self._select(query), pagination.page, pagination.size)
+        store_page(self.cache, cache_key, items, meta)
         return items, meta
 
+    def list_capitals_by_cursor(
+        self,
+        query: SearchModel,
+        size: int,
+        cursor: Optional[str],
+    ) -> Tuple[Sequence[CapitalModel], CursorMetaModel]:
+        """Keyset pagination: the page after ``cursor`` (empty to start), resumed from the sort index."""
+        self._validate_sort(query)
+        snapshot = self.repository.snapshot
+        return paginate_keyset(self._select(query), "capitals", snapshot.version, query, size, cursor)
+
+    def export(self, query: SearchModel) -> Selection[CapitalModel]:
+        """All capitals matching the search, in order; iterate ``iter_ids()`` to stream them."""
+        self._validate_sort(query)
+        return self._select(query)
+
+    def _validate_sort(self, query: SearchModel) -> None:
+        if query.sort_by is not None and query.sort_by not in CapitalModel.model_fields:
+            self.logger.warning("Invalid capital sort field", extra={"extra": {"sort_by": query.sort_by}})
+            raise BadRequestError(f"Invalid sort field: {query.sort_by}", {"sort_by": query.sort_by})
+
+    def _select(self, query: SearchModel) -> Selection[CapitalModel]:
+        rows = self.repository.get_all_capitals()
+        selected = bitset.full(len(rows))
+        if query.name:
+            selected = bitset.from_ids(self.repository.text_index.search(query.name), len(rows))
+        sort_index = self.repository.sort_index if query.sort_by is not None else None
+        return Selection(rows, selected, sort_index, query.sort_by, query.order == "desc")
+
     def get_by_name(self, name: str) -> CapitalModel:
         """Fetch a single capital by name, case-insensitive."""
         capital = self.repository.get_by_name(name)
@@ -49,3 +81,28 @@ class CapitalService:
             self.logger.info("Capital not found", extra={"extra": {"name": name}})
             raise NotFoundError(f"Capital '{name}' not found", {"name": name})
         return capital
+
+    def get_by_names(self, names: Sequence[str]) -> Tuple[Sequence[CapitalModel], BatchMetaModel]:
+        """Resolve many capital names at once; unknown names are reported in the metadata instead of raising."""
+        keys = batch_keys(names, "names")
+        capitals, missing = self.repository.get_by_names(keys)
+        if missing:
+            self.logger.info("Batch lookup misses", extra={"extra": {"requested": len(keys), "missing": len(missing)}})
+        return capitals, BatchMetaModel(requested=len(keys), found=len(capitals), missing=missing)
+
+    def nearby(
+        self, lat: float, lng: float, radius_km: Optional[float], k: Optional[int]
+    ) -> Tuple[RowView[CapitalModel], List[float]]:
+        """
+        Capitals nearest to a point, closest first, with their great-circle distances in km.
+
+        With only ``radius_km`` every capital inside the radius is returned; with ``k`` at most
+        ``k`` (default 10 when neither is given).
+        """
+        index = self.repository.spatial_index
+        if k is None and radius_km is not None:
+            matches = index.within(lat, lng, radius_km)
+        else:
+            matches = index.nearest(lat, lng, k if k is not None else 10, radius_km)
+        rows = RowView(self.repository.get_all_capitals(), [row_id for _, row_id in matches])
+        return rows, [distance for distance, _ in matches]
@@ -1,75 +1,106 @@
 """Business logic layer for country operations."""
 
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
 
 from app.exceptions import BadRequestError, NotFoundError
 from app.core.logging import get_logger
-from app.models import CountryModel, PaginationMetaModel, PaginationModel, SearchModel
+from app.models import BatchMetaModel, CountryModel, CursorMetaModel, PaginationMetaModel, PaginationModel, SearchModel
 from app.repositories import CountryRepository
-from app.utils import apply_numeric_filter, filter_by_list_field, matches_query, paginate_items
+from app.services.batch import batch_keys
+from app.services.keyset import paginate_keyset
+from app.services.result_cache import get_result_cache, result_cache_key, store_page
+from app.services.query_planner import CountryQueryPlanner, QueryPlan
+from app.indexes import Selection
+from app.utils import LRUCache, RowView, paginate_items
 
 
 class CountryService:
     """Orchestrates country search, filtering, sorting, and pagination."""
 
-    def __init__(self, repository: CountryRepository):
-        """Inject repository to decouple I/O from business logic."""
+    def __init__(self, repository: CountryRepository, cache: Optional[LRUCache] = None):
+        """Inject repository (and optionally a result cache) to decouple I/O from business logic."""
         self.repository = repository
+        self.cache = cache if cache is not None else get_result_cache()
         self.logger = get_logger("atlas.service.country")
+        # plan executed by the last list/export call (None when it was served from the result cache)
+        self.last_plan: Optional[QueryPlan] = None
 
     def list_countries(
         self,
         pagination: PaginationModel,
         query: SearchModel,
-    ) -> Tuple[List[CountryModel], PaginationMetaModel]:
+        explain: bool = False,
+    ) -> Tuple[Sequence[CountryModel], PaginationMetaModel]:
         """
         Return countries matching search/filter criteria with pagination.
 
-        - Text search across name, official_name, capital (case-insensitive, partial).
+        With ``explain`` the result cache is bypassed so ``last_plan`` describes this very page.
+
+        - Text search across name, official_name, capital (case/accent-insensitive, partial).
         - Region/subregion exact match (case-insensitive).
         - Numeric range filters for population and area.
         - Language/currency membership filters.
         - Sorting by any valid CountryModel field.
         """
-        countries = self.repository.get_all_countries()
-
-        # Text search: name
-        countries = matches_query(countries, lambda c: c.name, query.name)
-        if query.name:
-            base = self.repository.get_all_countries()
-            extras = [
-                *matches_query(base, lambda c: c.official_name, query.name),
-                *matches_query(base, lambda c: c.capital, query.name),
-            ]
-            dedup = {c.country_code: c for c in [*countries, *extras]}
-            countries = list(dedup.values())
-
-        # Region/subregion filters
-        if query.region:
-            countries = [c for c in countries if c.region.lower() == query.region.lower()]
-        if query.subregion:
-            countries = [c for c in countries if c.subregion.lower() == query.subregion.lower()]
-
-        # Numeric filters
-        countries = apply_numeric_filter(countries, lambda c: c.population, query.min_population, query.max_population)
-        countries = apply_numeric_filter(countries, lambda c: c.area, query.min_area, query.max_area)
-
-        # List membership filters
-        countries = filter_by_list_field(countries, lambda c: c.languages, query.language)
-        countries = filter_by_list_field(countries, lambda c: c.currencies, query.currency)
-
-        # Sorting
-        if query.sort_by is not None:
-            if query.sort_by not in CountryModel.model_fields:
-                self.logger.warning("Invalid sort field", extra={"extra": {"sort_by": query.sort_by}})
-                raise BadRequestError(f"Invalid sort field: {query.sort_by}", {"sort_by": query.sort_by})
-            descending = query.order == "desc"
-            sort_field = query.sort_by
-            countries = sorted(countries, key=lambda c: getattr(c, sort_field), reverse=descending)
-
-        items, meta = paginate_items(countries, pagination.page, pagination.size)
+        self._validate_query(query)
+        rows = self.repository.get_all_countries()
+        cache_key = result_cache_key("countries", self.repository.snapshot.version, query, pagination)
+        cached = None if explain else self.cache.get(cache_key)
+        if cached is not None:
+            ids, meta = cached
+            return RowView(rows, ids), meta
+
+        # Only the requested page is materialized, walking the sort permutation when sorting
+        items, meta = paginate_items(self._select(query), pagination.page, pagination.size)
+        store_page(self.cache, cache_key, items, meta)
         return items, meta
 
+    def list_countries_by_cursor(
+        self,
+        query: SearchModel,
+        size: int,
+        cursor: Optional[str],
+    ) -> Tuple[Sequence[CountryModel], CursorMetaModel]:
+        """Keyset pagination: the page after ``cursor`` (empty to start), resumed from the sort index."""
+        self._validate_query(query)
+        snapshot = self.repository.snapshot
+        return paginate_keyset(self._select(query), "countries", snapshot.version, query, size, cursor)
+
+    def export(self, query: SearchModel) -> Selection[CountryModel]:
+        """All countries matching the search, in order; iterate ``iter_ids()`` to stream them."""
+        self._validate_query(query)
+        return self._select(query)
+
+    def _validate_query(self, query: SearchModel) -> None:
+        if query.sort_by is not None and query.sort_by not in CountryModel.model_fields:
+            self.logger.warning("Invalid sort field", extra={"extra": {"sort_by": query.sort_by}})
+            raise BadRequestError(f"Invalid sort field: {query.sort_by}", {"sort_by": query.sort_by})
+        if query.min_lat is not None and query.max_lat is not None and query.min_lat > query.max_lat:
+            raise BadRequestError("min_lat must not exceed max_lat", {"min_lat": query.min_lat, "max_lat": query.max_lat})
+        has_point = query.near_lat is not None and query.near_lng is not None
+        if has_point != (query.within_km is not None):
+            raise BadRequestError("near and within_km must be given together", {"within_km": query.within_km})
+
+    def _select(self, query: SearchModel) -> Selection[CountryModel]:
+        # Intersect per-predicate index bitsets, most selective first
+        plan = CountryQueryPlanner(self.repository).plan(query)
+        selected = plan.execute()
+        self.last_plan = plan
+        self.logger.debug("Country query plan", extra={"extra": plan.explain()})
+        sort_index = self.repository.sort_index if query.sort_by is not None else None
+        return Selection(self.repository.get_all_countries(), selected, sort_index, query.sort_by, query.order == "desc")
+
+    def explain(self, query: SearchModel) -> dict:
+        """Run a search and return its plan with per-step estimated and actual cardinalities."""
+        self.export(query)
+        return self.explain_last()
+
+    def explain_last(self) -> dict:
+        """The plan of the last executed search, as serialized by ``QueryPlan.explain``."""
+        if self.last_plan is None:
+            raise RuntimeError("no query plan was executed")
+        return self.last_plan.explain()
+
     def get_by_code(self, code: str) -> CountryModel:
         """Fetch a single country by ISO code, case-insensitive."""
         country = self.repository.get_country_by_code(code)
@@ -78,22 +109,58 @@ class CountryService:
             raise NotFoundError(f"Country with code '{code}' not found", {"code": code})
         return country
 
-    def get_by_region(self, region: str, pagination: PaginationModel) -> Tuple[List[CountryModel], PaginationMetaModel]:
+    def get_by_codes(self, codes: Sequence[str]) -> Tuple[Sequence[CountryModel], BatchMetaModel]:
+        """Resolve many ISO codes at once; unknown codes are reported in the metadata instead of raising."""
+        keys = batch_keys(codes, "codes")
+        countries, missing = self.repository.get_countries_by_codes(keys)
+        if missing:
+            self.logger.info("Batch lookup misses", extra={"extra": {"requested": len(keys), "missing": len(missing)}})
+        return countries, BatchMetaModel(requested=len(keys), found=len(countries), missing=missing)
+
+    def _row_id(self, code: str) -> int:
+        row_id = self.repository.index.code(code)
+        if row_id is None:
+            self.logger.info("Country not found", extra={"extra": {"code": code}})
+            raise NotFoundError(f"Country with code '{code}' not found", {"code": code})
+        return row_id
+
+    def neighbors(self, code: str, depth: int = 1) -> Tuple[RowView[CountryModel], List[int]]:
+        """Countries reachable within ``depth`` land-border crossings, nearest first, with their hop counts."""
+        reached = self.repository.border_graph.neighbors(self._row_id(code), depth)
+        rows = RowView(self.repository.get_all_countries(), [row_id for row_id, _ in reached])
+        return rows, [hops for _, hops in reached]
+
+    def path(self, code: str, other: str) -> RowView[CountryModel]:
+        """Countries along a shortest land-border route from ``code`` to ``other``, both included."""
+        source, target = self._row_id(code), self._row_id(other)
+        route = self.repository.border_graph.path(source, target)
+        if route is None:
+            raise NotFoundError(
+                f"No land border path from '{code}' to '{other}'", {"code": code, "other": other}
+            )
+        return RowView(self.repository.get_all_countries(), route)
+
+    def landmass(self, code: str) -> RowView[CountryModel]:
+        """Every country connected to ``code`` by land borders, itself included."""
+        members = self.repository.border_graph.landmass(self._row_id(code))
+        return RowView(self.repository.get_all_countries(), members)
+
+    def get_by_region(self, region: str, pagination: PaginationModel) -> Tuple[Sequence[CountryModel], PaginationMetaModel]:
         """List countries filtered by region with pagination."""
         countries = self.repository.get_by_region(region)
         return paginate_items(countries, pagination.page, pagination.size)
 
-    def get_by_subregion(self, subregion: str, pagination: PaginationModel) -> Tuple[List[CountryModel], PaginationMetaModel]:
+    def get_by_subregion(self, subregion: str, pagination: PaginationModel) -> Tuple[Sequence[CountryModel], PaginationMetaModel]:
         """List countries filtered by subregion with pagination."""
         countries = self.repository.get_by_subregion(subregion)
         return paginate_items(countries, pagination.page, pagination.size)
 
-    def get_by_language(self, language: str, pagination: PaginationModel) -> Tuple[List[CountryModel], PaginationMetaModel]:
+    def get_by_language(self, language: str, pagination: PaginationModel) -> Tuple[Sequence[CountryModel], PaginationMetaModel]:
         """List countries that speak the given language (case-insensitive) with pagination."""
-        countries = filter_by_list_field(self.repository.get_all_countries(), lambda c: c.languages, language)
+        countries = self.repository.get_by_language(language)
         return paginate_items(countries, pagination.page, pagination.size)
 
-    def get_by_currency(self, currency: str, pagination: PaginationModel) -> Tuple[List[CountryModel], PaginationMetaModel]:
+    def get_by_currency(self, currency: str, pagination: PaginationModel) -> Tuple[Sequence[CountryModel], PaginationMetaModel]:
         """List countries that use the given currency (case-insensitive) with pagination."""
-        countries = filter_by_list_field(self.repository.get_all_countries(), lambda c: c.currencies, currency)
+        countries = self.repository.get_by_currency(currency)
         return paginate_items(countries, pagination.page, pagination.size)
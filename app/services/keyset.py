@@ -0,0 +1,92 @@
+"""Keyset (cursor) pagination over index selections."""
+
+import base64
+import binascii
+import hashlib
+import json
+from typing import Any, NamedTuple, Optional, Tuple
+
+from app.exceptions import InvalidCursorError
+from app.indexes import Selection
+from app.models import CursorMetaModel, SearchModel
+from app.services.result_cache import normalized_query
+from app.utils import RowView, encode_json
+
+
+class Cursor(NamedTuple):
+    """Where a page ended: the query it belongs to, the snapshot version, the last row and its sort key."""
+
+    query: str
+    version: str
+    row_id: int
+    key: Any
+
+
+def query_fingerprint(namespace: str, query: SearchModel) -> str:
+    """Short hash of the normalized search (filters, sort field and order)."""
+    canonical = repr((namespace, normalized_query(query))).encode("utf-8")
+    return hashlib.sha256(canonical).hexdigest()[:12]
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    return base64.urlsafe_b64encode(encode_json(list(cursor))).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Parse an opaque cursor, rejecting anything this module did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        query, version, row_id, key = json.loads(raw)
+        if not isinstance(query, str) or not isinstance(version, str) or not isinstance(row_id, int) or row_id < 0:
+            raise ValueError("malformed cursor")
+    except (ValueError, TypeError, binascii.Error) as exc:
+        raise InvalidCursorError("Invalid cursor", {"cursor": token}) from exc
+    return Cursor(query, version, row_id, key)
+
+
+def paginate_keyset(
+    selection: Selection,
+    namespace: str,
+    version: str,
+    query: SearchModel,
+    size: int,
+    token: Optional[str],
+) -> Tuple[RowView, CursorMetaModel]:
+    """
+    Return the page following ``token`` (an empty or missing token starts at the first row).
+
+    On the snapshot the cursor was issued for, the page resumes right after the cursor's row
+    through the sort ranks. After a reload, the cursor's sort key is looked up in the new
+    ordering instead, so rows already returned are not repeated. Unsorted pages follow row
+    ids, which a reload reassigns, so their cursors are rejected instead.
+
+    Raises:
+        InvalidCursorError: if the cursor is malformed, belongs to another query, or is an
+            unsorted cursor from another snapshot version.
+    """
+    fingerprint = query_fingerprint(namespace, query)
+    position = 0
+    if token:
+        cursor = decode_cursor(token)
+        if cursor.query != fingerprint:
+            raise InvalidCursorError("Cursor does not match the query", {"cursor": token})
+        if cursor.version != version and selection.field is None:
+            raise InvalidCursorError(
+                "Cursor expired: the dataset was reloaded; restart from an empty cursor",
+                {"cursor": token, "version": version},
+            )
+        try:
+            if cursor.version == version:
+                position = selection.position_after(cursor.row_id)
+            else:
+                position = selection.seek(cursor.key)
+        except (IndexError, TypeError) as exc:
+            raise InvalidCursorError("Invalid cursor", {"cursor": token}) from exc
+
+    ids = selection.ids_from(position, size + 1)
+    page = RowView(selection.items, ids[:size])
+    next_cursor = None
+    if len(ids) > size:
+        last = ids[size - 1]
+        next_cursor = encode_cursor(Cursor(fingerprint, version, last, selection.sort_key(last)))
+    return page, CursorMetaModel(size=size, total_items=len(selection), next_cursor=next_cursor)
@@ -0,0 +1,154 @@
+"""Bitmap query planner turning a SearchModel into ordered index lookups."""
+
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from app.indexes import bitset
+from app.models import SearchModel
+from app.repositories import CountryRepository
+
+
+class PlanStep:
+    """One predicate of a plan: how many rows it is expected to keep and how to evaluate it."""
+
+    def __init__(self, predicate: str, index: str, estimate: int, evaluate: Callable[[], int]):
+        self.predicate = predicate
+        self.index = index
+        self.estimate = estimate
+        self.evaluate = evaluate
+        self.rows_after: Optional[int] = None
+
+    def explain(self) -> Dict[str, Any]:
+        return {
+            "predicate": self.predicate,
+            "index": self.index,
+            "estimated_rows": self.estimate,
+            "rows_after": self.rows_after,
+            "skipped": self.rows_after is None,
+        }
+
+
+class QueryPlan:
+    """Predicates ordered by estimated selectivity, intersected as row bitsets."""
+
+    def __init__(self, total_rows: int, steps: List[PlanStep]):
+        self.total_rows = total_rows
+        self.steps = sorted(steps, key=lambda step: step.estimate)
+        self.result_rows: Optional[int] = None
+
+    def execute(self) -> int:
+        """Intersect step bitsets, most selective first, stopping as soon as nothing is left."""
+        selected = bitset.full(self.total_rows)
+        for step in self.steps:
+            selected &= step.evaluate()
+            step.rows_after = bitset.count(selected)
+            if not selected:
+                break
+        self.result_rows = bitset.count(selected)
+        return selected
+
+    def explain(self) -> Dict[str, Any]:
+        return {
+            "total_rows": self.total_rows,
+            "steps": [step.explain() for step in self.steps],
+            "result_rows": self.result_rows,
+        }
+
+
+class CountryQueryPlanner:
+    """Builds plans for country searches from the repository's per-snapshot indexes."""
+
+    def __init__(self, repository: CountryRepository):
+        self.repository = repository
+
+    def plan(self, query: SearchModel) -> QueryPlan:
+        repo = self.repository
+        size = len(repo.get_all_countries())
+        index = repo.index
+        steps: List[PlanStep] = []
+
+        if query.name:
+            name = query.name
+            text_index = repo.text_index
+            steps.append(
+                PlanStep(
+                    f"name ~ {name!r}",
+                    "trigram",
+                    text_index.estimate(name),
+                    lambda: bitset.from_ids(text_index.search(name), size),
+                )
+            )
+
+        for kind in ("region", "subregion", "language", "currency"):
+            value = getattr(query, kind)
+            if value:
+                steps.append(
+                    PlanStep(
+                        f"{kind} = {value!r}",
+                        "hash",
+                        len(index.postings(kind, value)),
+                        partial(index.bits, kind, value),
+                    )
+                )
+
+        columns = repo.columns
+        for field in ("population", "area"):
+            low = getattr(query, f"min_{field}")
+            high = getattr(query, f"max_{field}")
+            if low is not None or high is not None:
+                steps.append(
+                    PlanStep(
+                        f"{field} in [{low}, {high}]",
+                        "column",
+                        columns.count(field, low, high),
+                        partial(columns.range, field, low, high),
+                    )
+                )
+
+        if query.min_lat is not None or query.max_lat is not None:
+            low, high = query.min_lat, query.max_lat
+            steps.append(
+                PlanStep(
+                    f"latitude in [{low}, {high}]",
+                    "column",
+                    columns.count("latitude", low, high),
+                    partial(columns.range, "latitude", low, high),
+                )
+            )
+
+        if query.min_lng is not None or query.max_lng is not None:
+            west, east = query.min_lng, query.max_lng
+            if west is not None and east is not None and west > east:
+                # the box crosses the antimeridian: [west, 180] or [-180, east]
+                steps.append(
+                    PlanStep(
+                        f"longitude in [{west}, 180] or [-180, {east}]",
+                        "column",
+                        columns.count("longitude", west, None) + columns.count("longitude", None, east),
+                        lambda: columns.range("longitude", west, None) | columns.range("longitude", None, east),
+                    )
+                )
+            else:
+                steps.append(
+                    PlanStep(
+                        f"longitude in [{west}, {east}]",
+                        "column",
+                        columns.count("longitude", west, east),
+                        partial(columns.range, "longitude", west, east),
+                    )
+                )
+
+        if query.within_km is not None and query.near_lat is not None and query.near_lng is not None:
+            # the k-d tree lookup is sublinear, so its exact result doubles as the estimate
+            near = repo.spatial_index.within(query.near_lat, query.near_lng, query.within_km)
+            near_ids = [row_id for _, row_id in near]
+            steps.append(
+                PlanStep(
+                    f"distance({query.near_lat}, {query.near_lng}) <= {query.within_km} km",
+                    "kdtree",
+                    len(near_ids),
+                    lambda: bitset.from_ids(near_ids, size),
+                )
+            )
+
+        return QueryPlan(size, steps)
@@ -0,0 +1,56 @@
+"""Process-wide cache of list/search results keyed on the normalized query and dataset version."""
+
+import sys
+from functools import lru_cache
+from typing import Any, Hashable, Sequence, Tuple
+
+from app.config.settings import get_settings
+from app.models import PaginationMetaModel, PaginationModel, SearchModel
+from app.repositories import add_swap_listener
+from app.utils import LRUCache, RowView, fold_text
+
+CachedPage = Tuple[Tuple[int, ...], PaginationMetaModel]
+
+_FOLDED_FIELDS = ("region", "subregion", "language", "currency")
+
+
+def normalized_query(query: SearchModel) -> Tuple[Tuple[str, Any], ...]:
+    """Search parameters in canonical form: equivalent queries (case, accents, whitespace) compare equal."""
+    params = query.model_dump()
+    if params["name"] is not None:
+        params["name"] = fold_text(params["name"]) or None
+    for field in _FOLDED_FIELDS:
+        if params[field] is not None:
+            params[field] = params[field].strip().casefold() or None
+    if params["sort_by"] is None:
+        params["order"] = "asc"
+    return tuple(sorted(params.items()))
+
+
+def result_cache_key(namespace: str, version: str, query: SearchModel, pagination: PaginationModel) -> Hashable:
+    """Canonical key: equivalent queries share one entry."""
+    return (namespace, version, normalized_query(query), pagination.page, pagination.size)
+
+
+def page_weight(ids: Sequence[int]) -> int:
+    """Approximate bytes held by a cached page (id tuple plus metadata)."""
+    return sys.getsizeof(tuple(ids)) + 512
+
+
+def store_page(cache: LRUCache, key: Hashable, page: Sequence, meta: PaginationMetaModel) -> None:
+    """Cache a page as its row ids; pages that are not row views are not cached."""
+    if isinstance(page, RowView):
+        ids = tuple(page.ids)
+        cache.set(key, (ids, meta), page_weight(ids))
+
+
+@lru_cache()
+def get_result_cache() -> LRUCache:
+    settings = get_settings()
+    cache = LRUCache(
+        max_entries=settings.result_cache_max_entries,
+        max_bytes=settings.result_cache_max_bytes,
+        ttl=settings.result_cache_ttl,
+    )
+    add_swap_listener(lambda _: cache.clear())
+    return cache
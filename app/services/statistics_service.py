@@ -1,44 +1,139 @@
-from typing import Dict, List
+import re
+from typing import Any, Dict, List, Sequence, Tuple
 
+from app.core.logging import get_logger
+from app.exceptions import BadRequestError
+from app.indexes import AGGREGATE_FUNCTIONS, Metric, SortIndex, aggregate, bitset
+from app.models import CountryModel, SearchModel
 from app.repositories import CapitalRepository, CountryRepository
+from app.repositories.country_repository import COUNTRY_GROUP_FIELDS, COUNTRY_NUMERIC_FIELDS
+from app.services.country_service import CountryService
+from app.utils import RowView, encode_json, field_values
+
+# deepest top-population page served; matches the route's ``limit`` bound
+TOP_POPULATION_LIMIT = 100
+MAX_GROUP_BY_FIELDS = 4
+_METRIC = re.compile(r"^(\w+)\(\s*(\w*)\s*\)$")
+
+
+class CountryStatistics:
+    """
+    Every country aggregate of one snapshot, computed and JSON-encoded once.
+
+    Built through ``DatasetSnapshot.derive``, so it lives exactly as long as the snapshot and
+    a reload yields a fresh one. Distributions keep first-seen order, as before.
+    """
+
+    def __init__(self, items: Sequence[CountryModel], sort_index: SortIndex):
+        self.total = len(items)
+        regions: Dict[str, int] = {}
+        for region in field_values(items, "region"):
+            regions[region] = regions.get(region, 0) + 1
+        languages: Dict[str, int] = {}
+        for spoken in field_values(items, "languages"):
+            for language in spoken:
+                languages[language] = languages.get(language, 0) + 1
+        self.regions = regions
+        self.languages = languages
+        self.largest: Tuple[int, ...] = tuple(sort_index.top("population", True, TOP_POPULATION_LIMIT))
+        self.smallest: Tuple[int, ...] = tuple(sort_index.top("population", False, TOP_POPULATION_LIMIT))
+        self.regions_json = encode_json(regions)
+        self.languages_json = encode_json(languages)
 
 
 class StatisticsService:
     def __init__(self, country_repo: CountryRepository, capital_repo: CapitalRepository):
         self.country_repo = country_repo
         self.capital_repo = capital_repo
+        self.logger = get_logger("atlas.service.statistics")
+
+    @property
+    def country_statistics(self) -> CountryStatistics:
+        """Materialized aggregates of the pinned country snapshot."""
+        sort_index = self.country_repo.sort_index
+        return self.country_repo.snapshot.derive("country_statistics", lambda items: CountryStatistics(items, sort_index))
 
     def total_countries(self) -> int:
-        return len(self.country_repo.get_all_countries())
+        return len(self.country_repo.snapshot)
 
     def total_capitals(self) -> int:
-        return len(self.capital_repo.get_all_capitals())
+        return len(self.capital_repo.snapshot)
 
-    def top_largest_populations(self, limit: int = 5) -> List[dict]:
-        if limit <= 0:
-            from app.exceptions import BadRequestError
-            raise BadRequestError("limit must be positive", {"limit": limit})
-        countries = self.country_repo.get_all_countries()
-        ranked = sorted(countries, key=lambda c: c.population, reverse=True)[:limit]
-        return [c.model_dump() for c in ranked]
+    def totals_json(self) -> bytes:
+        return encode_json({"countries": self.total_countries(), "capitals": self.total_capitals()})
 
-    def top_smallest_populations(self, limit: int = 5) -> List[dict]:
+    def _top(self, ranked: Tuple[int, ...], limit: int) -> RowView[CountryModel]:
         if limit <= 0:
-            from app.exceptions import BadRequestError
             raise BadRequestError("limit must be positive", {"limit": limit})
-        countries = self.country_repo.get_all_countries()
-        ranked = sorted(countries, key=lambda c: c.population)[:limit]
-        return [c.model_dump() for c in ranked]
+        if limit > TOP_POPULATION_LIMIT:
+            raise BadRequestError(f"limit must be at most {TOP_POPULATION_LIMIT}", {"limit": limit})
+        return RowView(self.country_repo.get_all_countries(), ranked[:limit])
+
+    def top_largest_populations(self, limit: int = 5) -> RowView[CountryModel]:
+        return self._top(self.country_statistics.largest, limit)
+
+    def top_smallest_populations(self, limit: int = 5) -> RowView[CountryModel]:
+        return self._top(self.country_statistics.smallest, limit)
 
     def region_distribution(self) -> Dict[str, int]:
-        regions: Dict[str, int] = {}
-        for c in self.country_repo.get_all_countries():
-            regions[c.region] = regions.get(c.region, 0) + 1
-        return regions
+        return self.country_statistics.regions
 
     def language_distribution(self) -> Dict[str, int]:
-        langs: Dict[str, int] = {}
-        for c in self.country_repo.get_all_countries():
-            for lang in c.languages:
-                langs[lang] = langs.get(lang, 0) + 1
-        return langs
+        return self.country_statistics.languages
+
+    def aggregate(self, query: SearchModel, group_by: str, metrics: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Group the countries matching ``query`` (same filters as ``list_countries``) and compute metrics per group.
+
+        ``group_by`` is a comma-separated list of text or list fields (list fields such as
+        ``languages`` count a country once per element); ``metrics`` holds ``count()`` or
+        ``sum|avg|min|max(<numeric field>)`` terms.
+        """
+        fields = _parse_group_by(group_by)
+        parsed = _parse_metrics(metrics)
+        selected = CountryService(self.country_repo).export(query).selected
+        keys = [self.country_repo.group_keys(field) for field in fields]
+        columns = {m.field: self.country_repo.columns.column(m.field) for m in parsed if m.field is not None}
+        groups = aggregate(selected, keys, columns, parsed)
+        labels = [m.label for m in parsed]
+        data = [dict(zip(fields, key)) | dict(zip(labels, values)) for key, values in groups]
+        meta = {"group_by": fields, "metrics": labels, "matched": bitset.count(selected), "total_groups": len(data)}
+        self.logger.debug("Aggregation", extra={"extra": meta})
+        return data, meta
+
+
+def _split(raw: str) -> List[str]:
+    seen: Dict[str, None] = {}
+    for part in raw.split(","):
+        if part.strip():
+            seen.setdefault(part.strip(), None)
+    return list(seen)
+
+
+def _parse_group_by(raw: str) -> List[str]:
+    fields = _split(raw)
+    if not fields:
+        raise BadRequestError("group_by must name at least one field", {"group_by": raw})
+    if len(fields) > MAX_GROUP_BY_FIELDS:
+        raise BadRequestError(f"group_by accepts at most {MAX_GROUP_BY_FIELDS} fields", {"group_by": fields})
+    unknown = [field for field in fields if field not in COUNTRY_GROUP_FIELDS]
+    if unknown:
+        raise BadRequestError(f"Invalid group_by field: {unknown[0]}", {"group_by": unknown, "allowed": COUNTRY_GROUP_FIELDS})
+    return fields
+
+
+def _parse_metrics(raw: str) -> List[Metric]:
+    metrics: List[Metric] = []
+    for term in _split(raw):
+        match = _METRIC.match(term)
+        if match is None or match.group(1) not in AGGREGATE_FUNCTIONS:
+            raise BadRequestError(f"Invalid metric: {term}", {"metric": term, "functions": list(AGGREGATE_FUNCTIONS)})
+        function, field = match.group(1), match.group(2) or None
+        if function == "count" and field is not None:
+            raise BadRequestError("count() takes no field", {"metric": term})
+        if function != "count" and field not in COUNTRY_NUMERIC_FIELDS:
+            raise BadRequestError(f"Invalid metric field: {field}", {"metric": term, "allowed": COUNTRY_NUMERIC_FIELDS})
+        metrics.append(Metric(function, field))
+    if not metrics:
+        raise BadRequestError("metrics must contain at least one term", {"metrics": raw})
+    return metrics
@@ -1,13 +1,26 @@
-from .json_loader import load_json_data
-from .filters import apply_numeric_filter, filter_by_list_field, filter_by_region
-from .search import matches_query
+from .json_loader import load_json_data, parse_json_data, read_json_file
+from .filters import parse_point
+from .search import fold_text, normalize
+from .rows import RowView, field_values
 from .pagination import paginate_items
+from .cache import LRUCache
+from .encoding import encode_array, encode_envelope, encode_json, encode_model, encode_projection, encode_rows
 
 __all__ = [
     "load_json_data",
-    "apply_numeric_filter",
-    "filter_by_list_field",
-    "filter_by_region",
-    "matches_query",
+    "parse_json_data",
+    "read_json_file",
+    "parse_point",
+    "fold_text",
+    "normalize",
     "paginate_items",
+    "RowView",
+    "field_values",
+    "LRUCache",
+    "encode_array",
+    "encode_envelope",
+    "encode_json",
+    "encode_model",
+    "encode_projection",
+    "encode_rows",
 ]
@@ -0,0 +1,87 @@
+"""Thread-safe LRU cache bounded by entry count and approximate bytes, with optional TTL."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Least-recently-used cache.
+
+    Each entry carries a caller-supplied weight (approximate bytes); the oldest
+    entries are evicted once either ``max_entries`` or ``max_bytes`` is exceeded.
+    A ``ttl`` of 0 keeps entries until they are evicted or cleared.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float = 0.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, weight, expires_at = entry
+            if expires_at and expires_at <= self._clock():
+                self._remove(key, weight)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, weight: int) -> None:
+        if not self.enabled or weight > self.max_bytes:
+            return
+        expires_at = self._clock() + self.ttl if self.ttl > 0 else 0.0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, weight, expires_at)
+            self._bytes += weight
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_weight, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_weight
+                self.evictions += 1
+
+    def _remove(self, key: Hashable, weight: int) -> None:
+        del self._entries[key]
+        self._bytes -= weight
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
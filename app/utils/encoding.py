@@ -0,0 +1,40 @@
+"""JSON encoding helpers producing the exact bytes FastAPI's JSONResponse would emit."""
+
+import json
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+ENVELOPE_PREFIX = b'{"status":"success","data":'
+
+
+def encode_json(value: Any) -> bytes:
+    """Compact UTF-8 JSON, matching ``JSONResponse.render``."""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def encode_model(model: BaseModel) -> bytes:
+    return encode_json(model.model_dump(mode="json"))
+
+
+def encode_projection(encoded_row: bytes, fields: Sequence[str]) -> bytes:
+    """Re-encode a pre-encoded row keeping only ``fields``, in that order."""
+    row = json.loads(encoded_row)
+    return encode_json({field: row[field] for field in fields})
+
+
+def encode_rows(items: Iterable[BaseModel]) -> Tuple[bytes, ...]:
+    """Pre-encode every row once (used per dataset snapshot)."""
+    return tuple(encode_model(item) for item in items)
+
+
+def encode_array(encoded_items: Sequence[bytes]) -> bytes:
+    return b"[" + b",".join(encoded_items) + b"]"
+
+
+def encode_envelope(data: bytes, meta: Optional[Any] = None) -> bytes:
+    """Wrap already-encoded data into the ``{status, data, meta, error}`` success envelope."""
+    if isinstance(meta, BaseModel):
+        meta = meta.model_dump(mode="json")
+    meta_bytes = b"null" if meta is None else encode_json(meta)
+    return ENVELOPE_PREFIX + data + b',"meta":' + meta_bytes + b',"error":null}'
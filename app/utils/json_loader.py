@@ -1,9 +1,9 @@
-"""Utilities for safely loading and validating JSON datasets with caching."""
+"""Utilities for safely loading and validating JSON datasets."""
 
 import json
-from functools import lru_cache
+import os
 from pathlib import Path
-from typing import Any, Callable, List, Optional
+from typing import Any, List, Optional, Tuple
 
 from app.exceptions import BadRequestError
 
@@ -22,26 +22,25 @@ def _validate_schema(data: Any, required_keys: Optional[List[str]] = None) -> No
             raise BadRequestError(f"Dataset item missing keys: {', '.join(missing)}")
 
 
-def _load_file(path: Path) -> Any:
-    """Load JSON file or raise BadRequestError if missing."""
+def read_json_file(path: Path) -> Tuple[bytes, os.stat_result]:
+    """Read a dataset file with a single open, returning its bytes and stat taken from the same handle."""
     if not path.exists():
         raise BadRequestError(f"Data file not found: {path}")
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return f.read(), os.fstat(f.fileno())
 
 
-def cached_loader(path: Path, required_keys: Optional[List[str]] = None) -> Callable[[], Any]:
-    """Return a cached loader callable to avoid re-reading files each call."""
-
-    @lru_cache(maxsize=1)
-    def _loader():
-        data = _load_file(path)
-        _validate_schema(data, required_keys)
-        return data
-
-    return _loader
+def parse_json_data(raw: bytes, required_keys: Optional[List[str]] = None) -> Any:
+    """Decode raw JSON bytes and validate required keys."""
+    try:
+        data = json.loads(raw)
+    except ValueError as exc:
+        raise BadRequestError("Dataset is not valid JSON", {"error": str(exc)}) from exc
+    _validate_schema(data, required_keys)
+    return data
 
 
 def load_json_data(path: Path, required_keys: Optional[List[str]] = None) -> Any:
-    """Load and validate JSON using a cached loader."""
-    return cached_loader(path, required_keys)()
+    """Load and validate JSON from disk (uncached; repositories share snapshots instead)."""
+    raw, _ = read_json_file(path)
+    return parse_json_data(raw, required_keys)
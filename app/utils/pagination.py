@@ -1,14 +1,20 @@
-from typing import List, Sequence, Tuple, TypeVar
+from typing import Sequence, Tuple, TypeVar
 
 from app.models import PaginationMetaModel
+from app.utils.rows import RowView
 
 T = TypeVar("T")
 
 
-def paginate_items(items: Sequence[T], page: int, size: int) -> Tuple[List[T], PaginationMetaModel]:
-    """Slice a list/sequence and build pagination metadata."""
+def paginate_items(items: Sequence[T], page: int, size: int) -> Tuple[Sequence[T], PaginationMetaModel]:
+    """
+    Slice a list/sequence and build pagination metadata.
+
+    Row views stay views (only the page's row ids are kept); anything else is copied into a list.
+    """
     start = (page - 1) * size
     end = start + size
-    sliced = list(items[start:end])
+    window = items[start:end]
+    sliced: Sequence[T] = window if isinstance(window, RowView) else list(window)
     meta = PaginationMetaModel.from_counts(page=page, size=size, total_items=len(items))
     return sliced, meta
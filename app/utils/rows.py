@@ -0,0 +1,55 @@
+"""Lazy row views over snapshot items selected by row id."""
+
+from typing import Any, Iterator, Sequence, TypeVar, Union, overload
+
+T = TypeVar("T")
+
+
+class RowView(Sequence[T]):
+    """
+    Read-only sequence of snapshot items addressed by row ids.
+
+    Slicing returns another view, so paginating a large match set only
+    touches the rows on the requested page.
+    """
+
+    __slots__ = ("items", "ids")
+
+    def __init__(self, items: Sequence[T], ids: Sequence[int]):
+        self.items = items
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "RowView[T]": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, "RowView[T]"]:
+        if isinstance(index, slice):
+            return RowView(self.items, self.ids[index])
+        return self.items[self.ids[index]]
+
+    def __iter__(self) -> Iterator[T]:
+        items = self.items
+        for row_id in self.ids:
+            yield items[row_id]
+
+    def __repr__(self) -> str:
+        return f"RowView({len(self.ids)} rows)"
+
+
+def field_values(items: Sequence[Any], field: str) -> Sequence[Any]:
+    """
+    Values of one field for every row, in row id order.
+
+    Row sequences that store fields column-wise (memory-mapped snapshots) expose ``column``
+    and are read without materializing a model per row.
+    """
+    column = getattr(items, "column", None)
+    if column is not None:
+        return column(field)
+    return [getattr(item, field) for item in items]
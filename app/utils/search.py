@@ -1,9 +1,7 @@
-"""Search helpers for text normalization and partial matching."""
+"""Text normalization shared by the search indexes and cache keys."""
 
 import re
-from typing import Callable, Iterable, List, TypeVar
-
-T = TypeVar("T")
+import unicodedata
 
 
 def normalize(text: str) -> str:
@@ -11,14 +9,9 @@ def normalize(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip().lower()
 
 
-def matches_query(items: Iterable[T], getter: Callable[[T], str], query: str | None) -> List[T]:
-    """Return items whose getter value contains the normalized query as a substring."""
-    if not query:
-        return list(items)
-    q = normalize(query)
-    results: List[T] = []
-    for item in items:
-        value = normalize(getter(item))
-        if q in value:
-            results.append(item)
-    return results
+def fold_text(text: str) -> str:
+    """Normalize text and strip accents (e.g. "Brasília" -> "brasilia") for accent-insensitive search."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return normalize(stripped.casefold())
+
@@ -0,0 +1,59 @@
+"""
+Group-by aggregation: vectorized NumPy path vs the dict-based fallback.
+
+Rows get a region, a subregion and 0-3 languages (exploded per element), and every run
+computes ``count()``, ``sum(population)`` and ``avg(area)`` over a random half of the rows.
+Both paths are checked to return the same groups.
+
+    python -m benchmarks.group_aggregate [--rows 100000] [--runs 20]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import List
+
+from app.indexes import HAS_NUMPY, GroupKeys, Metric, aggregate, bitset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    regions = [f"region-{rng.randrange(6)}" for _ in range(args.rows)]
+    subregions = [f"{region}/sub-{rng.randrange(5)}" for region in regions]
+    languages = [[f"lang-{n}" for n in rng.sample(range(40), rng.randint(0, 3))] for _ in range(args.rows)]
+    columns = {
+        "population": [rng.randrange(10**9) for _ in range(args.rows)],
+        "area": [rng.uniform(1.0, 1e7) for _ in range(args.rows)],
+    }
+    metrics = [Metric("count"), Metric("sum", "population"), Metric("avg", "area")]
+    selected = bitset.from_ids((i for i in range(args.rows) if rng.random() < 0.5), args.rows)
+
+    start = time.perf_counter()
+    keys = {
+        "region,subregion": [GroupKeys(regions), GroupKeys(subregions)],
+        "region,languages": [GroupKeys(regions), GroupKeys(languages)],
+    }
+    print(f"factorize {args.rows} rows x 3 fields: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    for name, group_keys in keys.items():
+        paths = [False, True] if HAS_NUMPY else [False]
+        results = [aggregate(selected, group_keys, columns, metrics, use_numpy) for use_numpy in paths]
+        assert all([key for key, _ in r] == [key for key, _ in results[0]] for r in results)
+        for use_numpy in paths:
+            timings: List[float] = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                aggregate(selected, group_keys, columns, metrics, use_numpy)
+                timings.append((time.perf_counter() - start) * 1e3)
+            label = f"{name} ({'numpy' if use_numpy else 'python'})"
+            print(f"{label:>34}: mean {statistics.fmean(timings):9.3f} ms   max {max(timings):9.3f} ms   groups {len(results[0])}")
+
+
+if __name__ == "__main__":
+    main()
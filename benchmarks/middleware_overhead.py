@@ -0,0 +1,143 @@
+"""
+Per-request middleware overhead on ``/health``: pure ASGI stack vs the former BaseHTTPMiddleware stack.
+
+Requests are driven straight through the ASGI callable (no HTTP client or server), so the
+numbers isolate the application and middleware cost.
+
+    python -m benchmarks.middleware_overhead [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from typing import Callable, Dict, List
+
+os.environ.setdefault("ATLAS_RATE_LIMIT_PER_MINUTE", "100000000")
+os.environ.setdefault("ATLAS_LOG_LEVEL", "WARNING")
+
+from fastapi import FastAPI, Request  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.core.logging import RequestLoggingMiddleware, _request_id_ctx, get_logger  # noqa: E402
+from app.core.security import RateLimiterMiddleware, SecurityHeadersMiddleware  # noqa: E402
+from app.main import create_app  # noqa: E402
+
+
+class LegacyRequestLogging(BaseHTTPMiddleware):
+    def __init__(self, app):
+        super().__init__(app)
+        self.logger = get_logger("atlas.request")
+
+    async def dispatch(self, request: Request, call_next: Callable):
+        request_id = str(uuid.uuid4())
+        _request_id_ctx.set(request_id)
+        start = time.perf_counter()
+        response = await call_next(request)
+        self.logger.info(
+            "HTTP request",
+            extra={"extra": {"path": request.url.path, "duration_ms": (time.perf_counter() - start) * 1000}},
+        )
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacySecurityHeaders(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: Callable):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains"
+        return response
+
+
+class LegacyRateLimiter(BaseHTTPMiddleware):
+    def __init__(self, app):
+        super().__init__(app)
+        self.bucket: Dict[str, Dict[str, float]] = {}
+
+    async def dispatch(self, request: Request, call_next: Callable):
+        client_ip = request.client.host if request.client else "anonymous"
+        entry = self.bucket.setdefault(client_ip, {"count": 0, "window_start": time.time()})
+        entry["count"] += 1
+        return await call_next(request)
+
+
+OURS = {RequestLoggingMiddleware, SecurityHeadersMiddleware, RateLimiterMiddleware}
+
+
+def build(variant: str) -> FastAPI:
+    app = create_app()
+    app.user_middleware = [m for m in app.user_middleware if m.cls not in OURS]
+    if variant == "legacy":
+        app.add_middleware(LegacyRequestLogging)
+        app.add_middleware(LegacySecurityHeaders)
+        app.add_middleware(LegacyRateLimiter)
+    elif variant == "asgi":
+        app.add_middleware(RequestLoggingMiddleware)
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(RateLimiterMiddleware)
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> List[float]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await app(dict(scope), receive, send)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=3, help="interleaved rounds; the best median is kept")
+    args = parser.parse_args()
+
+    variants = ("bare", "legacy", "asgi")
+    apps = {variant: build(variant) for variant in variants}
+    for app in apps.values():
+        asyncio.run(run(app, 500))  # warm up routing and the middleware stack
+    best: Dict[str, List[float]] = {}
+    for _ in range(args.rounds):
+        for variant in variants:
+            timings = asyncio.run(run(apps[variant], args.requests))
+            if variant not in best or statistics.median(timings) < statistics.median(best[variant]):
+                best[variant] = timings
+
+    results = {}
+    for variant in variants:
+        results[variant] = statistics.median(best[variant])
+        p99 = statistics.quantiles(best[variant], n=100)[98]
+        print(f"{variant:>7}: median {results[variant]:8.1f} us   p99 {p99:8.1f} us")
+    for variant in ("legacy", "asgi"):
+        print(f"{variant:>7} middleware overhead: {results[variant] - results['bare']:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
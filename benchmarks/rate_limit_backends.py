@@ -0,0 +1,89 @@
+"""
+Rate-limit backend overhead and cross-process accuracy.
+
+Part 1 times ``hit()`` for the in-process token bucket and the SQLite (WAL) backend at several
+sync intervals. Part 2 starts several processes sharing one SQLite file, all hitting the same
+client key, and reports how many requests were admitted against the per-minute quota.
+
+    python -m benchmarks.rate_limit_backends [--hits 200000] [--workers 4]
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from app.core.rate_limit import RateLimitBackend, SQLiteRateLimitBackend, TokenBucketLimiter
+
+
+def time_hits(backend: RateLimitBackend, hits: int, clients: int) -> List[float]:
+    """Per-hit latency in microseconds, cycling over ``clients`` keys with an unreachable quota."""
+    keys = [f"ip:10.0.{i // 256}.{i % 256}" for i in range(clients)]
+    timings = []
+    for i in range(hits):
+        key = keys[i % clients]
+        start = time.perf_counter()
+        backend.hit(key, 10**9)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def _worker(path: str, quota: int, attempts: int, sync_interval: float, results) -> None:
+    backend = SQLiteRateLimitBackend(Path(path), sync_interval=sync_interval)
+    admitted = 0
+    for _ in range(attempts):
+        admitted += backend.hit("ip:203.0.113.7", quota).allowed
+    results.put(admitted)
+
+
+def shared_accuracy(workers: int, quota: int, sync_interval: float) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "ratelimit.sqlite3")
+        results: multiprocessing.Queue = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=_worker, args=(path, quota, quota * 2, sync_interval, results))
+            for _ in range(workers)
+        ]
+        for proc in procs:
+            proc.start()
+        admitted = sum(results.get() for _ in procs)
+        for proc in procs:
+            proc.join()
+        return admitted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hits", type=int, default=200000)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--quota", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends: Dict[str, RateLimitBackend] = {"memory": TokenBucketLimiter(max_clients=args.clients * 2)}
+        for interval in (0.25, 0.05, 0.0):
+            backends[f"sqlite sync={interval}s"] = SQLiteRateLimitBackend(
+                Path(tmp) / f"bench-{interval}.sqlite3", sync_interval=interval
+            )
+        for name, backend in backends.items():
+            # syncing on every hit is orders of magnitude slower; sample fewer hits
+            hits = args.hits // 20 if name.endswith("sync=0.0s") else args.hits
+            timings = time_hits(backend, hits, args.clients)
+            p99 = statistics.quantiles(timings, n=100)[98]
+            print(f"{name:>20}: mean {statistics.fmean(timings):7.2f} us   p99 {p99:8.2f} us")
+
+    print()
+    for interval in (0.25, 0.0):
+        admitted = shared_accuracy(args.workers, args.quota, interval)
+        print(
+            f"{args.workers} processes, sync={interval}s: admitted {admitted} of quota {args.quota} "
+            f"({admitted / args.quota:.2%}); separate in-memory limiters would admit {args.workers * args.quota}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Nearby-point queries: per-snapshot k-d tree (``SpatialIndex``) vs a brute-force haversine scan.
+
+Points are uniform on the sphere. Every query is checked against the scan, so the numbers are
+for identical results.
+
+    python -m benchmarks.spatial_index [--points 100000] [--queries 200]
+"""
+
+import argparse
+import math
+import random
+import statistics
+import time
+from typing import Callable, List, Sequence, Tuple
+
+from app.indexes import SpatialIndex, haversine_km
+
+
+def random_points(count: int, rng: random.Random) -> Tuple[List[float], List[float]]:
+    lats = [math.degrees(math.asin(rng.uniform(-1.0, 1.0))) for _ in range(count)]
+    lngs = [rng.uniform(-180.0, 180.0) for _ in range(count)]
+    return lats, lngs
+
+
+def brute_force(lats: Sequence[float], lngs: Sequence[float], lat: float, lng: float) -> List[Tuple[float, int]]:
+    return sorted((haversine_km(lat, lng, lats[i], lngs[i]), i) for i in range(len(lats)))
+
+
+def time_queries(run: Callable[[float, float], object], queries: Sequence[Tuple[float, float]]) -> List[float]:
+    timings = []
+    for lat, lng in queries:
+        start = time.perf_counter()
+        run(lat, lng)
+        timings.append((time.perf_counter() - start) * 1e3)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius-km", type=float, default=500.0)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    lats, lngs = random_points(args.points, rng)
+    queries = list(zip(*random_points(args.queries, rng)))
+
+    start = time.perf_counter()
+    index = SpatialIndex(lats, lngs)
+    print(f"build {args.points} points: {time.perf_counter() - start:.2f} s")
+
+    # brute force is slow; verify and time it on a sample of the queries
+    sample = queries[: max(1, args.queries // 10)]
+    for lat, lng in sample:
+        scan = brute_force(lats, lngs, lat, lng)
+        assert [i for _, i in index.within(lat, lng, args.radius_km)] == [i for d, i in scan if d <= args.radius_km]
+        assert [i for _, i in index.nearest(lat, lng, args.k)] == [i for _, i in scan[: args.k]]
+
+    rows = [
+        ("brute force scan", time_queries(lambda lat, lng: brute_force(lats, lngs, lat, lng), sample)),
+        (f"k-d tree radius {args.radius_km:g} km", time_queries(lambda lat, lng: index.within(lat, lng, args.radius_km), queries)),
+        (f"k-d tree k={args.k}", time_queries(lambda lat, lng: index.nearest(lat, lng, args.k), queries)),
+    ]
+    for name, timings in rows:
+        print(f"{name:>26}: mean {statistics.fmean(timings):9.3f} ms   max {max(timings):9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
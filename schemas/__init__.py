@@ -3,6 +3,7 @@ from .pagination_schema import PaginationRequestSchema, PaginationMetaSchema
 from .search_schema import SearchQuerySchema
 from .country_schema import CountryResponseSchema, CountryListResponseSchema
 from .capital_schema import CapitalResponseSchema, CapitalListResponseSchema
+from .batch_schema import CapitalBatchRequestSchema, CountryBatchRequestSchema
 
 __all__ = [
     "ResponseSchema",
@@ -14,4 +15,6 @@ __all__ = [
     "CountryListResponseSchema",
     "CapitalResponseSchema",
     "CapitalListResponseSchema",
+    "CountryBatchRequestSchema",
+    "CapitalBatchRequestSchema",
 ]
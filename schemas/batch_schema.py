@@ -0,0 +1,21 @@
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CountryBatchRequestSchema(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        json_schema_extra={"example": {"codes": ["ID", "JPN", "FR"]}},
+    )
+
+    codes: List[str] = Field(..., description="ISO alpha-2 or alpha-3 codes to resolve")
+
+
+class CapitalBatchRequestSchema(BaseModel):
+    model_config = ConfigDict(
+        extra="forbid",
+        json_schema_extra={"example": {"names": ["Tokyo", "Paris"]}},
+    )
+
+    names: List[str] = Field(..., description="Capital names to resolve (case-insensitive)")
@@ -0,0 +1,71 @@
+import json
+import os
+from pathlib import Path
+
+from app.models import CountryModel, PaginationModel, SearchModel
+from app.repositories import CountryRepository, add_swap_listener, get_snapshot_store
+from app.services import CountryService
+from app.utils import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_evicts_by_entries_and_bytes():
+    cache = LRUCache(max_entries=2, max_bytes=100)
+    cache.set("a", 1, 10)
+    cache.set("b", 2, 10)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3, 10)
+    assert cache.get("b") is None
+    cache.set("d", 4, 95)
+    assert len(cache) == 1 and cache.get("d") == 4
+    cache.set("huge", 5, 101)
+    assert cache.get("huge") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 3
+    assert stats["hits"] == 2 and stats["misses"] == 2
+
+
+def test_lru_ttl_expires_entries():
+    clock = FakeClock()
+    cache = LRUCache(max_entries=10, max_bytes=1000, ttl=5, clock=clock)
+    cache.set("k", "v", 1)
+    clock.now = 4.9
+    assert cache.get("k") == "v"
+    clock.now = 5.0
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_country_results_are_cached_on_normalized_query():
+    cache = LRUCache(max_entries=10, max_bytes=1 << 20)
+    service = CountryService(CountryRepository(Path("data/countries.json").resolve()), cache=cache)
+    first, meta = service.list_countries(PaginationModel(page=1, size=5), SearchModel(region="Europe", sort_by="name"))
+    again, meta_again = service.list_countries(PaginationModel(page=1, size=5), SearchModel(region=" europe ", sort_by="name"))
+    assert list(again) == list(first)
+    assert meta_again == meta
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_result_cache_cleared_on_snapshot_swap(tmp_path: Path):
+    data_file = tmp_path / "countries.json"
+    countries = json.loads(Path("data/countries.json").read_text())
+    data_file.write_text(json.dumps(countries))
+    cache = LRUCache(max_entries=10, max_bytes=1 << 20)
+    add_swap_listener(lambda _: cache.clear())
+    service = CountryService(CountryRepository(data_file), cache=cache)
+    service.list_countries(PaginationModel(), SearchModel())
+    assert len(cache) == 1
+
+    data_file.write_text(json.dumps(countries[:1]))
+    os.utime(data_file, (2_000_000, 2_000_000))
+    assert get_snapshot_store(data_file, CountryModel).reload_if_changed()
+    assert len(cache) == 0
+    items, meta = CountryService(CountryRepository(data_file), cache=cache).list_countries(PaginationModel(), SearchModel())
+    assert meta.total_items == 1
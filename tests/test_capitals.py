@@ -1,3 +1,4 @@
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -41,3 +42,51 @@ def test_capitals_invalid_sort_field_returns_400():
     assert resp.status_code == 400
     payload = resp.json()
     assert payload["code"] == "ERR_BAD_REQUEST"
+
+
+def test_capitals_export_matches_list_order():
+    resp = client.get("/capitals/export?sort_by=population&order=desc")
+    assert resp.status_code == 200
+    names = [line.split('"name":"')[1].split('"')[0] for line in resp.text.splitlines()]
+    listed = [c["name"] for c in client.get("/capitals?sort_by=population&order=desc&size=100").json()["data"]]
+    assert names == listed
+
+
+def test_capitals_cursor_pagination_walks_all_rows():
+    listed = client.get("/capitals?sort_by=lat&size=100").json()["data"]
+    walked, cursor = [], ""
+    while cursor is not None:
+        payload = client.get("/capitals", params={"sort_by": "lat", "size": 2, "cursor": cursor}).json()
+        walked.extend(payload["data"])
+        cursor = payload["meta"]["next_cursor"]
+    assert walked == listed
+
+
+def test_capitals_batch_lookup_by_names():
+    resp = client.get("/capitals?names=tokyo,Atlantis,Paris")
+    assert [c["name"] for c in resp.json()["data"]] == ["Tokyo", "Paris"]
+    assert resp.json()["meta"]["missing"] == ["Atlantis"]
+    posted = client.post("/capitals/batch", json={"names": ["tokyo", "Atlantis", "Paris"]})
+    assert posted.status_code == 200
+    assert posted.json() == resp.json()
+    assert client.get("/capitals?names=%20").json() == client.get("/capitals").json()
+
+
+def test_capitals_sparse_fieldsets():
+    assert client.get("/capitals/Tokyo?fields=country,lat").json()["data"] == {"country": "Japan", "lat": 35.6895}
+    listed = client.get("/capitals?fields=name&sort_by=population&order=desc&size=2").json()["data"]
+    assert listed == [{"name": "Tokyo"}, {"name": "Jakarta"}]
+    assert client.get("/capitals?fields=country_code").status_code == 400
+
+
+def test_nearby_capitals_by_radius_and_k():
+    resp = client.get("/capitals/nearby?lat=48.85&lng=2.35&radius_km=1000")
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert [c["name"] for c in data] == ["Paris", "Berlin"]
+    assert data[1]["distance_km"] == pytest.approx(878, abs=1)
+    nearest = client.get("/capitals/nearby?lat=-6.2&lng=106.8&k=2&fields=name").json()
+    assert [c["name"] for c in nearest["data"]] == ["Jakarta", "Tokyo"]
+    assert list(nearest["data"][0]) == ["name", "distance_km"]
+    assert nearest["meta"]["total_items"] == 2
+    assert client.get("/capitals/nearby?lat=95&lng=0").status_code == 422
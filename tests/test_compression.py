@@ -0,0 +1,91 @@
+import gzip
+import json
+
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.config.settings import AppSettings
+from app.core.compression import CompressionMiddleware, GzipCodec, negotiate
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_negotiation_honours_q_values():
+    gzip_only = [GzipCodec(6)]
+    assert negotiate("gzip, deflate, br", gzip_only).name == "gzip"
+    assert negotiate("br;q=1.0, gzip;q=0.5", gzip_only).name == "gzip"
+    assert negotiate("gzip;q=0", gzip_only) is None
+    assert negotiate("*", gzip_only).name == "gzip"
+    assert negotiate("identity", gzip_only) is None
+    assert negotiate("", gzip_only) is None
+
+
+def _compressing_client(body: bytes):
+    inner = FastAPI()
+
+    @inner.get("/data")
+    async def data():
+        return Response(body, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @inner.get("/tiny")
+    async def tiny():
+        return Response(b"{}", media_type="application/json")
+
+    @inner.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield body
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson", headers={"ETag": '"s1"'})
+
+    middleware = CompressionMiddleware(inner, AppSettings(compression_min_size=100))
+    return middleware, TestClient(middleware)
+
+
+def test_bodies_are_compressed_once_per_etag(monkeypatch):
+    body = json.dumps([{"name": "row %d" % i} for i in range(200)]).encode()
+    middleware, test_client = _compressing_client(body)
+    calls = []
+    codec = middleware.codecs[-1]
+    real_compress = codec.compress
+    monkeypatch.setattr(codec, "compress", lambda data: calls.append(1) or real_compress(data))
+
+    for _ in range(3):
+        resp = test_client.get("/data", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.headers["etag"] == '"v1-gzip"'
+        assert resp.headers["vary"] == "Accept-Encoding"
+        assert int(resp.headers["content-length"]) < len(body)
+        assert resp.content == body
+    assert len(calls) == 1
+
+    identity = test_client.get("/data", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers and identity.content == body
+    tiny = test_client.get("/tiny", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in tiny.headers
+
+
+def test_streaming_responses_are_compressed_incrementally():
+    body = b'{"row":1}\n' * 500
+    middleware, test_client = _compressing_client(body)
+    resp = test_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "content-length" not in resp.headers
+    assert resp.content == body * 3
+    # the finished stream is cached under its ETag and replayed
+    assert gzip.decompress(middleware.cache.get(('"s1"', "gzip"))) == body * 3
+    assert test_client.get("/stream", headers={"Accept-Encoding": "gzip"}).content == body * 3
+
+
+def test_compressed_etag_still_answers_conditional_requests():
+    resp = client.get("/countries?size=100", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    etag = resp.headers["etag"]
+    assert etag.endswith('-gzip"')
+    assert client.get("/countries?size=100", headers={"If-None-Match": etag}).status_code == 304
+    export = client.get("/countries/export", headers={"Accept-Encoding": "gzip"})
+    assert export.headers["content-encoding"] == "gzip"
+    assert len(export.text.splitlines()) == 6
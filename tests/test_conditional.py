@@ -0,0 +1,63 @@
+from email.utils import formatdate
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_success_responses_carry_validators():
+    resp = client.get("/countries?region=Europe")
+    assert resp.status_code == 200
+    assert resp.headers["etag"].startswith('"')
+    assert resp.headers["last-modified"].endswith("GMT")
+    assert client.get("/countries?region=Asia").headers["etag"] != resp.headers["etag"]
+    # parameter order does not change the canonical request
+    assert client.get("/countries?size=10&page=1").headers["etag"] == client.get("/countries?page=1&size=10").headers["etag"]
+
+
+def test_if_none_match_returns_304_without_body():
+    etag = client.get("/capitals/Tokyo").headers["etag"]
+    resp = client.get("/capitals/Tokyo", headers={"If-None-Match": f'W/"nope", {etag}'})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == etag
+    assert client.get("/capitals/Tokyo", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_if_none_match_star_only_matches_existing_resources():
+    resp = client.get("/countries/ID", headers={"If-None-Match": "*"})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == client.get("/countries/ID").headers["etag"]
+    missing = client.get("/countries/XX", headers={"If-None-Match": "*"})
+    assert missing.status_code == 404
+    assert missing.json()["code"] == "ERR_NOT_FOUND"
+
+
+def test_if_modified_since_returns_304_when_data_unchanged():
+    stats = client.get("/statistics/totals")
+    resp = client.get("/statistics/totals", headers={"If-Modified-Since": stats.headers["last-modified"]})
+    assert resp.status_code == 304
+    old = formatdate(0, usegmt=True)
+    assert client.get("/statistics/totals", headers={"If-Modified-Since": old}).status_code == 200
+
+
+def test_validators_change_with_the_deployed_build(monkeypatch):
+    from app.config.settings import get_settings
+    from app.routes import conditional
+
+    before = client.get("/countries/ID")
+    monkeypatch.setattr(get_settings(), "version", "99.0.0")
+    after = client.get("/countries/ID", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    # a build started after the data file was written dates the responses
+    monkeypatch.setattr(conditional, "PROCESS_STARTED", 4_000_000_000.0)
+    assert client.get("/countries/ID").headers["last-modified"] == formatdate(4_000_000_000.0, usegmt=True)
+
+
+def test_errors_do_not_carry_validators():
+    resp = client.get("/countries/ZZZ")
+    assert resp.status_code == 404
+    assert "etag" not in resp.headers
@@ -66,3 +66,265 @@ def test_search_returns_empty_for_no_matches():
     payload = resp.json()
     assert payload["data"] == []
     assert payload["meta"]["total_items"] == 0
+
+
+def test_get_country_by_alpha3_alias():
+    resp = client.get("/countries/idn")
+    assert resp.status_code == 200
+    assert resp.json()["data"]["country_code"] == "ID"
+
+
+def test_region_lookup_is_case_insensitive():
+    resp = client.get("/countries/region/EUROPE?page=1&size=1")
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert payload["meta"]["total_items"] == 2
+    assert len(payload["data"]) == 1
+
+
+def test_search_explain_returns_plan_in_meta():
+    resp = client.get("/countries/search?region=Europe&min_area=400000&explain=true")
+    payload = resp.json()
+    assert [c["name"] for c in payload["data"]] == ["France"]
+    plan = payload["meta"]["plan"]
+    assert plan["result_rows"] == 1
+    assert {step["index"] for step in plan["steps"]} == {"hash", "column"}
+    assert "plan" not in client.get("/countries/search?region=Europe").json()["meta"]
+
+
+def test_pre_encoded_response_matches_schema_serialization():
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from schemas import ResponseSchema
+
+    resp = client.get("/countries?region=Europe&sort_by=population&order=desc")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    assert "etag" in resp.headers
+    payload = resp.json()
+    expected = JSONResponse(jsonable_encoder(ResponseSchema(**payload))).body
+    assert resp.content == expected
+
+
+def test_export_streams_all_matches_as_ndjson():
+    import json
+
+    resp = client.get("/countries/export?min_population=50000000&sort_by=area&order=desc")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    assert "etag" in resp.headers
+    exported = [json.loads(line) for line in resp.text.splitlines()]
+    paged = client.get("/countries/search?min_population=50000000&sort_by=area&order=desc&size=100").json()["data"]
+    assert exported == paged
+    assert client.get("/countries/export?sort_by=nope").status_code == 400
+
+
+def test_export_chunks_are_bounded_and_pinned_to_one_snapshot(tmp_path):
+    import asyncio
+    import json
+    import os
+    from pathlib import Path
+
+    from app.models import CountryModel, SearchModel
+    from app.repositories import CountryRepository, get_snapshot_store
+    from app.routes import responses
+    from app.services import CountryService
+
+    encoded = [b'{"row":%d}' % i for i in range(50_000)]
+
+    async def collect(row_ids):
+        return [chunk async for chunk in responses._ndjson_chunks(row_ids, encoded)]
+
+    chunks = asyncio.run(collect(iter(range(len(encoded)))))
+    assert max(len(chunk) for chunk in chunks) < responses.EXPORT_CHUNK_BYTES + 32
+    assert b"".join(chunks).count(b"\n") == len(encoded)
+
+    # a reload while the export is being consumed does not change what it streams
+    data_file = tmp_path / "countries.json"
+    countries = json.loads(Path("data/countries.json").read_text())
+    data_file.write_text(json.dumps(countries))
+    service = CountryService(CountryRepository(data_file))
+    response = responses.ndjson_response(service.export(SearchModel()).iter_ids(), service.repository.snapshot)
+
+    data_file.write_text(json.dumps(countries[:1]))
+    os.utime(data_file, (2_000_000, 2_000_000))
+    assert get_snapshot_store(data_file, CountryModel).reload_if_changed()
+
+    async def drain():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    assert asyncio.run(drain()).count(b"\n") == len(countries)
+
+
+def _walk_cursor(url: str) -> list:
+    rows, cursor = [], ""
+    while cursor is not None:
+        payload = client.get(url, params={"cursor": cursor, "size": 2}).json()
+        assert payload["meta"]["size"] == 2
+        rows.extend(payload["data"])
+        cursor = payload["meta"]["next_cursor"]
+    return rows
+
+
+def test_cursor_pagination_matches_page_mode():
+    for query in ("sort_by=population&order=desc", "sort_by=region", "max_population=300000000", ""):
+        paged = client.get(f"/countries/search?{query}&size=100").json()["data"]
+        assert _walk_cursor(f"/countries/search?{query}") == paged
+    first = client.get("/countries?cursor=&size=2&sort_by=name").json()
+    assert first["meta"]["total_items"] == 6
+    # a cursor only continues the query it was issued for
+    resp = client.get("/countries", params={"cursor": first["meta"]["next_cursor"], "sort_by": "area"})
+    assert resp.status_code == 400
+    assert client.get("/countries?cursor=not-a-cursor").json()["message"] == "Invalid cursor"
+    assert resp.json()["code"] == "ERR_INVALID_CURSOR"
+
+
+def test_cursor_resumes_by_sort_key_after_reload(tmp_path):
+    import json
+    import os
+    from pathlib import Path
+
+    from app.models import CountryModel, SearchModel
+    from app.repositories import CountryRepository, get_snapshot_store
+    from app.services import CountryService
+
+    data_file = tmp_path / "countries.json"
+    countries = json.loads(Path("data/countries.json").read_text())
+    data_file.write_text(json.dumps(countries))
+    query = SearchModel(sort_by="population", order="desc")
+    first, meta = CountryService(CountryRepository(data_file)).list_countries_by_cursor(query, 2, "")
+
+    # a new country is inserted at the front of the file and rows shift their ids
+    newcomer = dict(countries[0], name="Newland", country_code="NL", population=1)
+    data_file.write_text(json.dumps([newcomer] + countries))
+    os.utime(data_file, (3_000_000, 3_000_000))
+    assert get_snapshot_store(data_file, CountryModel).reload_if_changed()
+
+    rest, _ = CountryService(CountryRepository(data_file)).list_countries_by_cursor(query, 10, meta.next_cursor)
+    by_population = sorted(countries + [newcomer], key=lambda c: c["population"], reverse=True)
+    assert [c.name for c in list(first) + list(rest)] == [c["name"] for c in by_population]
+
+
+def test_unsorted_cursor_is_rejected_after_reload(tmp_path):
+    import json
+    import os
+    from pathlib import Path
+
+    import pytest
+
+    from app.exceptions import InvalidCursorError
+    from app.models import CountryModel, SearchModel
+    from app.repositories import CountryRepository, get_snapshot_store
+    from app.services import CountryService
+
+    data_file = tmp_path / "countries.json"
+    countries = json.loads(Path("data/countries.json").read_text())
+    data_file.write_text(json.dumps(countries))
+    query = SearchModel()
+    _, meta = CountryService(CountryRepository(data_file)).list_countries_by_cursor(query, 2, "")
+    assert CountryService(CountryRepository(data_file)).list_countries_by_cursor(query, 2, meta.next_cursor)[0]
+
+    # dataset order follows row ids, which the reload reassigns
+    data_file.write_text(json.dumps(countries[::-1]))
+    os.utime(data_file, (3_000_000, 3_000_000))
+    assert get_snapshot_store(data_file, CountryModel).reload_if_changed()
+    with pytest.raises(InvalidCursorError) as excinfo:
+        CountryService(CountryRepository(data_file)).list_countries_by_cursor(query, 2, meta.next_cursor)
+    assert excinfo.value.code == "ERR_INVALID_CURSOR"
+
+
+def test_batch_lookup_by_codes_reports_missing_keys():
+    resp = client.get("/countries?codes=ID, jpn,XX,IDN,FR")
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert [c["name"] for c in payload["data"]] == ["Indonesia", "Japan", "France"]
+    assert payload["meta"] == {"requested": 5, "found": 3, "missing": ["XX"]}
+    posted = client.post("/countries/batch", json={"codes": ["ID", "jpn", "XX", "IDN", "FR"]})
+    assert posted.json() == payload
+    assert client.post("/countries/batch", json={"codes": ["QQ"]}).json()["data"] == []
+
+
+def test_empty_codes_falls_through_to_list():
+    listed = client.get("/countries").json()
+    for blank in ("", "%20", ",%20,"):
+        assert client.get(f"/countries?codes={blank}").json() == listed
+    assert client.get("/countries?codes=JP,,%20").json()["meta"] == {"requested": 1, "found": 1, "missing": []}
+
+
+def test_batch_lookup_enforces_key_limit(monkeypatch):
+    from app.config.settings import get_settings
+
+    monkeypatch.setattr(get_settings(), "batch_max_keys", 2)
+    resp = client.post("/countries/batch", json={"codes": ["ID", "JP", "FR"]})
+    assert resp.status_code == 400
+    assert resp.json()["details"] == {"codes": 3, "max": 2}
+
+
+def test_sparse_fieldsets_project_rows():
+    full = client.get("/countries/search?sort_by=population&order=desc&size=3").json()["data"]
+    resp = client.get("/countries/search?sort_by=population&order=desc&size=3&fields=population, name,country_code")
+    assert resp.status_code == 200
+    # fields come back in model order whatever order they were requested in
+    assert [list(c) for c in resp.json()["data"]] == [["name", "country_code", "population"]] * 3
+    assert resp.json()["data"] == [{k: c[k] for k in ("name", "country_code", "population")} for c in full]
+    assert client.get("/countries/JP?fields=name").json()["data"] == {"name": "Japan"}
+    assert client.get("/countries/export?fields=country_code&sort_by=name").text.splitlines()[0] == '{"country_code":"BR"}'
+    bad = client.get("/countries?fields=name,gdp")
+    assert bad.status_code == 400
+    assert bad.json()["details"] == {"fields": ["gdp"]}
+
+
+def test_projections_are_cached_per_snapshot():
+    from app.routes.responses import encoded_projection, encoded_rows
+    from app.routes.fields import parse_fields
+    from app.models import CountryModel
+    from app.repositories import CountryRepository
+    from app.routes.countries import DATA_PATH
+
+    snapshot = CountryRepository(DATA_PATH).snapshot
+    fields = parse_fields("population,name", CountryModel)
+    assert fields == ("name", "population")
+    assert encoded_projection(snapshot, fields) is encoded_projection(snapshot, parse_fields("name,population", CountryModel))
+    assert encoded_projection(snapshot, parse_fields(",".join(CountryModel.model_fields), CountryModel)) is encoded_rows(snapshot)
+
+
+def _names(url: str) -> list:
+    resp = client.get(url)
+    assert resp.status_code == 200, resp.json()
+    return [c["name"] for c in resp.json()["data"]]
+
+
+def test_bounding_box_filters_and_antimeridian_wrap():
+    assert _names("/countries?min_lat=30&max_lat=60&size=100") == ["Japan", "France", "Germany", "United States"]
+    # min_lng > max_lng wraps across 180°: [100, 180] or [-180, -60]
+    assert _names("/countries?min_lng=100&max_lng=-60") == ["Indonesia", "Japan", "United States"]
+    assert _names("/countries/search?min_lng=-60&max_lng=20&min_lat=-20") == ["France", "Germany", "Brazil"]
+    assert client.get("/countries?min_lat=50&max_lat=10").status_code == 400
+    assert client.get("/countries?max_lng=200").status_code == 422
+
+
+def test_radius_filter_composes_with_index_filters():
+    assert _names("/countries/search?near=50,10&within_km=1000") == ["France", "Germany"]
+    payload = client.get("/countries/search?near=50,10&within_km=1000&min_population=70000000&explain=true").json()
+    assert [c["name"] for c in payload["data"]] == ["Germany"]
+    assert {step["index"] for step in payload["meta"]["plan"]["steps"]} == {"kdtree", "column"}
+    export = client.get("/countries/export?near=50,10&within_km=1000&language=french")
+    assert len(export.text.splitlines()) == 1
+    assert client.get("/countries?near=50,10").json()["message"] == "near and within_km must be given together"
+    assert client.get("/countries?near=north&within_km=5").status_code == 400
+
+
+def test_border_neighbors_path_and_landmass():
+    resp = client.get("/countries/FR/neighbors?depth=3&fields=name")
+    assert resp.status_code == 200
+    assert resp.json()["data"] == [{"name": "Germany", "hops": 1}]
+    assert client.get("/countries/JP/neighbors").json()["data"] == []
+    path = client.get("/countries/fra/path/DE").json()
+    assert [c["name"] for c in path["data"]] == ["France", "Germany"]
+    assert path["meta"]["hops"] == 1
+    assert client.get("/countries/FR/path/JP").status_code == 404
+    assert _names("/countries/DEU/landmass") == ["France", "Germany"]
+    assert _names("/countries/JP/landmass") == ["Japan"]
+    assert client.get("/countries/XX/landmass").status_code == 404
+    assert client.get("/countries/FR/neighbors?depth=0").status_code == 422
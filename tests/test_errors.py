@@ -42,3 +42,15 @@ def test_validation_error_for_negative_page():
     payload = resp.json()
     assert payload["status"] == "error"
     assert payload["code"] == "ERR_VALIDATION"
+
+
+def test_middleware_headers_on_success_error_and_304():
+    ok = client.get("/health")
+    missing = client.get("/countries/ZZZ")
+    cached = client.get("/countries/ID", headers={"If-None-Match": client.get("/countries/ID").headers["etag"]})
+    assert cached.status_code == 304
+    for resp in (ok, missing, cached):
+        assert resp.headers["x-content-type-options"] == "nosniff"
+        assert resp.headers["x-frame-options"] == "DENY"
+        assert len(resp.headers["x-request-id"]) == 36
+    assert ok.headers["x-request-id"] != missing.headers["x-request-id"]
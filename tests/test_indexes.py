@@ -0,0 +1,205 @@
+import random
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.indexes import (
+    HAS_NUMPY,
+    BorderGraph,
+    CountryIndex,
+    GroupKeys,
+    Metric,
+    NumericColumns,
+    Selection,
+    SortIndex,
+    TrigramIndex,
+    aggregate,
+    bitset,
+    sorting,
+)
+from app.main import app
+from app.repositories import CountryRepository
+from app.utils import LRUCache, RowView, fold_text
+
+client = TestClient(app)
+
+REPO = CountryRepository(Path("data/countries.json").resolve())
+
+
+def test_country_index_resolves_codes_and_aliases():
+    index = REPO.index
+    items = REPO.get_all_countries()
+    assert items[index.code("de")].name == "Germany"
+    assert index.code("DEU") == index.code("DE")
+    assert index.code("zzz") is None
+
+
+def test_country_index_posting_lists():
+    index = CountryIndex(REPO.get_all_countries())
+    assert [REPO.get_all_countries()[i].name for i in index.region(" europe ")] == ["France", "Germany"]
+    assert index.currency("eur") == index.region("Europe")
+    assert index.language("klingon") == ()
+
+
+def test_index_is_built_once_per_snapshot():
+    assert CountryRepository(REPO.data_path).index is REPO.index
+
+
+def test_row_view_slices_lazily():
+    view = RowView(REPO.get_all_countries(), (5, 0, 3))
+    page = view[1:]
+    assert isinstance(page, RowView)
+    assert [c.country_code for c in page] == ["ID", "DE"]
+    assert len(view) == 3
+
+
+def test_trigram_index_matches_brute_force_scan():
+    rng = random.Random(7)
+    alphabet = "abcdeé ñ"
+    rows = [("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))), "Zoë") for _ in range(300)]
+    index = TrigramIndex(rows)
+    for query in ["ab", "a", "abc", "e e", "ñab", "zoe", "ZOË", "cdea", "xyz", "  "]:
+        q = fold_text(query)
+        expected = [i for i, fields in enumerate(rows) if any(q in fold_text(f) for f in fields)]
+        assert index.search(query) == expected, query
+
+
+def test_text_search_is_accent_insensitive():
+    resp = client.get("/capitals?name=brasilia")
+    assert [c["name"] for c in resp.json()["data"]] == ["Brasília"]
+
+    resp = client.get("/countries/search?name=republic of")
+    assert {c["name"] for c in resp.json()["data"]} == {"Indonesia", "Germany", "Brazil"}
+
+
+def test_bitset_round_trip():
+    ids = [0, 3, 8, 9, 63, 64, 1000]
+    bits = bitset.from_ids(ids, 1001)
+    assert bitset.to_ids(bits) == ids
+    assert bitset.count(bits) == len(ids)
+    assert bitset.to_ids(bitset.full(5)) == [0, 1, 2, 3, 4]
+    assert bitset.to_ids(0) == []
+
+
+@pytest.mark.parametrize("use_numpy", [False, pytest.param(True, marks=pytest.mark.skipif(not HAS_NUMPY, reason="numpy not installed"))])
+def test_numeric_columns_range_matches_scan(use_numpy):
+    rng = random.Random(11)
+    rows = [SimpleNamespace(population=rng.randint(0, 50), area=rng.random() * 10) for _ in range(500)]
+    columns = NumericColumns(rows, ["population", "area"], use_numpy=use_numpy)
+    for lo, hi in [(None, 10), (20, None), (5, 5), (30, 10), (None, None)]:
+        expected = [i for i, r in enumerate(rows) if (lo is None or r.population >= lo) and (hi is None or r.population <= hi)]
+        assert bitset.to_ids(columns.range("population", lo, hi)) == expected
+    expected = [i for i, r in enumerate(rows) if 2.5 <= r.area <= 7.25]
+    assert bitset.to_ids(columns.range("area", 2.5, 7.25)) == expected
+
+
+def test_numeric_filters_compose_with_other_filters():
+    resp = client.get("/countries?min_population=100000000&max_area=2000000&language=japanese")
+    assert [c["name"] for c in resp.json()["data"]] == ["Japan"]
+    resp = client.get("/countries?region=Americas&min_area=9000000")
+    assert {c["name"] for c in resp.json()["data"]} == {"United States"}
+
+
+@pytest.mark.parametrize("use_numpy", [False, pytest.param(True, marks=pytest.mark.skipif(not HAS_NUMPY, reason="numpy not installed"))])
+def test_sorted_selection_matches_sorted(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(sorting, "np", None)
+    rng = random.Random(3)
+    rows = [SimpleNamespace(value=rng.randint(0, 20)) for _ in range(400)]
+    sort_index = SortIndex(rows, ["value"])
+    for density in (1.0, 0.5, 0.02):
+        chosen = [i for i in range(len(rows)) if rng.random() < density]
+        selected = bitset.from_ids(chosen, len(rows))
+        for descending in (False, True):
+            expected = sorted(chosen, key=lambda i: rows[i].value, reverse=descending)
+            view = Selection(rows, selected, sort_index, "value", descending)
+            assert len(view) == len(expected)
+            assert view[5:25].ids == expected[5:25]
+            assert view[len(expected) - 3 :].ids == expected[-3:]
+            # keyset continuation after a row, and by sort key alone (ties skipped)
+            assert view.ids_from(view.position_after(expected[4]), 20) == expected[5:25]
+            key = rows[expected[4]].value
+            after_key = [i for i in expected if (rows[i].value < key if descending else rows[i].value > key)]
+            assert view.ids_from(view.seek(key), 10) == after_key[:10]
+
+
+def test_sort_index_top_k():
+    sort_index = REPO.sort_index
+    items = REPO.get_all_countries()
+    assert [items[i].name for i in sort_index.top("population", True, 2)] == ["United States", "Indonesia"]
+    assert [items[i].name for i in sort_index.top("area", False, 1)] == ["Germany"]
+
+
+def test_spatial_index_matches_haversine_scan():
+    import math
+
+    from app.indexes import SpatialIndex, haversine_km
+
+    rng = random.Random(11)
+    lats = [math.degrees(math.asin(rng.uniform(-1, 1))) for _ in range(3000)]
+    lngs = [rng.uniform(-180, 180) for _ in range(3000)]
+    index = SpatialIndex(lats, lngs)
+    for lat, lng in [(0.0, 179.9), (89.9, 0.0), (-33.9, 151.2), (48.85, 2.35)]:
+        scan = sorted((haversine_km(lat, lng, lats[i], lngs[i]), i) for i in range(len(lats)))
+        for radius in (50.0, 800.0, 25_000.0):
+            assert [i for _, i in index.within(lat, lng, radius)] == [i for d, i in scan if d <= radius]
+            assert [i for _, i in index.nearest(lat, lng, 7, radius)] == [i for d, i in scan if d <= radius][:7]
+        assert index.nearest(lat, lng, 5) == scan[:5]
+
+
+def test_border_graph_bfs_paths_and_components():
+    # A-B-C-D chain plus E-F, a self loop and a border to a country missing from the dataset
+    borders = [["B"], ["A", "C", "ZZZ"], ["D"], ["C"], ["F", "E"], []]
+    graph = BorderGraph(borders, {c: i for i, c in enumerate("ABCDEF")}.get)
+    assert graph.edges == 4
+    assert list(graph.adjacent(2)) == [1, 3]
+    assert graph.neighbors(0) == ((1, 1),)
+    assert graph.neighbors(0, 2) == ((1, 1), (2, 2))
+    assert graph.neighbors(0, 20) == ((1, 1), (2, 2), (3, 3))
+    assert graph.neighbors(0, 20) is graph.neighbors(0, 20)
+    bounded = BorderGraph(borders, {c: i for i, c in enumerate("ABCDEF")}.get, LRUCache(max_entries=2, max_bytes=1 << 20))
+    for source in range(4):
+        for target in range(4):
+            bounded.path(source, target)
+    assert len(bounded.cache) == 2 and bounded.path(3, 0) == (3, 2, 1, 0)
+    assert graph.path(0, 3) == (0, 1, 2, 3)
+    assert graph.path(3, 0) == (3, 2, 1, 0)
+    assert graph.path(2, 2) == (2,)
+    assert graph.path(0, 4) is None
+    assert graph.landmass(2) == (0, 1, 2, 3)
+    assert graph.landmass(5) == (4, 5)
+
+
+@pytest.mark.parametrize("use_numpy", [False, pytest.param(True, marks=pytest.mark.skipif(not HAS_NUMPY, reason="numpy not installed"))])
+def test_group_aggregate_matches_scan(use_numpy):
+    rng = random.Random(3)
+    size = 500
+    regions = [rng.choice(["north", "south", "east"]) for _ in range(size)]
+    languages = [rng.sample(["a", "b", "c", "d"], rng.randint(0, 3)) for _ in range(size)]
+    population = [rng.randint(0, 10_000) for _ in range(size)]
+    area = [rng.uniform(1, 100) for _ in range(size)]
+    selected = bitset.from_ids([i for i in range(size) if i % 4], size)
+    metrics = [Metric("count"), Metric("sum", "population"), Metric("avg", "area"), Metric("min", "population"), Metric("max", "area")]
+    groups = aggregate(
+        selected, [GroupKeys(regions), GroupKeys(languages)], {"population": population, "area": area}, metrics, use_numpy
+    )
+
+    expected = {}
+    for row_id in bitset.iter_ids(selected):
+        for language in languages[row_id]:
+            expected.setdefault((regions[row_id], language), []).append(row_id)
+    assert sorted(key for key, _ in groups) == sorted(expected)
+    # groups follow the first-seen order of each key in turn
+    assert [key[0] for key, _ in groups] == sorted((key[0] for key, _ in groups), key=regions.index)
+    for key, (count, total, mean, smallest, largest) in groups:
+        rows = expected[key]
+        assert count == len(rows)
+        assert total == sum(population[r] for r in rows) and isinstance(total, int)
+        assert mean == pytest.approx(sum(area[r] for r in rows) / len(rows))
+        assert smallest == min(population[r] for r in rows)
+        assert largest == max(area[r] for r in rows)
+    assert aggregate(0, [GroupKeys(regions)], {}, [Metric("count")], use_numpy) == []
+    with pytest.raises(ValueError):
+        aggregate(selected, [GroupKeys(regions)], {}, [Metric("sum")], use_numpy)
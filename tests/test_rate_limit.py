@@ -0,0 +1,162 @@
+import sqlite3
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config.settings import AppSettings
+from app.core.rate_limit import SQLiteRateLimitBackend, TokenBucketLimiter, create_rate_limit_backend
+from app.core.security import RateLimiterMiddleware
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_and_reports_retry_after():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(max_clients=10, clock=clock)
+    decisions = [limiter.hit("a", 60) for _ in range(61)]
+    assert all(d.allowed for d in decisions[:60])
+    rejected = decisions[60]
+    assert not rejected.allowed
+    assert rejected.remaining == 0
+    assert rejected.retry_after == 1
+    assert rejected.reset == 60
+    clock.now = 1.0
+    assert limiter.hit("a", 60).allowed
+
+
+def test_token_bucket_bounds_tracked_clients():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(max_clients=3, clock=clock)
+    for i in range(10):
+        limiter.hit(f"scanner-{i}", 60)
+    assert len(limiter) == 3
+    assert limiter.evictions == 7
+    # buckets that have fully refilled are dropped as idle
+    clock.now = 61.0
+    limiter.hit("fresh", 60)
+    assert len(limiter) == 1
+
+
+def _client(**overrides) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    settings = AppSettings(**{"rate_limit_per_minute": 2, **overrides})
+    app.add_middleware(RateLimiterMiddleware, settings=settings)
+    return TestClient(app)
+
+
+def test_middleware_returns_429_with_rate_limit_headers():
+    client = _client()
+    first = client.get("/ping")
+    assert first.status_code == 200
+    assert first.headers["x-ratelimit-limit"] == "2"
+    assert first.headers["x-ratelimit-remaining"] == "1"
+    client.get("/ping")
+    resp = client.get("/ping")
+    assert resp.status_code == 429
+    assert int(resp.headers["retry-after"]) >= 1
+    assert resp.headers["x-ratelimit-remaining"] == "0"
+    assert resp.json() == {"status": "error", "message": "Rate limit exceeded", "code": "ERR_RATE_LIMITED", "details": {}}
+
+
+def test_api_key_quota_overrides_ip_limit():
+    client = _client(rate_limit_api_keys={"partner": 100})
+    for _ in range(5):
+        resp = client.get("/ping", headers={"X-API-Key": "partner"})
+        assert resp.status_code == 200
+    assert resp.headers["x-ratelimit-limit"] == "100"
+    # unknown keys fall back to the per-IP quota
+    statuses = [client.get("/ping", headers={"X-API-Key": "guess"}).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+
+
+def test_sqlite_backend_requires_an_explicit_path(tmp_path):
+    with pytest.raises(ValueError, match="ATLAS_RATE_LIMIT_SQLITE_PATH"):
+        AppSettings(rate_limit_backend="sqlite")
+    settings = AppSettings(rate_limit_backend="sqlite", rate_limit_sqlite_path=str(tmp_path / "rl.sqlite3"))
+    backend = create_rate_limit_backend(settings)
+    assert isinstance(backend, SQLiteRateLimitBackend)
+    assert backend.path == tmp_path / "rl.sqlite3"
+
+
+def test_sqlite_backend_shares_counts_between_instances(tmp_path):
+    clock = FakeClock()
+    clock.now = 600.0  # start of a window
+    path = tmp_path / "ratelimit.sqlite3"
+    workers = [SQLiteRateLimitBackend(path, sync_interval=0.0, clock=clock) for _ in range(3)]
+    allowed = sum(workers[i % 3].hit("ip:1.2.3.4", 30).allowed for i in range(90))
+    # each worker may hold one hit it has not merged yet
+    assert 30 <= allowed <= 30 + len(workers) - 1
+    rejected = workers[0].hit("ip:1.2.3.4", 30)
+    assert not rejected.allowed
+    assert rejected.retry_after >= 60
+    # other clients are unaffected, and the previous window decays
+    assert workers[1].hit("ip:5.6.7.8", 30).allowed
+    clock.now = 600.0 + 60 + 59
+    assert workers[2].hit("ip:1.2.3.4", 30).allowed
+
+
+def test_sqlite_backend_batches_syncs(tmp_path):
+    clock = FakeClock()
+    backend = SQLiteRateLimitBackend(tmp_path / "rl.sqlite3", sync_interval=1.0, clock=clock)
+    for _ in range(50):
+        backend.hit("ip:a", 1000)
+    assert backend.syncs == 1
+    clock.now = 1.0
+    backend.hit("ip:a", 1000)
+    assert backend.syncs == 2
+
+
+def test_sqlite_backend_skips_sync_while_another_worker_writes(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "rl.sqlite3"
+    backend = SQLiteRateLimitBackend(path, sync_interval=0.0, clock=clock)
+    backend.hit("ip:a", 1000)
+    assert backend.syncs == 1
+
+    writer = sqlite3.connect(str(path), isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.perf_counter()
+        assert backend.hit("ip:a", 1000).allowed
+        # bounded by the busy timeout instead of blocking the event loop for seconds
+        assert time.perf_counter() - start < 0.5
+        assert backend.syncs == 1 and backend.busy_skips == 1
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+    # the next sync merges the hits held back while busy (each hit syncs before counting itself)
+    backend.hit("ip:a", 1000)
+    assert backend.syncs == 2
+    total = sqlite3.connect(str(path)).execute("SELECT SUM(count) FROM rate_limit_hits").fetchone()[0]
+    assert total == 2
+
+
+def test_sqlite_backend_refreshes_all_local_keys_in_one_query(tmp_path):
+    clock = FakeClock()
+    backend = SQLiteRateLimitBackend(tmp_path / "rl.sqlite3", sync_interval=1.0, clock=clock)
+    for i in range(200):
+        backend.hit(f"ip:{i}", 1000)
+    statements = []
+    assert backend._conn is not None
+    backend._conn.set_trace_callback(statements.append)
+    clock.now = 1.0
+    backend.hit("ip:0", 1000)
+    assert backend.syncs == 2
+    assert sum(sql.lstrip().upper().startswith("SELECT") for sql in statements) == 1
+    assert backend._synced[("ip:199", 0)] == 1
+    total = sqlite3.connect(str(tmp_path / "rl.sqlite3")).execute("SELECT SUM(count) FROM rate_limit_hits").fetchone()[0]
+    assert total == 200
@@ -1,10 +1,20 @@
+import builtins
+import hashlib
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
+from fastapi.testclient import TestClient
 
 from app.exceptions import BadRequestError
-from app.repositories import CountryRepository
+from app.indexes import SortIndex
+from app.main import app
+from app.models import CountryModel
+from app.repositories import CountryRepository, SnapshotWatcher, clear_snapshot_stores, get_snapshot_store
+from app.repositories import snapshot as snapshot_module
 
 
 def test_repository_missing_file(tmp_path: Path):
@@ -20,3 +30,203 @@ def test_repository_invalid_schema(tmp_path: Path):
     repo = CountryRepository(invalid_file)
     with pytest.raises(BadRequestError):
         repo.get_all_countries()
+
+
+def test_snapshot_records_file_metadata(tmp_path: Path):
+    data_file = tmp_path / "countries.json"
+    source = Path("data/countries.json").resolve()
+    data_file.write_bytes(source.read_bytes())
+    repo = CountryRepository(data_file)
+    snapshot = repo.snapshot
+    assert snapshot.path == data_file.resolve()
+    assert snapshot.size == data_file.stat().st_size
+    assert snapshot.mtime == data_file.stat().st_mtime
+    assert snapshot.content_hash == hashlib.sha256(data_file.read_bytes()).hexdigest()
+    assert isinstance(repo.get_all_countries(), tuple)
+    # a second repository shares the same snapshot and model instances
+    assert CountryRepository(data_file).get_all_countries() is repo.get_all_countries()
+
+
+def test_dataset_file_opened_once_across_requests(monkeypatch):
+    clear_snapshot_stores()
+    opened: list[str] = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        # either the JSON or, when compiled locally, its .snap file
+        if Path(str(file)).stem in {"countries", "capitals"}:
+            opened.append(Path(str(file)).stem)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", counting_open)
+    client = TestClient(app)
+    for _ in range(10):
+        assert client.get("/countries?region=Europe").status_code == 200
+        assert client.get("/countries/ID").status_code == 200
+        assert client.get("/capitals/Tokyo").status_code == 200
+        assert client.get("/statistics/totals").status_code == 200
+    assert opened.count("countries") == 1
+    assert opened.count("capitals") == 1
+
+
+def _write_countries(path: Path, countries: list, mtime: float) -> None:
+    path.write_text(json.dumps(countries))
+    os.utime(path, (mtime, mtime))
+
+
+def test_reload_swaps_snapshot_and_pins_inflight_readers(tmp_path: Path):
+    data_file = tmp_path / "countries.json"
+    countries = json.loads(Path("data/countries.json").read_text())
+    _write_countries(data_file, countries, 1_000_000)
+    inflight = CountryRepository(data_file)
+    old = inflight.snapshot
+    store = get_snapshot_store(data_file, CountryModel)
+
+    assert store.reload_if_changed() is False
+    _write_countries(data_file, countries[:2], 1_000_100)
+    assert store.reload_if_changed() is True
+
+    assert inflight.get_all_countries() is old.items
+    assert len(CountryRepository(data_file).get_all_countries()) == 2
+
+
+def test_reload_keeps_last_good_snapshot_on_broken_file(tmp_path: Path):
+    data_file = tmp_path / "countries.json"
+    _write_countries(data_file, json.loads(Path("data/countries.json").read_text()), 1_000_000)
+    good = CountryRepository(data_file).snapshot
+    store = get_snapshot_store(data_file, CountryModel)
+
+    data_file.write_text("[{\"name\": ")
+    os.utime(data_file, (1_000_200, 1_000_200))
+    assert store.reload_if_changed() is False
+    assert CountryRepository(data_file).snapshot is good
+    # the broken file is not retried until it changes again
+    assert store.has_changed() is False
+
+
+def test_concurrent_reloads_collapse_into_single_load(tmp_path: Path, monkeypatch):
+    data_file = tmp_path / "countries.json"
+    _write_countries(data_file, json.loads(Path("data/countries.json").read_text()), 1_000_000)
+    store = get_snapshot_store(data_file, CountryModel)
+    store.get()
+    _write_countries(data_file, [], 1_000_300)
+
+    calls = []
+    real_load = snapshot_module.load_snapshot
+
+    def slow_load(*args, **kwargs):
+        calls.append(1)
+        time.sleep(0.05)
+        return real_load(*args, **kwargs)
+
+    monkeypatch.setattr(snapshot_module, "load_snapshot", slow_load)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: store.reload(), range(8)))
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert len(results[0]) == 0
+
+
+def test_watcher_reloads_changed_files(tmp_path: Path):
+    data_file = tmp_path / "countries.json"
+    countries = json.loads(Path("data/countries.json").read_text())
+    _write_countries(data_file, countries, 1_000_000)
+    CountryRepository(data_file).get_all_countries()
+    _write_countries(data_file, countries[:1], 1_000_400)
+
+    assert SnapshotWatcher(interval=0.01).check_once() >= 1
+    assert len(CountryRepository(data_file).get_all_countries()) == 1
+
+
+def test_mapped_snapshot_serves_rows_lazily(tmp_path: Path):
+    from app.data import MappedRows, write_snapshot_file
+    from app.utils import encode_model
+
+    source = CountryRepository(Path("data/countries.json"))
+    snap_path = tmp_path / "countries.snap"
+    write_snapshot_file(snap_path, CountryModel, source.get_all_countries(), source.snapshot.content_hash)
+
+    repo = CountryRepository(snap_path)
+    rows = repo.get_all_countries()
+    assert isinstance(rows, MappedRows)
+    assert repo.snapshot.version == source.snapshot.version
+    # indexes, columns and sort permutations are built from mapped columns, not models
+    assert [c.name for c in repo.get_by_region("europe")] == ["France", "Germany"]
+    assert repo.sort_index.top("population", True, 1) == source.sort_index.top("population", True, 1)
+    assert repo.columns.count("population", 100_000_000, None) == source.columns.count("population", 100_000_000, None)
+    assert repo.get_country_by_code("JPN").name == "Japan"
+    assert rows.materialized == 3
+    assert list(rows.encoded) == [encode_model(c) for c in source.get_all_countries()]
+    assert [c.model_dump() for c in rows] == [c.model_dump() for c in source.get_all_countries()]
+
+
+def test_mapped_rows_keep_a_bounded_set_of_models(tmp_path: Path):
+    from app.data import MappedDataset, MappedRows, write_snapshot_file
+    from app.utils.cache import LRUCache
+
+    source = CountryRepository(Path("data/countries.json"))
+    snap_path = tmp_path / "countries.snap"
+    write_snapshot_file(snap_path, CountryModel, source.get_all_countries(), source.snapshot.content_hash)
+
+    rows = MappedRows(CountryModel, MappedDataset(snap_path), LRUCache(max_entries=2, max_bytes=1 << 20))
+    assert [c.name for c in rows] == [c.name for c in source.get_all_countries()]
+    assert len(rows.cache) == 2
+    assert rows[-1] is rows[-1]
+    assert rows.materialized == 6
+
+
+def test_mapped_snapshot_rejects_foreign_files(tmp_path: Path):
+    bogus = tmp_path / "countries.snap"
+    bogus.write_bytes(b"not a snapshot file at all")
+    with pytest.raises(BadRequestError):
+        CountryRepository(bogus).get_all_countries()
+
+
+def test_compile_cli_and_compiled_snapshot_fallbacks(tmp_path: Path, capsys):
+    from app.data import MappedRows
+    from app.data.__main__ import main as data_cli
+    from app.repositories.snapshot import load_snapshot
+
+    data_file = tmp_path / "countries.json"
+    countries = json.loads(Path("data/countries.json").read_text())
+    _write_countries(data_file, countries, 1_000_000)
+    assert data_cli(["compile", str(data_file)]) == 0
+    assert "6 rows" in capsys.readouterr().out
+    compiled = tmp_path / "countries.snap"
+    assert compiled.stat().st_mode & 0o777 == 0o644
+
+    fresh = load_snapshot(data_file, CountryModel, prefer_compiled=True)
+    assert isinstance(fresh.items, MappedRows)
+    assert fresh.file_key == load_snapshot(data_file, CountryModel).file_key
+    # sort permutations come precomputed from the file
+    expected = CountryRepository(Path("data/countries.json")).sort_index
+    precomputed = SortIndex(fresh.items, ["population", "name"])
+    assert list(precomputed.order("population", True)) == list(expected.order("population", True))
+    assert list(precomputed.order("name")) == list(expected.order("name"))
+    assert fresh.items.materialized == 0
+
+    # touched but identical contents: still served from the compiled file
+    _write_countries(data_file, countries, 1_000_500)
+    assert isinstance(load_snapshot(data_file, CountryModel, prefer_compiled=True).items, MappedRows)
+
+    # edited after compiling: stale, fall back to JSON
+    _write_countries(data_file, countries[:2], 1_001_000)
+    stale = load_snapshot(data_file, CountryModel, prefer_compiled=True)
+    assert isinstance(stale.items, tuple) and len(stale) == 2
+
+    # corrupted compiled file fails its checksum and is ignored
+    assert data_cli(["compile", str(data_file)]) == 0
+    payload = bytearray(compiled.read_bytes())
+    payload[-1] ^= 0xFF
+    compiled.write_bytes(bytes(payload))
+    assert isinstance(load_snapshot(data_file, CountryModel, prefer_compiled=True).items, tuple)
+
+
+def test_compile_cli_reports_invalid_dataset(tmp_path: Path, capsys):
+    from app.data.__main__ import main as data_cli
+
+    data_file = tmp_path / "countries.json"
+    data_file.write_text(json.dumps([{"name": "X"}]))
+    assert data_cli(["compile", str(data_file)]) == 1
+    assert "missing keys" in capsys.readouterr().err
+    assert not (tmp_path / "countries.snap").exists()
@@ -20,3 +20,35 @@ def test_service_search_and_pagination():
     )
     assert meta_page2.page == 2
     assert len(items_page2) == 0
+
+
+def test_query_planner_orders_steps_by_selectivity():
+    service = CountryService(CountryRepository(Path("data/countries.json").resolve()))
+    plan = service.explain(SearchQuerySchema(name="a", region="Europe", language="German", max_population=100_000_000))
+    steps = plan["steps"]
+    assert [s["index"] for s in steps] == ["hash", "hash", "column", "trigram"]
+    assert steps[0]["predicate"].startswith("language")
+    assert [s["rows_after"] for s in steps] == [1, 1, 1, 1]
+    assert plan["result_rows"] == 1
+
+
+def test_query_planner_stops_on_empty_intersection():
+    service = CountryService(CountryRepository(Path("data/countries.json").resolve()))
+    plan = service.explain(SearchQuerySchema(region="Europe", currency="JPY", name="zzz"))
+    assert plan["result_rows"] == 0
+    assert plan["steps"][0]["rows_after"] == 0
+    assert all(step["skipped"] for step in plan["steps"][1:])
+
+
+def test_explained_page_reports_the_plan_it_executed(monkeypatch):
+    from app.services.query_planner import QueryPlan
+
+    service = CountryService(CountryRepository(Path("data/countries.json").resolve()))
+    query = SearchQuerySchema(region="Europe")
+    service.list_countries(PaginationRequestSchema(page=1, size=5), query)  # warm the result cache
+    runs = []
+    execute = QueryPlan.execute
+    monkeypatch.setattr(QueryPlan, "execute", lambda plan: runs.append(plan) or execute(plan))
+    items, meta = service.list_countries(PaginationRequestSchema(page=1, size=5), query, explain=True)
+    assert len(runs) == 1
+    assert service.explain_last()["result_rows"] == meta.total_items == len(items) == 2
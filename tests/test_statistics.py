@@ -1,6 +1,13 @@
+import json
+import os
+from pathlib import Path
+
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.models import CountryModel
+from app.repositories import CapitalRepository, CountryRepository, get_snapshot_store
+from app.services import StatisticsService
 
 client = TestClient(app)
 
@@ -29,3 +36,52 @@ def test_statistics_top_population():
     smallest = client.get("/statistics/top-population/smallest?limit=2")
     assert smallest.status_code == 200
     assert len(smallest.json()["data"]) == 2
+
+
+def test_statistics_materialized_once_per_snapshot(tmp_path):
+    data_file = tmp_path / "countries.json"
+    countries = json.loads(Path("data/countries.json").read_text())
+    data_file.write_text(json.dumps(countries))
+    capitals = CapitalRepository(Path("data/capitals.json").resolve())
+    stats = StatisticsService(CountryRepository(data_file), capitals).country_statistics
+    assert StatisticsService(CountryRepository(data_file), capitals).country_statistics is stats
+    assert stats.regions_json == json.dumps(stats.regions, separators=(",", ":")).encode()
+    assert stats.total == 6 and len(stats.largest) == 6
+
+    data_file.write_text(json.dumps([c for c in countries if c["region"] != "Asia"]))
+    os.utime(data_file, (1_000_000, 1_000_000))
+    assert get_snapshot_store(data_file, CountryModel).reload_if_changed() is True
+    fresh = StatisticsService(CountryRepository(data_file), capitals)
+    assert fresh.country_statistics is not stats
+    assert "Asia" not in fresh.region_distribution()
+    assert [c.name for c in fresh.top_smallest_populations(2)] == ["France", "Germany"]
+
+
+def test_statistics_aggregate_group_by_with_filters():
+    resp = client.get("/statistics/aggregate?group_by=region,subregion&metrics=sum(population),avg(area),count()")
+    assert resp.status_code == 200
+    payload = resp.json()
+    europe = next(g for g in payload["data"] if g["region"] == "Europe")
+    assert europe == {
+        "region": "Europe",
+        "subregion": "Western Europe",
+        "sum(population)": 67413000 + 83240525,
+        "avg(area)": (551695.0 + 357022.0) / 2,
+        "count()": 2,
+    }
+    assert payload["meta"]["matched"] == 6
+    assert sum(g["count()"] for g in payload["data"]) == 6
+
+    # list fields explode; filters are the /countries ones
+    langs = client.get("/statistics/aggregate?group_by=languages&region=Europe&metrics=count(),max(population)").json()
+    assert langs["data"] == [
+        {"languages": "French", "count()": 1, "max(population)": 67413000},
+        {"languages": "German", "count()": 1, "max(population)": 83240525},
+    ]
+    assert client.get("/statistics/aggregate?group_by=region&min_population=10000000000").json()["data"] == []
+
+    assert client.get("/statistics/aggregate?group_by=population").status_code == 400
+    assert client.get("/statistics/aggregate?group_by=region&metrics=median(area)").status_code == 400
+    assert client.get("/statistics/aggregate?group_by=region&metrics=sum(region)").status_code == 400
+    assert client.get("/statistics/aggregate?group_by=region&near=1,2").status_code == 400
+    assert client.get("/statistics/aggregate").status_code == 422